@@ -1,7 +1,23 @@
-from .discrete_distribution import *
-from .true_measure import *
-from .integrand import *
-from .stopping_criterion import *
+from importlib import import_module
+from . import util # sets numpy print options and the warning format
 
 name = "qmcpy"
 __version__ = "0.8.7a"
+
+# subpackages whose public objects are exported here, imported on first access
+_subpackages = ['discrete_distribution', 'true_measure', 'integrand', 'stopping_criterion']
+__all__ = [obj for subpackage in _subpackages for obj in import_module('.'+subpackage,__name__).__all__]
+
+def __getattr__(name):
+    for subpackage in _subpackages:
+        module = import_module('.'+subpackage,__name__)
+        if name in module.__all__:
+            value = getattr(module,name)
+            globals()[name] = value
+            return value
+    if name == 'accumulate_data':
+        return import_module('.'+name,__name__)
+    raise AttributeError("module %r has no attribute %r"%(__name__,name))
+
+def __dir__():
+    return sorted(set(globals())|set(__all__))
@@ -1,7 +1,23 @@
 """ APIs of data """
-from .mean_var_data import MeanVarData
-from .mean_var_data_rep import MeanVarDataRep
-from .ld_transform_data import LDTransformData
-from .ld_transform_bayes_data import LDTransformBayesData
-from .mlmc_data import MLMCData
-from .mlqmc_data import MLQMCData
+from importlib import import_module
+
+# public objects and the module defining each, imported on first access
+_modules = {
+    'MeanVarData':          '.mean_var_data',
+    'MeanVarDataRep':       '.mean_var_data_rep',
+    'LDTransformData':      '.ld_transform_data',
+    'LDTransformBayesData': '.ld_transform_bayes_data',
+    'MLMCData':             '.mlmc_data',
+    'MLQMCData':            '.mlqmc_data'
+}
+__all__ = list(_modules)
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError("module %r has no attribute %r"%(__name__,name))
+    value = getattr(import_module(_modules[name],__name__),name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals())|set(__all__))
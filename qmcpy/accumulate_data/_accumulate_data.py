@@ -1,9 +1,13 @@
 from ..true_measure._true_measure import TrueMeasure
 from ..util import ParameterError, MethodImplementationError, _univ_repr, DimensionError
+from numpy import ndim, array2string, asarray
 
 class AccumulateData(object):
     """ Accumulated Data abstract class. DO NOT INSTANTIATE. """
 
+    # attributes written to checkpoints, None if checkpoints are not supported
+    _checkpoint_attrs = None
+
     def __init__(self):
         """ Initialize data instance """
         prefix = 'A concrete implementation of AccumulateData must have '
@@ -26,8 +30,29 @@ class AccumulateData(object):
         """ ABSTRACT METHOD to update the accumulated data."""
         raise MethodImplementationError(self, 'update_data')
 
+    def _get_state(self):
+        """
+        Return:
+            dict: arrays of the attributes in _checkpoint_attrs which are set
+        """
+        if self._checkpoint_attrs is None:
+            raise MethodImplementationError(self, '_get_state')
+        return {a:asarray(getattr(self,a)) for a in self._checkpoint_attrs if getattr(self,a) is not None}
+
+    def _set_state(self, state):
+        """
+        Args:
+            state (dict): arrays of attributes, as returned by _get_state
+        """
+        for a in self._checkpoint_attrs:
+            if a in state:
+                setattr(self, a, state[a][()] if state[a].ndim==0 else state[a])
+
     def __repr__(self):
-        string = "Solution: %-15.4f\n" % (self.solution)
+        if ndim(self.solution)==0:
+            string = "Solution: %-15.4f\n" % (self.solution)
+        else: # multi-output integrand
+            string = "Solution: %s\n" % array2string(self.solution,precision=4)
         for qmc_obj in [self.integrand, self.discrete_distrib, self.true_measure, self.stopping_crit]:
             if qmc_obj:
                 string += str(qmc_obj)+'\n'
@@ -1,5 +1,5 @@
 from ._accumulate_data import AccumulateData
-from ..util import MaxSamplesWarning
+from ..util import MaxSamplesWarning, CubatureWarning
 from numpy import array, nan
 import warnings
 import numpy as np
@@ -32,7 +32,8 @@ class LDTransformBayesData(AccumulateData):
         # Set Attributes
         self.m_min = m_min
         self.m_max = m_max
-        self.debugEnable = True
+        self.debugEnable = stopping_crit.debug_enable
+        self.n_alerts = 0  # number of failed debug checks
 
         self.n_total = 0  # total number of samples generated
         self.solution = nan
@@ -42,14 +43,12 @@ class LDTransformBayesData(AccumulateData):
         self.mvec = np.arange(self.m_min, self.m_max + 1, dtype=int)
 
         # Initialize various temporary storage between iterations
-        self.xpts_ = array([])  # shifted lattice points
-        self.xun_ = array([])  # un-shifted lattice points
+        # unshifted points in the order they were generated, in a buffer with room for 2^m_max points,
+        # so each doubling writes the new half after the old points instead of copying them
+        self.xun_buf = None
+        # for lattices, the rows of xun_buf in linear lattice order, i.e. the order of ftilde_; None for nets
+        self.xun_order = None
         self.ftilde_ = array([])  # fourier transformed integrand values
-        if self.distribution_name == 'Lattice':
-            # integrand after the periodization transform
-            self.ff = lambda x,*args,**kwargs: self.integrand.f_periodized(x,stopping_crit.ptransform,*args,**kwargs)
-        else:
-            self.ff = self.integrand.f
         self.fbt = fbt
         self.merge_fbt = merge_fbt
 
@@ -60,7 +59,7 @@ class LDTransformBayesData(AccumulateData):
         # Generate sample values
 
         if self.iter < len(self.mvec):
-            self.ftilde_, self.xun_, self.xpts_ = self.iter_fbt(self.iter, self.xun_, self.xpts_, self.ftilde_)
+            self.ftilde_ = self.iter_fbt(self.iter, self.ftilde_)
 
             self.m = self.mvec[self.iter]
             self.iter += 1
@@ -71,10 +70,31 @@ class LDTransformBayesData(AccumulateData):
                           f' Note that error tolerances may no longer be satisfied',
                           MaxSamplesWarning)
 
-        return self.xun_, self.ftilde_, self.m
+        return self.xun_buf[:self.n_total], self.ftilde_, self.m
+
+    @property
+    def xun_(self):
+        """ Unshifted points in the order of ftilde_. For lattices this gathers a copy from xun_buf. """
+        if self.xun_buf is None:
+            return array([])
+        xun = self.xun_buf[:self.n_total]
+        return xun if self.xun_order is None else xun[self.xun_order]
+
+    @property
+    def xpts_(self):
+        """ Shifted points in the order of ftilde_. They are not stored but generated again on request. """
+        if self.n_total == 0:
+            return array([])
+        return self.discrete_distrib.gen_samples(n_min=0, n_max=self.n_total, warn=False)
+
+    def ff(self, x, *args, **kwargs):
+        """ Integrand, after the periodization transform for lattices. """
+        if self.distribution_name == 'Lattice':
+            return self.integrand.f_periodized(x,self.stopping_crit.ptransform,*args,**kwargs)
+        return self.integrand.f(x,*args,**kwargs)
 
     # Efficient Fast Bayesian Transform computation algorithm, avoids recomputing the full transform
-    def iter_fbt(self, iter, xun, xpts, ftilde_prev):
+    def iter_fbt(self, iter, ftilde_prev):
         m = self.mvec[iter]
         n = 2 ** m
 
@@ -88,11 +108,12 @@ class LDTransformBayesData(AccumulateData):
             # xun_ = np.mod((xun_ * self.gen_vec), 1)
             # xpts_ = np.mod(bsxfun( @ plus, xun_, shift), 1)  # shifted
 
-            xpts_,xun_ = self.gen_samples(n_min=0, n_max=n, return_unrandomized=True, distribution=self.discrete_distrib)
+            xpts_, xun_ = self.gen_samples(n_min=0, n_max=n, return_unrandomized=True, distribution=self.discrete_distrib)
+            self.store_pts(xun_, 0, n)
 
             # Compute initial FBT
             ftilde_ = self.fbt(self.ff(xpts_))
-            ftilde_ = ftilde_.reshape((n, 1))
+            ftilde_ = ftilde_.reshape((n, -1))  # one column per integrand output
         else:
             # xunnew = np.mod(bsxfun( @ times, (1/n : 2/n : 1-1/n)',self.gen_vec),1)
             # xunnew = np.arange(1 / n, 1, 2 / n).reshape((n // 2, 1))
@@ -100,18 +121,18 @@ class LDTransformBayesData(AccumulateData):
             # xnew = np.mod(bsxfun( @ plus, xunnew, shift), 1)
 
             xnew, xunnew = self.gen_samples(n_min=n // 2, n_max=n, return_unrandomized=True, distribution=self.discrete_distrib)
-            [xun_, xpts_] = self.merge_pts(xun, xunnew, xpts, xnew, n, self.discrete_distrib.d, distribution=self.distribution_name)
+            self.store_pts(xunnew, n // 2, n)
             mnext = m - 1
             ftilde_next_new = self.fbt(self.ff(xnew))
 
-            ftilde_next_new = ftilde_next_new.reshape((n // 2, 1))
+            ftilde_next_new = ftilde_next_new.reshape((n // 2, -1))
             if self.debugEnable:
                 self.alert_msg(ftilde_next_new, 'Nan', 'Inf')
 
             # combine the previous batch and new batch to get FBT on all points
             ftilde_ = self.merge_fbt(ftilde_prev, ftilde_next_new, mnext)
 
-        return ftilde_, xun_, xpts_
+        return ftilde_
 
     @staticmethod
     def gen_samples(n_min, n_max, return_unrandomized, distribution):
@@ -122,29 +143,57 @@ class LDTransformBayesData(AccumulateData):
             xpts_, xun_ = distribution.gen_samples(n_min=n_min, n_max=n_max, warn=warn, return_jlms=return_unrandomized)
         return xpts_, xun_
 
-    # inserts newly generated points with the old set by interleaving them
-    # xun - unshifted points
-    @staticmethod
-    def merge_pts(xun, xunnew, x, xnew, n, d, distribution):
-        if distribution == 'Lattice':
-            temp = np.zeros((n, d))
-            temp[0::2, :] = xun
-            temp[1::2, :] = xunnew
-            xun = temp
-            temp = np.zeros((n, d))
-            temp[0::2, :] = x
-            temp[1::2, :] = xnew
-            x = temp
-        else:
-            x = np.vstack([x, xnew])
-            xun = np.vstack([xun, xunnew])
-        return xun, x
+    def store_pts(self, xun, n_min, n_max):
+        """
+        Write unshifted points n_min,...,n_max-1 into xun_buf, after the points already stored.
+        The buffer is allocated once with room for 2^m_max points.
+        Only the rows written are committed to memory by the operating system.
+        Lattice points are not interleaved. Instead the new points are recorded at the odd entries of xun_order.
 
-    # prints debug message if the given variable is Inf, Nan or complex, etc
-    # Example: alertMsg(x, 'Inf', 'Imag')
-    #          prints if variable 'x' is either Infinite or Imaginary
-    @staticmethod
-    def alert_msg(*args):
+        Args:
+            xun (ndarray): (n_max-n_min) x d array of unshifted points
+            n_min (int): index of the first point
+            n_max (int): index after the last point
+        """
+        if self.xun_buf is None or self.xun_buf.shape[0] < n_max:
+            n_cap = max(n_max, 2 ** int(self.m_max))
+            try:
+                buf = np.empty((n_cap, xun.shape[1]))
+            except MemoryError:  # no room for all 2^m_max points, grow with each doubling instead
+                buf = np.empty((n_max, xun.shape[1]))
+            if n_min > 0:
+                buf[:n_min] = self.xun_buf[:n_min]
+            self.xun_buf = buf
+        self.xun_buf[n_min:n_max] = xun
+        if self.distribution_name == 'Lattice':
+            if n_min == 0:
+                self.xun_order = np.arange(n_max)
+            else:  # the new points interleave with the old ones in linear order
+                order = np.empty(n_max, dtype=int)
+                order[0::2] = self.xun_order
+                order[1::2] = np.arange(n_min, n_max)
+                self.xun_order = order
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self.xun_buf is not None:
+            state['xun_buf'] = self.xun_buf[:self.n_total].copy()  # leave out the unused rows
+        return state
+
+    def alert(self, msg):
+        """
+        Count a failed debug check and warn about it.
+
+        Args:
+            msg (str): description of the failed check
+        """
+        self.n_alerts += 1
+        warnings.warn(msg, CubatureWarning)
+
+    # warns if the given variable is Inf, Nan or complex, etc
+    # Example: alert_msg(x, 'Inf', 'Imag')
+    #          warns if variable 'x' is either Infinite or Imaginary
+    def alert_msg(self, *args):
         varargin = args
         nargin = len(varargin)
         if nargin > 1:
@@ -159,12 +208,58 @@ class LDTransformBayesData(AccumulateData):
 
                 if var_type == 'Nan':
                     if np.any(np.isnan(var_tocheck)):
-                        print(f'{inpvarname} has NaN values')
+                        self.alert(f'{inpvarname} has NaN values')
                 elif var_type == 'Inf':
                     if np.any(np.isinf(var_tocheck)):
-                        print(f'{inpvarname} has Inf values')
+                        self.alert(f'{inpvarname} has Inf values')
                 elif var_type == 'Imag':
                     if not np.all(np.isreal(var_tocheck)):
-                        print(f'{inpvarname} has complex values')
+                        self.alert(f'{inpvarname} has complex values')
                 else:
-                    print('unknown type check requested !')
+                    self.alert('unknown type check requested !')
+
+
+def _extends(xun, prev):
+    """
+    Whether the first rows of xun are the points prev.
+    Views from the start of the same buffer, such as the points from LDTransformBayesData.update_data,
+    are not compared, since the buffer is only appended to.
+
+    Args:
+        xun (ndarray): n x d array of points
+        prev (ndarray): n_prev x d array of points
+
+    Return:
+        bool: True if xun[:n_prev] equals prev
+    """
+    if xun.shape[1:] != prev.shape[1:] or prev.shape[0] > xun.shape[0]:
+        return False
+    if xun.base is not None and xun.base is prev.base and xun.strides == prev.strides \
+            and xun.ctypes.data == prev.ctypes.data:
+        return True
+    return np.array_equal(xun[:prev.shape[0]], prev)
+
+
+def _extend_table(xun, table, n_prev):
+    """
+    Table with a row for each point in xun, whose first n_prev rows are those of table.
+    When xun is a view of a larger buffer of points, the table is a view of a buffer with the same capacity,
+    so it is extended in place as long as the points are.
+
+    Args:
+        xun (ndarray): n x d array of points
+        table (ndarray): table for the first n_prev points, or None
+        n_prev (int): number of rows to keep
+
+    Return:
+        ndarray: n x d table, rows n_prev onward not yet set
+    """
+    n = xun.shape[0]
+    if n_prev and table.base is not None and table.base.shape[0] >= n and table.ctypes.data == table.base.ctypes.data:
+        return table.base[:n]
+    base = xun.base
+    n_cap = base.shape[0] if isinstance(base, np.ndarray) and base.shape[1:] == xun.shape[1:] and base.shape[0] > n else n
+    buf = np.empty((n_cap,) + xun.shape[1:])
+    if n_prev:
+        buf[:n_prev] = table[:n_prev]
+    return buf[:n]
@@ -41,12 +41,10 @@ class LDTransformData(AccumulateData):
         self.solution = nan
         self.r_lag = 4 # distance between coefficients summed and those computed
         self.l_star = self.m_min - self.r_lag # minimum gathering of points for the sums of DFT
-        self.yval = array([]) # hold y values
-        self.y = array([]) # hold transformed y values
+        self.yval = array([]) # hold y values, n x k for k integrand outputs
+        self.y = array([]) # hold transformed y values, n x k for k integrand outputs
         self.kappanumap = arange(1,2**self.m+1,dtype=int)
         self.fudge = fudge
-        self.omg_circ = lambda m: 2**(-m)
-        self.omg_hat = lambda m: self.fudge(m)/((1+self.fudge(self.r_lag))*self.omg_circ(self.r_lag))
         # Initialize various sums of DFT terms for necessary conditions
         self.stilde = 0
         self.c_stilde_low = tile(-inf,int(self.m_max-self.l_star+1))
@@ -55,38 +53,48 @@ class LDTransformData(AccumulateData):
         self.ptransform = ptransform
         super(LDTransformData,self).__init__()
 
+    def omg_circ(self, m):
+        return 2.**(-m)
+
+    def omg_hat(self, m):
+        return self.fudge(m)/((1+self.fudge(self.r_lag))*self.omg_circ(self.r_lag))
+
     def update_data(self):
         """ See abstract method. """
         # Generate sample values
         x = self.discrete_distrib.gen_samples(n_min=self.n_total,n_max=2**self.m)
         ynext = self.integrand.f_periodized(x,self.ptransform).squeeze()
-        self.yval = hstack((self.yval,ynext))
+        self.yval = concatenate((self.yval,ynext)) if self.yval.size else ynext.copy()
         # Compute fast basis transform
         self.y = self.ft(self.y, ynext)
-        ## Update self.kappanumap
+        y_abs = abs(self.y).reshape((len(self.y),-1)) # one column per integrand output
+        n_outputs = y_abs.shape[1]
+        ## Update self.kappanumap, one column per integrand output
         if self.y.size == ynext.size:
             ls = arange(self.m-1,0,-1, dtype=int)
+            self.kappanumap = tile(self.kappanumap.reshape((-1,1)),(1,n_outputs))
+            self.c_stilde_low = tile(self.c_stilde_low.reshape((-1,1)),(1,n_outputs))
+            self.c_stilde_up = tile(self.c_stilde_up.reshape((-1,1)),(1,n_outputs))
         else:
             ls = arange(int(self.m-1),int(self.m-self.r_lag-1),-1, dtype=int)
             # combine self.kappanumap from previous
-            self.kappanumap = hstack((self.kappanumap, 2**(self.m-1)+self.kappanumap)).astype(int) #initialize map
+            self.kappanumap = vstack((self.kappanumap, int(2**(self.m-1))+self.kappanumap)) #initialize map
         for l in ls:
             nl = 2**l
-            oldone = abs(self.y[self.kappanumap[1:int(nl)]-1]) # earlier values of kappa, don't touch first one
-            newone = abs(self.y[self.kappanumap[nl+1:2*nl]-1]) # later values of kappa,
-            flip = where(newone>oldone)[0]+1 # which in the pair are the larger ones. change to matlab indexing
-            if flip.size != 0:
-                additive = arange(0,2**self.m-1,2**(l+1)).reshape((1,-1))
-                flipall = (flip.reshape((-1,1)) + additive)
-                flipall = flipall.flatten('F').astype(int) # flatten column wise
-                temp = self.kappanumap[nl+flipall] # then flip
-                self.kappanumap[nl+flipall] = self.kappanumap[flipall] # them
-                self.kappanumap[flipall] = temp # around   
+            # pair earlier and later values of kappa in blocks of 2*nl, compare them in the first block
+            blocks = self.kappanumap.reshape((-1,2*nl,n_outputs))
+            oldone,newone = blocks[:,:nl],blocks[:,nl:]
+            flip = take_along_axis(y_abs,newone[0]-1,0) > take_along_axis(y_abs,oldone[0]-1,0)
+            flip[0] = False # don't touch first one
+            temp = where(flip,newone,oldone) # then flip them around in every block
+            newone[:] = where(flip,oldone,newone)
+            oldone[:] = temp
         ## Compute Stilde
         nllstart = int(2**(self.m-self.r_lag-1))
-        self.stilde = sum(abs(self.y[self.kappanumap[nllstart:2*nllstart]-1]))
+        stilde = take_along_axis(y_abs,self.kappanumap[nllstart:2*nllstart]-1,0).sum(0)
+        self.stilde = stilde.reshape(ynext.shape[1:])[()] # a float for a single output integrand
         ## Approximate integral
-        self.solution = self.yval.mean()
+        self.solution = self.yval.mean(0)
         # update total samples
         self.n_total = 2**self.m # updated the total evaluations
         # Necessary conditions
@@ -95,11 +103,10 @@ class LDTransformData(AccumulateData):
             c_tmp = self.omg_hat(self.m-l)*self.omg_circ(self.m-l)
             c_low = 1./(1+c_tmp)
             c_up = 1./(1-c_tmp)
-            const1 = sum(abs(self.y[self.kappanumap[int(2**(l-1)):int(2**l)]-1]))
+            const1 = take_along_axis(y_abs,self.kappanumap[int(2**(l-1)):int(2**l)]-1,0).sum(0)
             idx = int(l-self.l_star)
-            self.c_stilde_low[idx] = max(self.c_stilde_low[idx],c_low*const1)
+            self.c_stilde_low[idx] = maximum(self.c_stilde_low[idx],c_low*const1)
             if c_tmp < 1:
-                self.c_stilde_up[idx] = min(self.c_stilde_up[idx],c_up*const1)
+                self.c_stilde_up[idx] = minimum(self.c_stilde_up[idx],c_up*const1)
         if (self.c_stilde_low > self.c_stilde_up).any():
             warnings.warn('An element of c_stilde_low > c_stilde_up, this function may violate the cone function. ', CubatureWarning)
-        
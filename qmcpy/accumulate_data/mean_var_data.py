@@ -1,5 +1,6 @@
 from ._accumulate_data import AccumulateData
 from ..integrand._integrand import Integrand
+from ..util import StreamingMoments
 from time import time
 from numpy import *
 
@@ -9,6 +10,8 @@ class MeanVarData(AccumulateData):
 
     parameters = ['levels','solution','n','n_total','error_bound','confid_int']
     EPS = finfo(float32).eps
+    # samples generated and evaluated at once, so memory does not grow with n
+    n_block = 2**18
 
     def __init__(self, stopping_crit, integrand, true_measure, discrete_distrib, n_init):
         """
@@ -29,29 +32,48 @@ class MeanVarData(AccumulateData):
         else:
             self.levels = 1
         self.solution = nan
-        self.muhat = full(self.levels, inf)  # sample mean
-        self.sighat = full(self.levels, inf)  # sample standard deviation
+        self.muhat = full(self.levels, inf)  # sample mean, levels x k for k integrand outputs
+        self.sighat = full(self.levels, inf)  # sample standard deviation, levels x k for k integrand outputs
         self.t_eval = zeros(self.levels)  # processing time for each integrand
         self.n = tile(n_init, self.levels) # currnet number of samples
+        self.moments_level = [None]*self.levels # moments of the samples of the current estimate on each level
         self.n_total = 0  # total number of samples
         self.confid_int = array([-inf, inf])  # confidence interval for solution
         super(MeanVarData,self).__init__()
 
-    def update_data(self):
-        """ See abstract method. """
+    def update_data(self, extend=False):
+        """
+        See abstract method. 
+
+        Args:
+            extend (bool): add the n new samples on each level to those of the previous update, 
+                rather than estimating from the new samples alone
+        """
         for l in range(self.levels):
+            if extend and self.n[l] == 0:
+                continue
             t_start = time() # time the integrand values
             if self.integrand.leveltype=='fixed-multi':
                 # reset dimension
                 new_dim = self.integrand._dim_at_level(l)
                 self.true_measure._set_dimension_r(new_dim)
-                samples = self.discrete_distrib.gen_samples(n=self.n[l])
-                y = self.integrand.f(samples,l=l).squeeze()
-            else:
-                samples = self.discrete_distrib.gen_samples(n=self.n[l])
-                y = self.integrand.f(samples).squeeze()
+            if not extend:
+                self.moments_level[l] = StreamingMoments(order=2)
+            moments = self.moments_level[l]
+            n = int(self.n[l])
+            for n_min in range(0,n,self.n_block):
+                samples = self.discrete_distrib.gen_samples(n=min(self.n_block,n-n_min))
+                if self.integrand.leveltype=='fixed-multi':
+                    y = self.integrand.f(samples,l=l)
+                else:
+                    y = self.integrand.f(samples)
+                y = y.reshape((len(samples),-1)) # f squeezes a block of one sample
+                moments.update(y[:,0] if y.shape[1]==1 else y)
             self.t_eval[l] = max( (time()-t_start)/self.n[l], self.EPS) 
-            self.sighat[l] = y.std() # compute the sample standard deviation
-            self.muhat[l] = y.mean() # compute the sample mean
+            if moments.mean.ndim>0 and self.muhat.ndim==1: # multi-output integrand, one column per output
+                self.muhat = full((self.levels,)+moments.mean.shape, inf)
+                self.sighat = full((self.levels,)+moments.mean.shape, inf)
+            self.sighat[l] = moments.std # compute the sample standard deviation
+            self.muhat[l] = moments.mean # compute the sample mean
             self.n_total += self.n[l] # add to total samples
-        self.solution = self.muhat.sum() # tentative solution
+        self.solution = self.muhat.sum(0) # tentative solution
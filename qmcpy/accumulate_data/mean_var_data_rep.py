@@ -26,7 +26,7 @@ class MeanVarDataRep(AccumulateData):
         self.discrete_distrib = discrete_distrib
         # Set Attributes
         self.replications = replications
-        self.muhat_r = zeros(int(self.replications))
+        self.muhat_r = zeros(int(self.replications)) # replications x k for k integrand outputs
         self.solution = nan
         self.muhat = inf  # sample mean
         self.sighat = inf # sample standard deviation
@@ -46,13 +46,19 @@ class MeanVarDataRep(AccumulateData):
 
     def update_data(self):
         """ See abstract method. """
+        # generate in order from the seed of each replication, then evaluate the replications together,
+        # concurrently with a thread or process backend on the integrand
+        xs = []
         for r in range(int(self.replications)):
             self.discrete_distrib.set_seed(int(self.seeds[r]))
-            x = self.discrete_distrib.gen_samples(n_min=self.n_r_prev,n_max=self.n_r)
-            y = self.integrand.f(x).squeeze()
+            xs.append(self.discrete_distrib.gen_samples(n_min=self.n_r_prev,n_max=self.n_r))
+        for r,y in enumerate(self.integrand.f_blocks(xs)):
+            y = y.squeeze()
+            if y.ndim>1 and self.muhat_r.ndim==1: # multi-output integrand, one column per output
+                self.muhat_r = zeros((int(self.replications),)+y.shape[1:])
             previous_sum_y = self.muhat_r[r] * self.n_r_prev
-            self.muhat_r[r] = (y.sum() + previous_sum_y) / self.n_r  # updated integrand-replication mean
-        self.solution = self.muhat_r.mean()  # mean of replication means
-        self.sighat = self.muhat_r.std()
+            self.muhat_r[r] = (y.sum(0) + previous_sum_y) / self.n_r  # updated integrand-replication mean
+        self.solution = self.muhat_r.mean(0)  # mean of replication means
+        self.sighat = self.muhat_r.std(0)
         self.n_r_prev = self.n_r  # updated the total evaluations
         self.n_total = self.n_r * self.replications
@@ -1,4 +1,5 @@
 from ._accumulate_data import AccumulateData
+from ..util import StreamingMoments
 from numpy import *
 from numpy.linalg import lstsq
 
@@ -12,6 +13,10 @@ class MLMCData(AccumulateData):
 
     parameters = ['levels','dimensions','n_level','mean_level','var_level',
         'cost_per_sample','n_total','alpha','beta','gamma']
+    _checkpoint_attrs = ['levels','dimensions','n_level','cost_level','diff_n_level','mean_level','var_level',
+        'cost_per_sample','alpha','beta','gamma','solution','n_total']
+    # samples generated and evaluated at once, so memory does not grow with n
+    n_block = 2**18
 
     def __init__(self, stopping_crit, integrand, true_measure, discrete_distrib, levels_init, n_init, alpha0, beta0, gamma0):
         """
@@ -36,7 +41,7 @@ class MLMCData(AccumulateData):
         self.levels = int(levels_init)
         self.dimensions = zeros(self.levels+1)
         self.n_level = zeros(self.levels+1)
-        self.sum_level = zeros((2,self.levels+1))
+        self.moments_level = [StreamingMoments(order=2) for l in range(self.levels+1)]
         self.cost_level = zeros(self.levels+1)
         self.diff_n_level = tile(n_init,self.levels+1)
         self.alpha0 = alpha0
@@ -51,22 +56,19 @@ class MLMCData(AccumulateData):
 
     def update_data(self):
         """ See abstract method. """
-        # update sample sums
-        for l in range(self.levels+1):
-            if self.diff_n_level[l] > 0:
-                # reset dimension
-                self.dimensions[l] = self.integrand._dim_at_level(l)
-                self.true_measure._set_dimension_r(self.dimensions[l])
-                # evaluate integral at sampleing points samples
-                samples = self.discrete_distrib.gen_samples(n=self.diff_n_level[l])
-                self.integrand.f(samples,l=l)
-                self.n_level[l] = self.n_level[l] + self.diff_n_level[l]
-                self.sum_level[0,l] = self.sum_level[0,l] + self.integrand.sums[0]
-                self.sum_level[1,l] = self.sum_level[1,l] + self.integrand.sums[1]
-                self.cost_level[l] = self.cost_level[l] + self.integrand.cost
+        # update sample sums, drawing samples level by level, 
+        # while a thread or process backend on the integrand starts the most expensive evaluations first
+        levels = [l for l in range(self.levels+1) if self.diff_n_level[l] > 0]
+        blocks = [(l,min(self.n_block,int(self.diff_n_level[l])-n_min)) 
+            for l in levels for n_min in range(0,int(self.diff_n_level[l]),self.n_block)]
+        for (l,n),y in zip(blocks,self.integrand.f_levels(self._gen_blocks(blocks))):
+            self.moments_level[l].update(atleast_1d(y))
+            self.cost_level[l] = self.cost_level[l] + n*self.integrand._cost_at_level(l)
+        for l in levels:
+            self.n_level[l] = self.n_level[l] + self.diff_n_level[l]
         # compute absolute average, variance and cost
-        self.mean_level = absolute(self.sum_level[0,:]/self.n_level)
-        self.var_level = maximum(0,self.sum_level[1,:]/self.n_level - self.mean_level**2)
+        self.mean_level = absolute([moments.mean for moments in self.moments_level])
+        self.var_level = array([moments.var for moments in self.moments_level])
         self.cost_per_sample = self.cost_level/self.n_level
         # fix to cope with possible zero values for self.mean_level and self.var_level
         # (can happen in some applications when there are few samples)
@@ -85,4 +87,50 @@ class MLMCData(AccumulateData):
         if self.gamma0 <= 0:
             x = lstsq(a,log2(self.cost_per_sample[1:]),rcond=None)[0]
             self.gamma = maximum(.5,x[0])
-        self.n_total = self.n_level.sum()
\ No newline at end of file
+        self.n_total = self.n_level.sum()
+
+    def _gen_blocks(self, blocks):
+        """
+        Generate samples block by block, in order, as they are evaluated. 
+
+        Args:
+            blocks (list): (level, number of samples) pairs
+        
+        Return:
+            generator: (samples, level) pairs
+        """
+        l_prev = None
+        for l,n in blocks:
+            if l != l_prev:
+                # reset dimension
+                self.dimensions[l] = self.integrand._dim_at_level(l)
+                self.true_measure._set_dimension_r(self.dimensions[l])
+                l_prev = l
+            yield self.discrete_distrib.gen_samples(n=n),l
+
+    def _get_state(self):
+        """ See parent method. The moments on each level are stored as arrays. """
+        state = super(MLMCData,self)._get_state()
+        state['moments_n'] = array([moments.n for moments in self.moments_level])
+        state['moments_mean'] = array([moments.mean for moments in self.moments_level],dtype=float)
+        state['moments_msums'] = array([moments.msums for moments in self.moments_level],dtype=float)
+        return state
+
+    def _set_state(self, state):
+        """ See parent method. """
+        super(MLMCData,self)._set_state(state)
+        self.moments_level = []
+        for n,mean,msums in zip(state['moments_n'],state['moments_mean'],state['moments_msums']):
+            moments = StreamingMoments(order=2)
+            moments.n,moments.mean,moments.msums = int(n),mean,list(msums)
+            self.moments_level.append(moments)
+
+    def _add_level(self):
+        """ Add another level to relevent attributes. """
+        self.levels += 1
+        self.dimensions = hstack((self.dimensions,0))
+        self.var_level = hstack((self.var_level,self.var_level[-1]/2**self.beta))
+        self.cost_per_sample = hstack((self.cost_per_sample,self.cost_per_sample[-1]*2**self.gamma))
+        self.n_level = hstack((self.n_level,0.))
+        self.moments_level.append(StreamingMoments(order=2))
+        self.cost_level = hstack((self.cost_level,0.))
\ No newline at end of file
@@ -10,6 +10,8 @@ class MLQMCData(AccumulateData):
     """
 
     parameters = ['levels','dimensions','n_level','mean_level','var_level','bias_estimate','n_total']
+    _checkpoint_attrs = ['levels','dimensions','n_level','eval_level','mean_level_reps','mean_level',
+        'var_level','cost_level','bias_estimate','solution','n_total','seeds']
 
     def __init__(self, stopping_crit, integrand, true_measure, discrete_distrib, n_init, replications):
         """
@@ -47,23 +49,17 @@ class MLQMCData(AccumulateData):
 
     def update_data(self):
         """ See abstract method. """
-        # update sample sums
-        for l in range(self.levels):
-            if not self.eval_level[l]:
-                # nothing to do on this level
-                continue
-            # reset dimension
-            self.dimensions[l] = self.integrand._dim_at_level(l)
-            new_dim = int(self.dimensions[l])
-            self.true_measure._set_dimension_r(new_dim)
-            n_max = self.n_init if self.n_level[l]==0 else 2*self.n_level[l]
+        # update sample sums, drawing samples level by level, 
+        # while a thread or process backend on the integrand starts the most expensive evaluations first
+        levels = [l for l in range(self.levels) if self.eval_level[l]]
+        n_min = {l:self.n_level[l] for l in levels}
+        n_max = {l:self.n_init if self.n_level[l]==0 else 2*self.n_level[l] for l in levels}
+        ys = self.integrand.f_levels(self._gen_blocks(levels,n_min,n_max))
+        for l in levels:
             for r in range(int(self.replications)):
-                self.discrete_distrib.set_seed(self.seeds[l,r]) # reset seed
-                samples = self.discrete_distrib.gen_samples(n_min=self.n_level[l],n_max=n_max)
-                self.integrand.f(samples,l=l)
-                prev_sum = self.mean_level_reps[l,r]*self.n_level[l]
-                self.mean_level_reps[l,r] = (self.integrand.sums[0]+prev_sum)/float(n_max)
-            self.n_level[l] = n_max
+                prev_sum = self.mean_level_reps[l,r]*n_min[l]
+                self.mean_level_reps[l,r] = (next(ys).sum()+prev_sum)/float(n_max[l])
+            self.n_level[l] = n_max[l]
             self.mean_level[l] = self.mean_level_reps[l].mean()
             self.var_level[l] = self.mean_level_reps[l].var()
             self.cost_level[l] = self.var_level[l]/(self.dimensions[l]*self.n_level[l])
@@ -72,6 +68,26 @@ class MLQMCData(AccumulateData):
         self.n_total = self.replications*self.n_level.sum()
         self.solution = self.mean_level.sum()
     
+    def _gen_blocks(self, levels, n_min, n_max):
+        """
+        Generate the samples of each replication on each level, in order, as they are evaluated. 
+
+        Args:
+            levels (list): levels to evaluate
+            n_min (dict): first sample index on each level
+            n_max (dict): last sample index, exclusive, on each level
+        
+        Return:
+            generator: (samples, level) pairs
+        """
+        for l in levels:
+            # reset dimension
+            self.dimensions[l] = self.integrand._dim_at_level(l)
+            self.true_measure._set_dimension_r(int(self.dimensions[l]))
+            for r in range(int(self.replications)):
+                self.discrete_distrib.set_seed(self.seeds[l,r]) # reset seed
+                yield self.discrete_distrib.gen_samples(n_min=n_min[l],n_max=n_max[l]),l
+
     def _add_level(self):
         """ Add another level to relevent attributes. """
         self.levels += 1
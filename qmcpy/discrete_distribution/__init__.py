@@ -1,5 +1,22 @@
-from .iid_std_uniform import IIDStdUniform
-from .lattice import Lattice
-from .sobol import Sobol, DigitalNet
-from .halton import Halton
-from .korobov import Korobov
\ No newline at end of file
+from importlib import import_module
+
+# public objects and the module defining each, imported on first access
+_modules = {
+    'IIDStdUniform': '.iid_std_uniform',
+    'Lattice':       '.lattice',
+    'Sobol':         '.sobol',
+    'DigitalNet':    '.sobol',
+    'Halton':        '.halton',
+    'Korobov':       '.korobov'
+}
+__all__ = list(_modules)
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError("module %r has no attribute %r"%(__name__,name))
+    value = getattr(import_module(_modules[name],__name__),name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals())|set(__all__))
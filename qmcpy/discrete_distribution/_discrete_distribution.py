@@ -2,9 +2,32 @@ from ..util import ParameterError, MethodImplementationError, _univ_repr, Dimens
 from numpy import *
 
 
+# generating matrices and vectors shared by every instance in a process, keyed by file path
+_tables = {}
+
+def _load_table(path):
+    """
+    Load a table of generating matrices or vectors once per process. 
+
+    Args:
+        path (str): path to a .npy file
+    
+    Return:
+        ndarray: read-only uint64 table
+    """
+    if path not in _tables:
+        table = load(path).astype(uint64)
+        table.flags.writeable = False
+        _tables[path] = table
+    return _tables[path]
+
+
 class DiscreteDistribution(object):
     """ Discrete Distribution abstract class. DO NOT INSTANTIATE. """
 
+    # attributes holding a table from the shared registry, mapped to the attribute holding its path
+    _shared_tables = {}
+
     def __init__(self):
         prefix = 'A concrete implementation of DiscreteDistribution must have '
         if not hasattr(self, 'mimics'):
@@ -50,6 +73,20 @@ class DiscreteDistribution(object):
         """
         raise MethodImplementationError(self, 'set_seed')
 
+    def _bind_c_lib(self):
+        """ Bind functions from the C library to attributes ending in _cf. Called on construction and unpickling. """
+        pass
+
+    def __getstate__(self):
+        # ctypes functions cannot be pickled and shared tables are reloaded by path
+        return {k:v for k,v in self.__dict__.items() if not (k.endswith('_cf') or k in self._shared_tables)}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for attr,path_attr in self._shared_tables.items():
+            setattr(self,attr,_load_table(getattr(self,path_attr)))
+        self._bind_c_lib()
+
     def __repr__(self):
         return _univ_repr(self, "DiscreteDistribution", self.parameters)
 
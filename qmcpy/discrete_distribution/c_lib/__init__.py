@@ -1 +1,8 @@
-from .load_c_lib import c_lib
\ No newline at end of file
+from .load_c_lib import c_fun
+
+
+def __getattr__(name):
+    if name == 'c_lib':
+        from .load_c_lib import c_lib
+        return c_lib
+    raise AttributeError("module %r has no attribute %r"%(__name__,name))
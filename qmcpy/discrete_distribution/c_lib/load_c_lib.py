@@ -1,5 +1,100 @@
-from ctypes import CDLL, RTLD_GLOBAL
+from ctypes import CDLL, RTLD_GLOBAL, c_int, c_long, c_uint8, c_uint32, c_uint64, c_ulong, c_double
+from numpy.ctypeslib import ndpointer
 from os.path import dirname, abspath
 from glob import glob
 
-c_lib = CDLL(glob(dirname(abspath(__file__))+'/c_lib*')[0], mode=RTLD_GLOBAL)
+# shared library, loaded on first use
+_c_lib = None
+
+def _load_c_lib():
+    global _c_lib
+    if _c_lib is None:
+        _c_lib = CDLL(glob(dirname(abspath(__file__))+'/c_lib*')[0], mode=RTLD_GLOBAL)
+    return _c_lib
+
+def __getattr__(name):
+    if name == 'c_lib':
+        return _load_c_lib()
+    raise AttributeError("module %r has no attribute %r"%(__name__,name))
+
+_doubles = ndpointer(c_double, flags='C_CONTIGUOUS')
+_ints = ndpointer(c_int, flags='C_CONTIGUOUS')
+_uint64s = ndpointer(c_uint64, flags='C_CONTIGUOUS')
+
+# argument types and return type of each function exported by c_lib
+_signatures = {
+    'get_unsigned_long_size': ([], c_uint8),
+    'get_unsigned_long_long_size': ([], c_uint8),
+    'sobol': ([
+        c_ulong, # n
+        c_uint32, # d
+        c_ulong, # n0
+        c_uint32, # d0
+        c_uint32, # randomize
+        c_uint32, # graycode
+        _uint64s, # seeds
+        _doubles, # x (result)
+        c_uint32, # d_max
+        c_uint32, # m_max
+        _uint64s, # z (generating matrix)
+        c_uint32, # msb
+        _doubles, # xjlms (result)
+        c_uint32], # set_xjlms
+        c_uint32),
+    'halton_qrng': ([
+        c_int, # n
+        c_int, # d
+        c_int, # n0
+        c_int, # generalized
+        _doubles, # res
+        c_long], # seed
+        None),
+    'halton_owen': ([
+        c_int, # n
+        c_int, # d
+        c_int, # n0
+        c_int, # d0
+        c_int, # randomize
+        _doubles, # result array
+        c_long], # seed
+        None),
+    'korobov_qrng': ([
+        c_int, # n
+        c_int, # d
+        _ints, # generator
+        c_int, # randomize
+        _doubles, # result array
+        c_uint64], # seed
+        None),
+    'fwht_copy': ([
+        c_uint32, # n
+        _doubles, # src
+        _doubles], # dst
+        None),
+    'fwht_normalize': ([
+        c_int, # n
+        _ints], # src
+        None),
+    'fwht_inplace': ([
+        c_uint32, # n
+        _doubles], # data
+        None)}
+
+# functions with their signature declared, filled on first use
+_bound = {}
+
+def c_fun(name):
+    """
+    Function exported by c_lib. The library is loaded and the signature declared once per process, on first use. 
+
+    Args:
+        name (str): name of the C function
+    
+    Return:
+        ctypes function
+    """
+    if name not in _bound:
+        f = getattr(_load_c_lib(), name)
+        f.argtypes,f.restype = _signatures[name]
+        _bound[name] = f
+    return _bound[name]
@@ -1,8 +1,7 @@
 from .._discrete_distribution import DiscreteDistribution
 from ...util import ParameterError
 from numpy import *
-from ..c_lib import c_lib
-import ctypes
+from ..c_lib import c_fun
 
 
 class Halton(DiscreteDistribution):
@@ -64,41 +63,27 @@ class Halton(DiscreteDistribution):
         if self.generalize==False and self.backend=='OWEN':
             raise ParameterError("Owen halton Must be genralized")
         if self.backend=='QRNG':
-            self.halton_cf = c_lib.halton_qrng
-            self.halton_cf.argtypes = [
-                ctypes.c_int,  # n
-                ctypes.c_int,  # d
-                ctypes.c_int, # n0
-                ctypes.c_int,  # generalized
-                ctypeslib.ndpointer(ctypes.c_double, flags='C_CONTIGUOUS'),  # res
-                ctypes.c_long]  # seed
-            self.halton_cf.restype = None
             self.g = generalize
             self.r = randomize
             self.d_lim = 360
         elif self.backend=='OWEN':
-            self.halton_cf = c_lib.halton_owen
-            self.halton_cf.argtypes = [
-                ctypes.c_int,  # n
-                ctypes.c_int,  # d
-                ctypes.c_int, # n0
-                ctypes.c_int, # d0
-                ctypes.c_int, # randomize
-                ctypeslib.ndpointer(ctypes.c_double, flags='C_CONTIGUOUS'),  # result array 
-                ctypes.c_long]  # seed
-            self.halton_cf.restype = None
             self.r = randomize
             self.d_lim = 1000
         else:
             s = "Halton randomize must be True/False or 'QRNG'/'Owen'"
             raise ParameterError(s)
         self.n_lim = 2**32
+        self._bind_c_lib()
         self._set_dimension(dimension)
         self.set_seed(seed)
         self.low_discrepancy = True
         self.mimics = 'StdUniform'
         super(Halton,self).__init__()
 
+    def _bind_c_lib(self):
+        """ Bind the Halton generator of the backend from the C library. """
+        self.halton_cf = c_fun('halton_qrng' if self.backend=='QRNG' else 'halton_owen')
+
     def gen_samples(self, n=None, n_min=0, n_max=8, warn=True):
         """
         Generate samples
@@ -1,8 +1,7 @@
 from .._discrete_distribution import DiscreteDistribution
 from ...util import ParameterError,ParameterWarning
 import warnings
-from ..c_lib import c_lib
-import ctypes
+from ..c_lib import c_fun
 from numpy import *
 
 
@@ -55,15 +54,7 @@ class Korobov(DiscreteDistribution):
                 Note: Non-randomized Korobov sequence includes origin
             seed (int): seed the random number generator for reproducibility
         """
-        self.korobov_qrng_cf = c_lib.korobov_qrng
-        self.korobov_qrng_cf.argtypes = [
-            ctypes.c_int,  # n
-            ctypes.c_int,  # d
-            ctypeslib.ndpointer(ctypes.c_int, flags='C_CONTIGUOUS'),  # generator
-            ctypes.c_int,  # randomize
-            ctypeslib.ndpointer(ctypes.c_double, flags='C_CONTIGUOUS'),  # result array 
-            ctypes.c_uint64]  # seed
-        self.korobov_qrng_cf.restype = None
+        self._bind_c_lib()
         self.generator = array(generator, dtype=int32)
         self.randomize = randomize
         self.n_lim = 2**31
@@ -74,6 +65,10 @@ class Korobov(DiscreteDistribution):
         self.mimics = 'StdUniform'
         super(Korobov,self).__init__()
 
+    def _bind_c_lib(self):
+        """ Bind the Korobov generator from the C library. """
+        self.korobov_qrng_cf = c_fun('korobov_qrng')
+
     def gen_samples(self, n=None, n_min=0, n_max=8, warn=True):
         """
         Generate samples
@@ -1,4 +1,4 @@
-from .._discrete_distribution import DiscreteDistribution
+from .._discrete_distribution import DiscreteDistribution, _load_table
 from ...util import ParameterError, ParameterWarning
 from numpy import *
 from os.path import dirname, abspath, isfile
@@ -68,6 +68,7 @@ class Lattice(DiscreteDistribution):
     """
 
     parameters = ['d','randomize','order','seed','mimics']
+    _shared_tables = {'z_full':'z_path'}
 
     def __init__(self, dimension=1, randomize=True, order='natural', seed=None, z_path=None):
         """
@@ -96,11 +97,13 @@ class Lattice(DiscreteDistribution):
             self.d_max = 750
             self.m_max = 24
             self.msb = True
-            self.z_full = load(dirname(abspath(__file__))+'/generating_vectors/lattice_vec.3600.20.npy').astype(uint64)
+            self.z_path = dirname(abspath(__file__))+'/generating_vectors/lattice_vec.3600.20.npy'
+            self.z_full = _load_table(self.z_path)
         else:
             if not isfile(z_path):
                 raise ParameterError('z_path `' + z_path + '` not found. ')
-            self.z_full = load(z_path).astype(uint64)
+            self.z_path = z_path
+            self.z_full = _load_table(z_path)
             f = z_path.split('/')[-1]
             f_lst = f.split('.')
             self.d_max = int(f_lst[-3])
@@ -1,7 +1,6 @@
-from .._discrete_distribution import DiscreteDistribution
+from .._discrete_distribution import DiscreteDistribution, _load_table
 from ...util import ParameterError, ParameterWarning
-from ..c_lib import c_lib
-import ctypes
+from ..c_lib import c_fun
 from os.path import dirname, abspath, isfile
 from numpy import *
 import warnings
@@ -77,6 +76,7 @@ class Sobol(DiscreteDistribution):
     """
     
     parameters = ['d','randomize','graycode','seed','mimics','dim0']
+    _shared_tables = {'z':'z_path'}
 
     def __init__(self, dimension=1, randomize='LMS', graycode=False, seed=None, z_path=None, dim0=0):
         """
@@ -91,31 +91,8 @@ class Sobol(DiscreteDistribution):
                 z_path sould be formatted like `gen_mat.21201.32.msb.npy` with name.d_max.m_max.msb_or_lsb.npy
             dim0 (int): first dimension
         """
-        # initialize c code
-        self.get_unsigned_long_long_size_cf = c_lib.get_unsigned_long_long_size
-        self.get_unsigned_long_long_size_cf.argtypes = []
-        self.get_unsigned_long_long_size_cf.restype = ctypes.c_uint8
-        self.get_unsigned_long_size_cf = c_lib.get_unsigned_long_size
-        self.get_unsigned_long_size_cf.argtypes = []
-        self.get_unsigned_long_size_cf.restype = ctypes.c_uint8
-        self.sobol_cf = c_lib.sobol
-        self.sobol_cf.argtypes = [
-            ctypes.c_ulong,  # n
-            ctypes.c_uint32,  # d
-            ctypes.c_ulong, # n0
-            ctypes.c_uint32, # d0
-            ctypes.c_uint32,  # randomize
-            ctypes.c_uint32, # graycode
-            ctypeslib.ndpointer(ctypes.c_uint64, flags='C_CONTIGUOUS'), # seeds
-            ctypeslib.ndpointer(ctypes.c_double, flags='C_CONTIGUOUS'),  # x (result)
-            ctypes.c_uint32, # d_max
-            ctypes.c_uint32, # m_max
-            ctypeslib.ndpointer(ctypes.c_uint64, flags='C_CONTIGUOUS'),  # z (generating matrix)
-            ctypes.c_uint32, # msb
-            ctypeslib.ndpointer(ctypes.c_double, flags='C_CONTIGUOUS'),  # xjlms (result)
-            ctypes.c_uint32] # set_xjlms
+        self._bind_c_lib()
         # set parameters
-        self.sobol_cf.restype = ctypes.c_uint32
         self._set_dimension(dimension)
         self.set_seed(seed)
         self.set_randomize(randomize)
@@ -126,11 +103,13 @@ class Sobol(DiscreteDistribution):
             self.d_max = 21201
             self.m_max = 32
             self.msb = True
-            self.z = load(dirname(abspath(__file__))+'/generating_matricies/sobol_mat.21201.32.msb.npy').astype(uint64)
+            self.z_path = dirname(abspath(__file__))+'/generating_matricies/sobol_mat.21201.32.msb.npy'
+            self.z = _load_table(self.z_path)
         else:
             if not isfile(z_path):
                 raise ParameterError('z_path `' + z_path + '` not found. ')
-            self.z = load(z_path).astype(uint64)
+            self.z_path = z_path
+            self.z = _load_table(z_path)
             f = z_path.split('/')[-1]
             f_lst = f.split('.')
             self.d_max = int(f_lst[1])
@@ -154,6 +133,12 @@ class Sobol(DiscreteDistribution):
         self.mimics = 'StdUniform'
         super(Sobol,self).__init__()        
 
+    def _bind_c_lib(self):
+        """ Bind the Sobol generator from the C library. """
+        self.get_unsigned_long_long_size_cf = c_fun('get_unsigned_long_long_size')
+        self.get_unsigned_long_size_cf = c_fun('get_unsigned_long_size')
+        self.sobol_cf = c_fun('sobol')
+
     def gen_samples(self, n=None, n_min=0, n_max=8, warn=True, return_jlms=False):
         """
         Generate samples
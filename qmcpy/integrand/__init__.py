@@ -1,6 +1,22 @@
-from .asian_option import AsianOption
-from .european_option import EuropeanOption
-from .keister import Keister
-from .linear0 import Linear0
-from .custom_fun import CustomFun
-from .ml_call_options import MLCallOptions
\ No newline at end of file
+from importlib import import_module
+
+# public objects and the module defining each, imported on first access
+_modules = {
+    'AsianOption':    '.asian_option',
+    'EuropeanOption': '.european_option',
+    'Keister':        '.keister',
+    'Linear0':        '.linear0',
+    'CustomFun':      '.custom_fun',
+    'MLCallOptions':  '.ml_call_options'
+}
+__all__ = list(_modules)
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError("module %r has no attribute %r"%(__name__,name))
+    value = getattr(import_module(_modules[name],__name__),name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals())|set(__all__))
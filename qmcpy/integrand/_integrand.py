@@ -2,11 +2,19 @@ from ..util import MethodImplementationError, _univ_repr, ParameterError
 from ..true_measure._true_measure import TrueMeasure
 from ..discrete_distribution._discrete_distribution import DiscreteDistribution
 from numpy import *
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+import copy
+import os
+import pickle
 
 
 class Integrand(object):
     """ Integrand abstract class. DO NOT INSTANTIATE. """
 
+    # g keeps no state between calls, so a block of samples may be split into row chunks
+    _chunkable = True
+
     def __init__(self):
         prefix = 'A concrete implementation of Integrand must have '
         if not (hasattr(self, 'true_measure') and isinstance(self.true_measure,TrueMeasure)):
@@ -16,6 +24,10 @@ class Integrand(object):
         if not hasattr(self,'leveltype'):
             self.leveltype = 'single'
         self.discrete_distrib = self.true_measure.discrete_distrib
+        if not hasattr(self,'chunk_size'):
+            self.set_chunk_size()
+        if not hasattr(self,'backend'):
+            self.set_backend()
 
     def g(self, t, *args, **kwargs):
         """
@@ -25,10 +37,152 @@ class Integrand(object):
             t (ndarray): n x d array of samples to be intput into orignal integrand. 
 
         Return:
-            ndarray: n vector of function evaluations
+            ndarray: n vector of function evaluations 
+                or n x k matrix of function evaluations for an integrand with k outputs
         """
         raise MethodImplementationError(self, 'g')
     
+    def set_chunk_size(self, chunk_size=None, max_chunk_bytes=None):
+        """
+        Bound the memory of f and f_periodized by evaluating samples in row chunks 
+        written to a preallocated output. Transform temporaries then scale with the chunk, not with n. 
+
+        Args:
+            chunk_size (int): maximum number of samples per chunk
+            max_chunk_bytes (int): maximum bytes of each n x d block of samples in a chunk
+        
+        Note:
+            When both are given the smaller chunk is used. Leave both as None to evaluate all samples at once. 
+        """
+        for v in [chunk_size,max_chunk_bytes]:
+            if v is not None and v < 1:
+                raise ParameterError("chunk_size and max_chunk_bytes must be positive.")
+        self.chunk_size = chunk_size
+        self.max_chunk_bytes = max_chunk_bytes
+
+    def set_backend(self, backend='serial', workers=None, shards=64):
+        """
+        Evaluate f and f_periodized concurrently. Blocks of samples are split into shards 
+        which are evaluated by a pool of workers and reassembled in order. 
+
+        Args:
+            backend (str): 'serial', 'thread' for a thread pool, or 'process' for a process pool
+            workers (int): number of workers. Defaults to the number of CPUs
+            shards (int): number of shards per block of samples, shared among the blocks of f_blocks. 
+                Shards do not depend on the number of workers, so neither does the output. 
+        
+        Note:
+            The process pool is started on first use with a pickled copy of the integrand,
+            so g is sent to each worker once, not per call. 
+            For the thread backend f_levels keeps a copy of the integrand at each dimension until the backend is reset. 
+            Worker copies follow changes in dimension, e.g. across levels, but no other changes to the integrand. 
+        """
+        backend = backend.lower()
+        if backend not in ['serial','thread','process']:
+            raise ParameterError("backend must be 'serial', 'thread', or 'process'")
+        if shards < 1 or (workers is not None and workers < 1):
+            raise ParameterError("workers and shards must be positive.")
+        self.shutdown_backend()
+        self.backend = backend
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.shards = shards
+        self._thread_copies = {} # integrand at each dimension for f_levels on the thread backend
+
+    def shutdown_backend(self):
+        """ Stop the workers of a thread or process pool. They are restarted on the next evaluation. """
+        executor = getattr(self,'_executor',None)
+        if executor is not None:
+            executor.shutdown()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.backend == 'thread':
+                self._executor = ThreadPoolExecutor(self.workers)
+            else: # process
+                try:
+                    state = pickle.dumps(self)
+                except Exception as e:
+                    raise ParameterError("The process backend requires a picklable integrand: %s"%str(e))
+                self._executor = ProcessPoolExecutor(self.workers,initializer=_init_worker,initargs=(state,))
+        return self._executor
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_executor'] = None # pools stay with the process that started them
+        state['_thread_copies'] = {}
+        return state
+
+    def _chunk_rows(self, x):
+        """ Number of rows of x to evaluate at once. """
+        n = x.shape[0]
+        if not self._chunkable:
+            return n
+        rows = n if self.chunk_size is None else int(self.chunk_size)
+        if self.max_chunk_bytes is not None:
+            row_bytes = x.dtype.itemsize*int(prod(x.shape[1:]))
+            rows = min(rows,int(self.max_chunk_bytes//max(row_bytes,1)))
+        return max(rows,2) # a one row chunk would be squeezed
+
+    def _chunked(self, fun, x, *args, **kwargs):
+        """
+        Evaluate fun over row chunks of x. 
+
+        Args:
+            fun (method): evaluation of a block of samples, e.g. self._f
+            x (ndarray): n x d array of samples from a discrete distribution
+            *args: other ordered args to fun
+            **kwargs (dict): other keyword args to fun
+
+        Return:
+            ndarray: function evaluations for all n samples
+        """
+        return self._chunked_blocks(fun,[x],*args,**kwargs)[0]
+
+    def _chunked_blocks(self, fun, xs, *args, **kwargs):
+        """
+        Evaluate fun over row chunks of each block of samples. 
+        With a thread or process backend the chunks of all blocks share one pool, 
+        so blocks are evaluated concurrently even when g is not chunkable. 
+
+        Args:
+            fun (method): evaluation of a block of samples, e.g. self._f
+            xs (list): blocks of samples, each an n x d array
+            *args: other ordered args to fun
+            **kwargs (dict): other keyword args to fun
+
+        Return:
+            list: function evaluations for all samples of each block
+        """
+        parallel = self.backend!='serial'
+        chunks = [] # (block, first row, samples)
+        for b,x in enumerate(xs):
+            n = x.shape[0]
+            rows = self._chunk_rows(x)
+            if parallel and self._chunkable:
+                rows = min(rows,max(-(-n*len(xs)//self.shards),2)) # shards are shared among the blocks
+            starts = list(range(0,n,rows))
+            if len(starts) > 1 and n-starts[-1] < 2:
+                starts.pop() # merge a one row remainder, which would be squeezed, into the previous chunk
+            chunks += [(b,i,x[i:j]) for i,j in zip(starts,starts[1:]+[n])] if len(starts) > 1 else [(b,0,x)]
+        if len(chunks) == 1: # nothing to split or share
+            return [fun(xs[0],*args,**kwargs)]
+        if not parallel:
+            ys = (fun(xc,*args,**kwargs) for b,i,xc in chunks)
+        elif self.backend == 'thread':
+            ys = self._get_executor().map(lambda chunk: fun(chunk[2],*args,**kwargs),chunks)
+        else: # process
+            ys = self._get_executor().map(partial(_worker_eval,fun.__name__,args,kwargs),(xc for b,i,xc in chunks))
+        y = [None]*len(xs)
+        for (b,i,xc),yc in zip(chunks,ys):
+            if i==0 and yc.shape[0]==xs[b].shape[0]: # the whole block
+                y[b] = yc
+                continue
+            if y[b] is None:
+                y[b] = empty((xs[b].shape[0],)+yc.shape[1:],dtype=yc.dtype)
+            y[b][i:i+xc.shape[0]] = yc
+        return y
+
     def f(self, x, *args, **kwargs):
         """
         Evalute transformed integrand based on true measures and discrete distribution 
@@ -39,18 +193,96 @@ class Integrand(object):
             **kwargs (dict): other keyword args to g
             
         Return: 
-            ndarray: length n vector of funciton evaluations
+            ndarray: length n vector of funciton evaluations, 
+                or n x k matrix of function evaluations for an integrand with k outputs
+        """
+        return self._chunked(self._f,x,*args,**kwargs)
+
+    def f_blocks(self, xs, *args, **kwargs):
         """
+        Evaluate f on several blocks of samples, e.g. one block per replication. 
+        With a thread or process backend, see set_backend, the blocks are evaluated concurrently. 
+
+        Args:
+            xs (list): blocks of samples, each an n x d array from a discrete distribution
+            *args: other ordered args to g
+            **kwargs (dict): other keyword args to g
+
+        Return:
+            list: f of each block, as returned by f
+        """
+        return self._chunked_blocks(self._f,xs,*args,**kwargs)
+
+    def f_levels(self, blocks):
+        """
+        Evaluate f of a multi-level integrand on blocks of samples from several levels. 
+        With a thread or process backend, see set_backend, the blocks are evaluated concurrently. 
+        Threads evaluate on a copy of the integrand for each dimension, so levels do not clash. 
+        The copies are made as blocks are drawn, when the integrand is at their dimension, and kept for later calls. 
+        All blocks are then drawn, in order, before the most expensive evaluations, by _cost_at_level, 
+        are started first, so the cheap ones fill in behind them. 
+        The samples therefore do not depend on the backend or the schedule. 
+
+        Args:
+            blocks (iterable): (samples, level) pairs, where samples is an n x d array 
+                generated with the integrand at the dimension of the level
+
+        Return:
+            generator: f of each block, in the order of blocks
+        """
+        if self.backend == 'serial':
+            for x,l in blocks:
+                if x.shape[1] != self.discrete_distrib.d:
+                    self.true_measure._set_dimension_r(x.shape[1])
+                yield self.f(x,l=l)
+            return
+        blocks = list(self._copy_at_dimensions(blocks)) if self.backend == 'thread' else list(blocks)
+        order = sorted(range(len(blocks)),key=lambda i: -blocks[i][0].shape[0]*self._cost_at_level(blocks[i][1]))
+        executor = self._get_executor()
+        futures = [None]*len(blocks)
+        for i in order:
+            x,l = blocks[i]
+            if self.backend == 'thread':
+                futures[i] = executor.submit(self._thread_copies[x.shape[1]]._f,x,l=l)
+            else: # process
+                futures[i] = executor.submit(_worker_eval,'_f',(),{'l':l},x)
+        for i in range(len(blocks)):
+            yield futures[i].result()
+            blocks[i] = futures[i] = None
+
+    def _copy_at_dimensions(self, blocks):
+        """
+        Copy the integrand at the dimension of each block that has no copy yet, as the blocks are drawn. 
+        Changing the dimension of a copy instead could draw from the random state of the samples. 
+
+        Args:
+            blocks (iterable): (samples, level) pairs
+        
+        Return:
+            generator: the (samples, level) pairs
+        """
+        for x,l in blocks:
+            d = x.shape[1]
+            if d not in self._thread_copies:
+                if d != self.discrete_distrib.d:
+                    self.true_measure._set_dimension_r(d)
+                self._thread_copies[d] = copy.deepcopy(self)
+            yield x,l
+
+    def _f(self, x, *args, **kwargs):
+        """ f for one chunk of samples. """
         if self.true_measure == self.true_measure.transform:
             # jacobian*weight/pdf will cancel so f(x) = g(\Psi(x))
             xtf = self.true_measure._transform(x) # get transformed samples, equivalent to self.true_measure._transform_r(x)
             y = self.g(xtf,*args,**kwargs).squeeze()
         else: # using importance sampling --> need to compute pdf, jacobian(s), and weight explicitly
-            pdf = self.discrete_distrib.pdf(x) # pdf of samples
             xtf,jacobians = self.true_measure.transform._jacobian_transform_r(x) # compute recursive transform+jacobian
             weight = self.true_measure._weight(xtf) # weight based on the true measure
-            gvals = self.g(xtf,*args,**kwargs).squeeze()
-            y = gvals*weight/pdf*jacobians
+            factor = weight*jacobians # a float when both are constant, otherwise a length n vector
+            if self.discrete_distrib.mimics != 'StdUniform': # standard uniform pdf is 1
+                factor = factor/self.discrete_distrib.pdf(x)
+            y = self.g(xtf,*args,**kwargs).squeeze()
+            y = y*self._per_sample(factor,y)
         return y.squeeze()
 
     def f_periodized(self, x, ptransform='NONE', *args, **kwargs):
@@ -64,11 +296,15 @@ class Integrand(object):
             **kwargs (dict): other keyword args to g
             
         Return: 
-            ndarray: length n vector of funciton evaluations
+            ndarray: length n vector of funciton evaluations, 
+                or n x k matrix of function evaluations for an integrand with k outputs
         """
         if self.discrete_distrib.mimics != 'StdUniform':
             raise ParameterError("f_periodized requires a discrete distribution that mimics a standard uniform measure.")
-        ptransform = ptransform.upper()
+        return self._chunked(self._f_periodized,x,ptransform.upper(),*args,**kwargs)
+
+    def _f_periodized(self, x, ptransform, *args, **kwargs):
+        """ f_periodized for one chunk of samples. """
         if ptransform == 'BAKER': # Baker's transform
             xp = 1 - 2 * abs(x - 1 / 2)
             w = 1
@@ -92,8 +328,24 @@ class Integrand(object):
             w = 1
         else:
             raise ParameterError("The %s periodization transform is not implemented"%ptransform)
-        y = self.f(xp,*args,**kwargs)*w
-        return y
+        y = self._f(xp,*args,**kwargs)
+        return y*self._per_sample(w,y)
+
+    @staticmethod
+    def _per_sample(w, y):
+        """
+        Align per-sample factors with the sample axis of function evaluations. 
+
+        Args:
+            w (ndarray/float): length n vector of factors or a constant factor
+            y (ndarray): length n vector or n x k matrix of function evaluations
+        
+        Return:
+            ndarray/float: w broadcastable against y
+        """
+        if isscalar(w) or y.ndim<2:
+            return w
+        return w.reshape((-1,)+(1,)*(y.ndim-1))
         
     def _dim_at_level(self, l):
         """
@@ -109,5 +361,34 @@ class Integrand(object):
         """
         raise MethodImplementationError(self, '_dim_at_level')
 
+    def _cost_at_level(self, l):
+        """
+        ABSTRACT METHOD to return the cost of one sample at level l, e.g. its number of time steps. 
+        Multi-level accumulators use it to total the cost on each level 
+        and to start the most expensive levels first. 
+        This method only needs to be implemented for adaptive multi-level integrands. 
+
+        Args:
+            l (int): level
+        
+        Return:
+            float: cost of one sample at level l
+        """
+        raise MethodImplementationError(self, '_cost_at_level')
+
     def __repr__(self):
         return _univ_repr(self, "Integrand", self.parameters)
+
+
+# integrand copy held by each process pool worker
+_worker_integrand = None
+
+def _init_worker(state):
+    global _worker_integrand
+    _worker_integrand = pickle.loads(state)
+
+def _worker_eval(method, args, kwargs, x):
+    """ Evaluate a shard in a process pool worker. """
+    if x.shape[1] != _worker_integrand.discrete_distrib.d:
+        _worker_integrand.true_measure._set_dimension_r(x.shape[1])
+    return getattr(_worker_integrand,method)(x,*args,**kwargs)
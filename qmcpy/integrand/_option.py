@@ -0,0 +1,106 @@
+from ._integrand import Integrand
+from ..util import ParameterError
+from numpy import *
+
+
+class Option(Integrand):
+    """
+    Financial option abstract class. DO NOT INSTANTIATE.
+
+    The volatility, strike price, and interest rate may be arrays.
+    They are broadcast against each other to a grid of parameter sets,
+    all of which are priced from the same samples.
+    Set keep_path to store the stock path from the last call to g. 
+    """
+
+    @property
+    def _chunkable(self):
+        """ See Integrand. g stores the stock path of its call when keep_path is set, so a block may not be split. """
+        return not self.keep_path
+
+    def _set_option_params(self, volatility, strike_price, interest_rate):
+        """
+        Parse option parameters into a grid of parameter sets.
+
+        Args:
+            volatility (float/ndarray): sigma, the volatility of the asset
+            strike_price (float/ndarray): strike_price, the call/put offer
+            interest_rate (float/ndarray): r, the annual interest rate
+        """
+        self.volatility = self._parse_param(volatility)
+        self.strike_price = self._parse_param(strike_price)
+        self.interest_rate = self._parse_param(interest_rate)
+        self.is_grid = not (isscalar(self.volatility) and isscalar(self.strike_price) and isscalar(self.interest_rate))
+        try:
+            grid = broadcast_arrays(atleast_1d(self.volatility),atleast_1d(self.strike_price),atleast_1d(self.interest_rate))
+        except ValueError:
+            raise ParameterError("volatility, strike_price, and interest_rate must broadcast against each other.")
+        if grid[0].ndim != 1:
+            raise ParameterError("volatility, strike_price, and interest_rate must broadcast to a 1 dimensional grid.")
+        self.grid_size = len(grid[0])
+        self._sigmas,self._strikes,self._rates = [g.copy() for g in grid]
+        self._discounts = exp(-self._rates * self.t_final)
+        # grid points with the same volatility and interest rate share a price path
+        pairs = stack((self._sigmas,self._rates),1)
+        self._pairs,self._pair_idx = unique(pairs,axis=0,return_inverse=True)
+        self._pair_idx = self._pair_idx.reshape(-1)
+        # pairs with the same volatility share the path exponentials
+        self._vols,self._pair_vol_idx = unique(self._pairs[:,0],return_inverse=True)
+        self._pair_vol_idx = self._pair_vol_idx.reshape(-1)
+
+    @staticmethod
+    def _parse_param(param):
+        return float(param) if isscalar(param) else array(param,dtype=float)
+
+    def _discounted_payoffs(self, price):
+        """
+        Discounted payoffs at every grid point, computed in place. 
+
+        Args:
+            price (ndarray): n x grid_size matrix of prices (terminal or average) at which the option is exercised. 
+                Overwritten with the payoffs. 
+
+        Return:
+            ndarray: n x grid_size matrix of discounted payoffs
+        """
+        if self.call_put == 'call':
+            y = subtract(price, self._strikes, out=price)
+        else: # put
+            y = subtract(self._strikes, price, out=price)
+        maximum(y, 0, out=y)
+        y *= self._discounts
+        return y
+
+    def _stock_paths(self, x):
+        """
+        Stock prices at the monitoring times. 
+
+        Args:
+            x (ndarray): n x d matrix of Brownian motion values at the monitoring times
+        
+        Return:
+            ndarray: n x d matrix of stock prices, or a P x n x d array with one path for each 
+                distinct (volatility, interest rate) pair of the grid
+        """
+        t = self.true_measure.time_vec
+        s = array([self.start_price * exp((r - v**2/2)*t + v*x) for v,r in self._pairs])
+        return s if self.is_grid else s[0]
+
+    def _grid_output(self, y):
+        """ Return a length n vector when option parameters are scalars, otherwise the n x grid_size matrix. """
+        return y if self.is_grid else y[:,0]
+
+    def mean_std_error(self, y):
+        """
+        Reduce discounted payoffs to estimates at each point of the parameter grid.
+        Standard errors assume y was evaluated at IID samples.
+
+        Args:
+            y (ndarray): n x grid_size matrix (or length n vector) of discounted payoffs from f
+
+        Return:
+            ndarray: length grid_size vector of sample means, the option prices
+            ndarray: length grid_size vector of standard errors of the sample means
+        """
+        n = y.shape[0]
+        return y.mean(0), y.std(0,ddof=1)/sqrt(n)
@@ -1,11 +1,11 @@
 from ..discrete_distribution import Sobol
-from ._integrand import Integrand
+from ._option import Option
 from ..true_measure import BrownianMotion
 from ..util import ParameterError
 from numpy import *
 
 
-class AsianOption(Integrand):
+class AsianOption(Option):
     """
     Asian financial option. 
 
@@ -45,36 +45,44 @@ class AsianOption(Integrand):
     ...     y2 += level_est
     >>> y2
     1.793...
+    >>> ac3 = AsianOption(Sobol(4,seed=7),strike_price=[30,35,40],volatility=[.4,.5,.5])
+    >>> y3 = ac3.f(ac3.discrete_distrib.gen_samples(2**10))
+    >>> y3.shape
+    (1024, 3)
     """
 
     parameters = ['volatility', 'call_put', 'start_price', 'strike_price',
                   'interest_rate','mean_type', 'dimensions', 'dim_fracs']
                           
     def __init__(self, sampler, volatility=0.5, start_price=30., strike_price=35.,\
-                 interest_rate=0., t_final=1, call_put='call', mean_type='arithmetic', multi_level_dimensions=None):
+                 interest_rate=0., t_final=1, call_put='call', mean_type='arithmetic', multi_level_dimensions=None, keep_path=False):
         """
         Args:
             sampler (DiscreteDistribution/TrueMeasure): A 
                 discrete distribution from which to transform samples or a
                 true measure by which to compose a transform
-            volatility (float): sigma, the volatility of the asset
+            volatility (float/ndarray): sigma, the volatility of the asset
             start_price (float): S(0), the asset value at t=0
-            strike_price (float): strike_price, the call/put offer
-            interest_rate (float): r, the annual interest rate
+            strike_price (float/ndarray): strike_price, the call/put offer
+            interest_rate (float/ndarray): r, the annual interest rate
             t_final (float): exercise time
             mean_type (string): 'arithmetic' or 'geometric' mean
             multi_level_dimensions (list of ints): list of dimensions at each level. 
                 Leave as None for single-level problems
+            keep_path (bool): store the stock path from the last call to g as s_fine
+        
+        Note:
+            Array-valued volatility, strike_price, and interest_rate are broadcast to a 
+            grid of parameter sets and f returns an n x grid_size matrix of discounted payoffs. 
         """
         self.t_final = t_final
         self.true_measure = BrownianMotion(sampler,self.t_final)
-        self.volatility = float(volatility)
+        self._set_option_params(volatility,strike_price,interest_rate)
         self.start_price = float(start_price)
-        self.strike_price = float(strike_price)
-        self.interest_rate = float(interest_rate)
         self.call_put = call_put.lower()
         if self.call_put not in ['call','put']:
             raise ParameterError("call_put must be either 'call' or 'put'")
+        self.keep_path = keep_path
         self.mean_type = mean_type.lower()
         if self.mean_type not in ['arithmetic', 'geometric']:
             raise ParameterError("mean_type must either 'arithmetic' or 'geometric'")
@@ -91,50 +99,89 @@ class AsianOption(Integrand):
             self.leveltype = 'single'
         super(AsianOption,self).__init__()        
 
-    def _get_discounted_payoffs(self, stock_path, dimension):
+    def _average_weights(self, l, d):
         """
-        Calculate the discounted payoff from the stock path. 
+        Trapezoidal weights of the monitoring times in the average price at level l. 
         
         Args:
-            stock_path (ndarray): n samples by d dimension option prices at monitoring times
-            dimension (int): number of dimensions
+            l (int): level
+            d (int): number of monitoring times, the dimension of x
         
         Return:
-            ndarray: n vector of discounted payoffs
+            ndarray: d x k matrix of weights, each column divided by its number of monitoring times. 
+                Column 0 is the fine level, column 1 the coarse level if l>0 in a multi-level problem. 
+            ndarray: length k vector of weights on the start price
         """
-        if self.mean_type == 'arithmetic':
-            avg = (self.start_price / 2. +
-                   stock_path[:, :-1].sum(1) +
-                   stock_path[:, -1] / 2.) / \
-                float(dimension)
-        elif self.mean_type == 'geometric':
-            avg = exp((log(self.start_price) / 2. +
-                       log(stock_path[:, :-1]).sum(1) +
-                       log(stock_path[:, -1]) / 2.) /
-                      float(dimension))
-        if self.call_put == 'call':
-            y_raw = maximum(avg - self.strike_price, 0)
-        else: # put
-            y_raw = maximum(self.strike_price - avg, 0)
-        y_adj = y_raw * exp(-self.interest_rate * self.t_final)
-        return y_adj
-
-    def g(self, x, l=0):
-        """ See abstract method. """
         dim_frac = self.dim_fracs[l]
         dimension = float(self.dimensions[l])
-        self.s_fine = self.start_price * exp(
-            (self.interest_rate - self.volatility ** 2 / 2.) *
-            self.true_measure.time_vec + self.volatility * x)
-        for xx,yy in zip(*where(self.s_fine<0)): # if stock becomes <=0, 0 out rest of path
-            self.s_fine[xx,yy:] = 0
-        y = self._get_discounted_payoffs(self.s_fine, dimension)
+        w = ones((d,1))
+        w[-1] = .5
+        w /= dimension
+        w0 = [.5/dimension]
         if dim_frac > 0:
-            s_course = self.s_fine[:, int(dim_frac - 1):: int(dim_frac)]
-            d_course = float(dimension) / dim_frac
-            y_course = self._get_discounted_payoffs(s_course, d_course)
-            y -= y_course
-        return y
+            d_course = dimension / dim_frac
+            w_course = zeros(d)
+            w_course[int(dim_frac-1)::int(dim_frac)] = 1.
+            w_course[-1] = .5
+            w = column_stack((w,w_course/d_course))
+            w0.append(.5/d_course)
+        return w, array(w0)
+
+    def _arithmetic_averages(self, x, w, w0):
+        """
+        Arithmetic average prices of the (volatility, interest rate) pairs. 
+        Each volatility exponentiates one reused n x d buffer, then a single product with 
+        the weights, scaled by the interest rate growth, sums fine and coarse levels for every rate at once. 
+
+        Return:
+            ndarray: n x k x P array of average prices
+        """
+        n,d = x.shape
+        k = w.shape[1]
+        t = self.true_measure.time_vec
+        avg = empty((n,k,len(self._pairs)))
+        path = empty_like(x,dtype=float)
+        for i,volatility in enumerate(self._vols):
+            p = self._pair_vol_idx==i # pairs with this volatility
+            rates = self._pairs[p,1]
+            multiply(x, volatility, out=path)
+            path -= volatility**2/2*t
+            exp(path, out=path) # stock path without interest, relative to start price
+            w_rates = (w[:,:,None]*exp(outer(t,rates))[:,None,:]).reshape(d,-1)
+            avg[:,:,p] = dot(path,w_rates).reshape(n,k,-1)
+        avg += w0[:,None]
+        avg *= self.start_price
+        return avg
+
+    def _geometric_averages(self, x, w):
+        """
+        Geometric average prices of the (volatility, interest rate) pairs. 
+        The log average is linear in the Brownian motion, so one product with the weights serves every pair. 
+
+        Return:
+            ndarray: n x k x P array of average prices
+        """
+        t = self.true_measure.time_vec
+        volatility,interest_rate = self._pairs[:,0],self._pairs[:,1]
+        avg = multiply.outer(dot(x,w), volatility) 
+        avg += outer(dot(t,w), interest_rate-volatility**2/2)
+        exp(avg, out=avg)
+        avg *= self.start_price
+        return avg
+
+    def g(self, x, l=0):
+        """ See abstract method. """
+        if self.keep_path:
+            self.s_fine = self._stock_paths(x)
+        w,w0 = self._average_weights(l,x.shape[1])
+        if self.mean_type == 'arithmetic':
+            avg = self._arithmetic_averages(x,w,w0)
+        else: # geometric
+            avg = self._geometric_averages(x,w)
+        y = self._discounted_payoffs(avg[:,0,self._pair_idx])
+        if self.dim_fracs[l] > 0:
+            y -= self._discounted_payoffs(avg[:,1,self._pair_idx])
+        return self._grid_output(y)
     
     def _dim_at_level(self, l):
         """ See abstract method. """
@@ -22,7 +22,13 @@ class CustomFun(Integrand):
         Args:
             true_measure (TrueMeasure): a TrueMeasure instance. 
             g (function): a function handle. 
+                Define g at module level (not as a lambda) to pickle the integrand, 
+                e.g. for the process backend. 
         """
         self.true_measure = true_measure
-        self.g = lambda x,*args,**kwargs: g(x,*args,**kwargs) 
+        self.custom_g = g
         super(CustomFun,self).__init__()
+
+    def g(self, t, *args, **kwargs):
+        """ See abstract method. """
+        return self.custom_g(t,*args,**kwargs)
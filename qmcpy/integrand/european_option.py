@@ -1,12 +1,9 @@
-from ._integrand import Integrand
+from ._option import Option
 from ..true_measure import BrownianMotion
-from ..discrete_distribution import Sobol
-from ..util import ParameterError
+from ..discrete_distribution import Sobol, IIDStdUniform
+from ..util import ParameterError, _norm
 from numpy import *
-from scipy.stats import norm 
-
-
-class EuropeanOption(Integrand):
+class EuropeanOption(Option):
     """
     European financial option. 
 
@@ -27,68 +24,128 @@ class EuropeanOption(Integrand):
     >>> y = eo.f(x)
     >>> y.mean()
     9.220...
+    >>> eo = EuropeanOption(Sobol(4,seed=7),strike_price=[30,35,40],interest_rate=[0,.05])
+    Traceback (most recent call last):
+        ...
+    qmcpy.util.exceptions_warnings.ParameterError: volatility, strike_price, and interest_rate must broadcast against each other.
+    >>> eo = EuropeanOption(Sobol(4,seed=7),strike_price=[30,35,40],interest_rate=[[0],[.05]])
+    Traceback (most recent call last):
+        ...
+    qmcpy.util.exceptions_warnings.ParameterError: volatility, strike_price, and interest_rate must broadcast to a 1 dimensional grid.
+    >>> eo = EuropeanOption(IIDStdUniform(4,seed=7),strike_price=[30,35,40])
+    >>> y = eo.f(eo.discrete_distrib.gen_samples(2**12))
+    >>> y.shape
+    (4096, 3)
+    >>> mean,std_error = eo.mean_std_error(y)
+    >>> (abs(mean-eo.get_exact_value()) < 3*std_error).all()
+    True
     """
 
     parameters = ['volatility', 'call_put', 'start_price', 'strike_price', 'interest_rate']
                           
     def __init__(self, sampler, volatility=0.5, start_price=30, strike_price=35,
-        interest_rate=0, t_final=1, call_put='call'):
+        interest_rate=0, t_final=1, call_put='call', keep_path=False):
         """
         Args:
             sampler (DiscreteDistribution/TrueMeasure): A 
                 discrete distribution from which to transform samples or a
                 true measure by which to compose a transform
-            volatility (float): sigma, the volatility of the asset
+            volatility (float/ndarray): sigma, the volatility of the asset
             start_price (float): S(0), the asset value at t=0
-            strike_price (float): strike_price, the call/put offer
-            interest_rate (float): r, the annual interest rate
+            strike_price (float/ndarray): strike_price, the call/put offer
+            interest_rate (float/ndarray): r, the annual interest rate
             t_final (float): exercise time
             call_put (str): 'call' or 'put' option
+            keep_path (bool): store the stock path from the last call to g as s
+        
+        Note:
+            Array-valued volatility, strike_price, and interest_rate are broadcast to a 
+            grid of parameter sets and f returns an n x grid_size matrix of discounted payoffs. 
         """
         self.t_final = t_final
         self.true_measure = BrownianMotion(sampler,t_final=self.t_final)
-        self.volatility = float(volatility)
+        self._set_option_params(volatility,strike_price,interest_rate)
         self.start_price = float(start_price)
-        self.strike_price = float(strike_price)
-        self.interest_rate = float(interest_rate)
         self.call_put = call_put.lower()
         if self.call_put not in ['call','put']:
             raise ParameterError("call_put must be either 'call' or 'put'")
+        self.keep_path = keep_path
         super(EuropeanOption,self).__init__()        
 
+    def _f(self, x, *args, **kwargs):
+        """
+        See Integrand.f. 
+        
+        When samples map directly to the Brownian motion, the payoff only needs the terminal value 
+        W(T) = mu[-1] + z A[-1], one dot product per sample for any decomposition, 
+        so the cost does not grow with the number of monitoring times. 
+        """
+        if self.true_measure != self.true_measure.transform or self.keep_path:
+            return super(EuropeanOption,self)._f(x,*args,**kwargs)
+        cols,a = self._terminal_factor()
+        w_final = self.true_measure.mu[-1] + _norm().ppf(x[:,cols])@a
+        return self._grid_output(self._terminal_payoffs(w_final)).squeeze()
+
+    def _terminal_factor(self):
+        """
+        Nonzero entries of the last row of the Brownian motion factor, cached until the covariance changes. 
+
+        Return:
+            ndarray: indices of the nonzero entries
+            ndarray: nonzero entries
+        """
+        cov = self.true_measure.cov
+        if getattr(self,'_terminal_cov',None) is not cov:
+            a = cov._factor_row(cov.d-1)
+            self._terminal_cols = flatnonzero(a)
+            self._terminal_a = a[self._terminal_cols]
+            self._terminal_cov = cov
+        return self._terminal_cols,self._terminal_a
+
     def g(self, x):
         """ See abstract method. """
-        self.s = self.start_price * exp(
-            (self.interest_rate - self.volatility ** 2 / 2) *
-            self.true_measure.time_vec + self.volatility * x)
-        for xx,yy in zip(*where(self.s<0)): # if stock becomes <=0, 0 out rest of path
-            self.s[xx,yy:] = 0
-        if self.call_put == 'call':
-            y_raw = maximum(self.s[:,-1] - self.strike_price, 0)
-        else: # put
-            y_raw = maximum(self.strike_price - self.s[:,-1], 0)
-        y_adj = y_raw * exp(-self.interest_rate * self.t_final)
-        return y_adj
+        if self.keep_path:
+            self.s = self._stock_paths(x)
+        return self._grid_output(self._terminal_payoffs(x[:,-1]))
+
+    def _terminal_payoffs(self, w_final):
+        """
+        Discounted payoffs at every grid point from the terminal Brownian motion values. 
+
+        Args:
+            w_final (ndarray): length n vector of Brownian motion values at the exercise time
+        
+        Return:
+            ndarray: n x grid_size matrix of discounted payoffs
+        """
+        t_final = self.true_measure.time_vec[-1]
+        price = multiply.outer(w_final, self._sigmas)
+        price += (self._rates - self._sigmas**2/2)*t_final
+        exp(price, out=price)
+        price *= self.start_price
+        return self._discounted_payoffs(price)
     
     def get_exact_value(self):
         """
         Get the fair price of a European call/put option.
         
         Return:
-            float: fair price
+            float/ndarray: fair price, or fair prices at each grid point
         """
-        denom = self.volatility * sqrt(self.t_final)
-        decay = self.strike_price * exp(-self.interest_rate * self.t_final)
+        from scipy.stats import norm
+        volatility,strike_price,interest_rate = self._sigmas,self._strikes,self._rates
+        denom = volatility * sqrt(self.t_final)
+        decay = strike_price * exp(-interest_rate * self.t_final)
         if self.call_put == 'call':
-            term1 = log(self.start_price / self.strike_price) + \
-                    (self.interest_rate + self.volatility**2/2) * self.t_final
-            term2 = log(self.start_price / self.strike_price) + \
-                    (self.interest_rate - self.volatility**2/2) * self.t_final
+            term1 = log(self.start_price / strike_price) + \
+                    (interest_rate + volatility**2/2) * self.t_final
+            term2 = log(self.start_price / strike_price) + \
+                    (interest_rate - volatility**2/2) * self.t_final
             fp = self.start_price * norm.cdf(term1/denom) - decay * norm.cdf(term2/denom)
         elif self.call_put == 'put':
-            term1 = log(self.strike_price / self.start_price) - \
-                    (self.interest_rate - self.volatility**2/2) * self.t_final
-            term2 = log(self.strike_price / self.start_price) - \
-                    (self.interest_rate + self.volatility**2/2) * self.t_final
+            term1 = log(strike_price / self.start_price) - \
+                    (interest_rate - volatility**2/2) * self.t_final
+            term2 = log(strike_price / self.start_price) - \
+                    (interest_rate + volatility**2/2) * self.t_final
             fp = decay * norm.cdf(term1/denom) - self.start_price * norm.cdf(term2/denom)
-        return fp
+        return fp if self.is_grid else fp[0]
@@ -3,9 +3,6 @@ from ..discrete_distribution import Sobol
 from ..true_measure import Gaussian
 from ..util import ParameterError
 from numpy import *
-from scipy.stats import norm
-
-
 class MLCallOptions(Integrand):
     """
     Various call options from finance using Milstein discretization with $2^l$ timesteps on level $l$.
@@ -69,6 +66,7 @@ class MLCallOptions(Integrand):
 
     def get_exact_value(self):
         """ Print exact analytic value, based on s0=k. """
+        from scipy.stats import norm
         d1 = (self.r+.5*self.sigma**2)*self.t / (self.sigma*sqrt(self.t))
         d2 = (self.r-0.5*self.sigma**2)*self.t / (self.sigma*sqrt(self.t))
         if self.option == 'european':
@@ -91,127 +89,151 @@ class MLCallOptions(Integrand):
                      exp(-self.r*self.t)*norm.cdf(d4) ) )
         return val
 
-    def _g_european(self, samples, l, n, d, nf, nc, hf, hc, xf, xc):
+    def _milstein_growth(self, dw, h):
+        """
+        One-step growth factors of the Milstein scheme. 
+
+        Args:
+            dw (ndarray): n x m matrix of Brownian increments
+            h (float): timestep
+        
+        Return:
+            ndarray: n x m matrix 1 + r*h + sigma*dw + sigma^2*(dw^2-h)/2, 
+                whose cumulative product along each row is the path relative to S(0)
+        """
+        growth = dw**2
+        growth -= h
+        growth *= .5*self.sigma**2
+        growth += self.sigma*dw
+        growth += 1 + self.r*h
+        return growth
+
+    def _g_european(self, samples, l, nf, hf, hc):
         """
         Implementation for European call option.
 
         Args:
-            samples (ndarray): nxd array of samples
+            samples (ndarray): n x nf array of samples
             l (int): level
-            n (int): number of samples
-            d (int): number of dimensions
-            nf (int): n fine samples = 2**level
-            nc (int): n coarse sampes = nf/2
+            nf (int): n fine timesteps = 2**level
             hf (int): fine timestep = self.t/nf
             hc (float): coarse timestep = self.t/nc
-            xf (ndarray): n vector of fine samples values = self.k
-            xc (ndarray): n vector of coarse samples = self.k
 
         Return:
             tuple: \
                 First, an ndarray of payoffs from fine paths. \
-                Second, an ndarray of payoffs from coarse paths.
+                Second, an ndarray of payoffs from coarse paths, None on level 0.
         """
         dwf = samples * sqrt(hf)
-        if l == 0:
-            dwf = dwf.squeeze()
-            xf = xf + self.r*xf*hf + self.sigma*xf*dwf + .5*self.sigma**2*xf*(dwf**2-hf)
-        else:
-            for j in range(int(nf)):
-                xf = xf + self.r*xf*hf + self.sigma*xf*dwf[:,j] + .5*self.sigma**2*xf*(dwf[:,j]**2-hf)
-                if (j%2)==1:
-                    dwc = dwf[:,j-1] + dwf[:,j]
-                    ddw = dwf[:,j-1] - dwf[:,j]
-                    xc = xc + self.r*xc*hc + self.sigma*xc*dwc + .5*self.sigma**2*xc*(dwc**2-hc)
+        xf = self.k*self._milstein_growth(dwf,hf).prod(1)
         pf = maximum(0,xf-self.k)
+        if l == 0:
+            return pf,None
+        dwc = dwf[:,0::2] + dwf[:,1::2]
+        xc = self.k*self._milstein_growth(dwc,hc).prod(1)
         pc = maximum(0,xc-self.k)
         return pf,pc
 
-    def _g_asian(self, samples, l, n, d, nf, nc, hf, hc, xf, xc):
+    def _average(self, growth, di, h):
+        """
+        Time average of a Milstein path with area corrections. 
+
+        Args:
+            growth (ndarray): n x m matrix of one-step growth factors, overwritten with the path
+            di (ndarray): n x m matrix of area increments
+            h (float): timestep
+        
+        Return:
+            ndarray: length n vector of time averages
+        """
+        x = cumprod(growth, 1, out=growth)
+        x *= self.k
+        a = h*(x.sum(1) + .5*(self.k-x[:,-1]))
+        a += self.sigma*(self.k*di[:,0] + einsum('ij,ij->i',x[:,:-1],di[:,1:]))
+        return a
+
+    def _g_asian(self, samples, l, nf, hf, hc):
         """
         Implementation for Asian call option.
 
         Args:
-            samples (ndarray): nxd array of samples
+            samples (ndarray): n x 2nf array of samples
             l (int): level
-            n (int): number of samples
-            d (int): number of dimensions
-            nf (int): n fine samples = 2**level
-            nc (int): n coarse sampes = nf/2
+            nf (int): n fine timesteps = 2**level
             hf (int): fine timestep = self.t/nf
             hc (float): coarse timestep = self.t/nc
-            xf (ndarray): n vector of fine samples values = self.k
-            xc (ndarray): n vector of coarse samples = self.k
 
         Return:
             tuple: \
                 First, an ndarray of payoffs from fine paths. \
-                Second, an ndarray of payoffs from coarse paths.
+                Second, an ndarray of payoffs from coarse paths, None on level 0.
         """
-        af = .5*hf*xf
-        ac = .5*hc*xc
-        dwf = sqrt(hf) * samples[:,:int(d/2)]
-        dif = sqrt(hf/12) * hf * samples[:,int(d/2):]
-        if l == 0:
-            dwf = dwf.squeeze()
-            dif = dif.squeeze()
-            xf0 = xf
-            xf = xf + self.r*xf*hf + self.sigma*xf*dwf + .5*self.sigma**2*xf*(dwf**2-hf)
-            vf = self.sigma*xf0
-            af = af + .5*hf*xf + vf*dif
-        else:
-            for j in range(int(nf)):
-                xf0 = xf
-                xf = xf + self.r*xf*hf + self.sigma*xf*dwf[:,j] + .5*self.sigma**2*xf*(dwf[:,j]**2-hf)
-                vf = self.sigma*xf0
-                af = af + hf*xf + vf*dif[:,j]
-                if (j%2)==1:
-                    dwc = dwf[:,j-1] + dwf[:,j]
-                    ddw = dwf[:,j-1] - dwf[:,j]
-                    xc0 = xc
-                    xc = xc + self.r*xc*hc + self.sigma*xc*dwc + .5*self.sigma**2*xc*(dwc**2-hc)
-                    vc = self.sigma*xc0
-                    dif_cs = dif[:,j-1] + dif[:,j]
-                    ac = ac + hc*xc + vc*(dif_cs + .25*hc*ddw)
-            af = af - 0.5*hf*xf
-            ac = ac - 0.5*hc*xc
+        dwf = sqrt(hf) * samples[:,:nf]
+        dif = sqrt(hf/12) * hf * samples[:,nf:]
+        af = self._average(self._milstein_growth(dwf,hf),dif,hf)
         pf = maximum(0,af-self.k)
+        if l == 0:
+            return pf,None
+        dwc = dwf[:,0::2] + dwf[:,1::2]
+        ddw = dwf[:,0::2] - dwf[:,1::2]
+        dic = dif[:,0::2] + dif[:,1::2] + .25*hc*ddw
+        ac = self._average(self._milstein_growth(dwc,hc),dic,hc)
         pc = maximum(0,ac-self.k)
         return pf,pc
 
-    def g(self, samples, l):
+    def _payoffs(self, samples, l):
         """
+        Discounted payoffs on the fine and coarse paths. 
+
         Args:
             samples (ndarray): Gaussian(0,1^2) samples
             l (int): level
-        Returns:
+
+        Return:
             tuple: \
-                First, an ndarray of length 6 vector of summary statistic sums. \
-                Second, a float of cost on this level.
+                First, an ndarray of discounted payoffs from fine paths. \
+                Second, an ndarray of discounted payoffs from coarse paths, None on level 0.
         """
-        n,d = samples.shape
         nf = 2**l # n fine
         nc = float(nf)/2 # n coarse
         hf = self.t/nf # timestep fine
         hc = self.t/nc # timestep coarse
-        xf = tile(self.k,int(n))
-        xc = xf
-        pf,pc = self.g_submodule(samples, l, n, d, nf, nc, hf, hc, xf, xc)
-        dp = exp(-self.r*self.t)*(pf-pc)
-        pf = exp(-self.r*self.t)*pf
-        if l == 0:
-            dp = pf
-        sums = zeros(6)
-        sums[0] = dp.sum()
-        sums[1] = (dp**2).sum()
-        sums[2] = (dp**3).sum()
-        sums[3] = (dp**4).sum()
-        sums[4] = pf.sum()
-        sums[5] = (pf**2).sum()
-        cost = n*nf # cost defined as number of fine timesteps
-        self.cost = cost
-        self.sums = sums
-        return dp
+        pf,pc = self.g_submodule(samples, l, nf, hf, hc)
+        pf *= exp(-self.r*self.t)
+        if l > 0:
+            pc = exp(-self.r*self.t)*pc
+        return pf,pc
+
+    def g(self, samples, l):
+        """
+        Args:
+            samples (ndarray): Gaussian(0,1^2) samples
+            l (int): level
+        Returns:
+            ndarray: length n vector of differences between discounted payoffs on fine and coarse paths, 
+                or of discounted payoffs on level 0. 
+        """
+        pf,pc = self._payoffs(samples, l)
+        return pf if l==0 else pf-pc
+
+    def level_sums(self, x, l):
+        """
+        Summary statistic sums of one block of samples on a level, e.g. for the convergence tests of [1]. 
+
+        Args:
+            x (ndarray): n x self._dim_at_level(l) array of samples from the discrete distribution
+            l (int): level
+        
+        Return:
+            tuple: \
+                First, a length 6 vector of the sums of dp, dp^2, dp^3, dp^4, pf, and pf^2, 
+                where dp is the output of g and pf are the discounted payoffs from fine paths. \
+                Second, a float of the cost of the block, n*self._cost_at_level(l).
+        """
+        pf,pc = self._payoffs(self.true_measure._transform(x), l)
+        dp = pf if l==0 else pf-pc
+        sums = array([dp.sum(), (dp**2).sum(), (dp**3).sum(), (dp**4).sum(), pf.sum(), (pf**2).sum()])
+        return sums, x.shape[0]*self._cost_at_level(l)
 
     def _dim_at_level(self, l):
         """ See abstract method. """
@@ -219,3 +241,7 @@ class MLCallOptions(Integrand):
             return 2**l
         elif self.option == 'asian':
             return 2**(l+1)
+
+    def _cost_at_level(self, l):
+        """ See abstract method. Cost is defined as the number of fine timesteps. """
+        return 2**l
@@ -1,10 +1,25 @@
-from .cub_mc_clt import CubMCCLT
-from .cub_qmc_clt import CubQMCCLT
-from .cub_mc_g import CubMCG
-from .cub_qmc_lattice_g import CubQMCLatticeG
-from .cub_qmc_sobol_g import CubQMCSobolG
-from .cub_mc_ml import CubMCML
-from .cub_qmc_ml import CubQMCML
-from .cub_qmc_bayes_lattice_g import CubBayesLatticeG
-from .cub_qmc_bayes_net_g import CubBayesNetG
+from importlib import import_module
 
+# public objects and the module defining each, imported on first access
+_modules = {
+    'CubMCCLT':         '.cub_mc_clt',
+    'CubQMCCLT':        '.cub_qmc_clt',
+    'CubMCG':           '.cub_mc_g',
+    'CubQMCLatticeG':   '.cub_qmc_lattice_g',
+    'CubQMCSobolG':     '.cub_qmc_sobol_g',
+    'CubMCML':          '.cub_mc_ml',
+    'CubQMCML':         '.cub_qmc_ml',
+    'CubBayesLatticeG': '.cub_qmc_bayes_lattice_g',
+    'CubBayesNetG':     '.cub_qmc_bayes_net_g'
+}
+__all__ = list(_modules)
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError("module %r has no attribute %r"%(__name__,name))
+    value = getattr(import_module(_modules[name],__name__),name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals())|set(__all__))
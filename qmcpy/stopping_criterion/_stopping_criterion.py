@@ -1,10 +1,17 @@
 from ..integrand._integrand import Integrand
 from ..util import DistributionCompatibilityError, ParameterError, \
                    MethodImplementationError, _univ_repr
+from numpy import isscalar, array, load, random, savez_compressed, inf
+from time import time
+import os
 
 
 class StoppingCriterion(object):
     """ Stopping Criterion abstract class. DO NOT INSTANTIATE. """
+
+    # seconds integrate may take and maximum number of integrand evaluations, None for no budget
+    time_budget = None
+    eval_budget = None
     
     def __init__(self, allowed_levels, allowed_distribs):
         """
@@ -35,20 +42,137 @@ class StoppingCriterion(object):
         if not hasattr(self,'parameters'):
             self.parameters = []
             
-    def integrate(self):
+    def integrate(self, resume=False):
         """
         ABSTRACT METHOD to determine the number of samples needed to satisfy the tolerance.
 
+        Args:
+            resume (bool): continue from the data of the previous call, e.g. after set_tolerance, 
+                and only generate the additional samples needed. 
+                Starts afresh if no previous call has completed. 
+
         Return:
             tuple: tuple containing:
                 - solution (float): approximation to the integral
-                - data (AccumulateData): an AccumulateData object
+                - data (AccumulateData): an AccumulateData object. 
+                  data.status is why integration stopped: 
+                  'converged', 'n_max', 'time_budget', or 'eval_budget'. 
+                  On a budget, the solution and error estimates are those of the samples so far. 
         """
         raise MethodImplementationError(self, 'integrate')
     
     def set_tolerance(self, *args, **kwargs):
         """ ABSTRACT METHOD to reset the absolute tolerance. """
 
+    def restore(self, path):
+        """
+        Restore the data and random state of a checkpoint written by integrate, 
+        so integrate(resume=True) continues exactly where the checkpointed run left off. 
+        Construct the stopping criterion, integrand, and discrete distribution as for the checkpointed run. 
+
+        Args:
+            path (str): checkpoint file written by integrate(checkpoint_path=path)
+        
+        Return:
+            AccumulateData: the restored data
+        """
+        with load(path) as npz:
+            state = dict(npz)
+        sname = str(state.pop('stopping_crit'))
+        if sname != type(self).__name__:
+            raise ParameterError('%s cannot restore a checkpoint written by %s.'%(type(self).__name__,sname))
+        random.set_state(('MT19937',state.pop('rng_key'),int(state.pop('rng_pos')),
+            int(state.pop('rng_has_gauss')),float(state.pop('rng_cached_gaussian'))))
+        self.data = self._new_data()
+        self.data.time_integrate = float(state.pop('time_integrate'))
+        self.data._set_state(state)
+        return self.data
+
+    def _new_data(self):
+        """ ABSTRACT METHOD to construct the AccumulateData of a fresh integration. """
+        raise MethodImplementationError(self, '_new_data')
+
+    def _budget(self, t_start, n_next, t_next=None):
+        """
+        Check the time and evaluation budgets before generating more samples. 
+        Sets data.status to the budget which the next samples do not fit in.
+
+        Args:
+            t_start (float): start time of the integration
+            n_next (float): number of samples to generate next
+            t_next (float): predicted seconds to generate and evaluate them, 
+                from the measured time per sample. Defaults to the average time per sample so far times n_next. 
+        
+        Return:
+            float: fraction of the next samples which fit in the budgets, 1 if all do
+        """
+        fracs = {}
+        if self.eval_budget is not None and n_next > 0:
+            fracs['eval_budget'] = (self.eval_budget-self.data.n_total)/float(n_next)
+        if self.time_budget is not None and n_next > 0:
+            t = time()-t_start
+            if t_next is None:
+                t_next = t*n_next/float(self.data.n_total) if self.data.n_total > 0 else 0.
+            if t_next > 0:
+                fracs['time_budget'] = (self.time_budget-t)/t_next
+            else:
+                fracs['time_budget'] = inf if t < self.time_budget else 0.
+        if not fracs or min(fracs.values()) >= 1:
+            return 1.
+        self.data.status = min(fracs, key=fracs.get)
+        return max(fracs[self.data.status],0.)
+
+    def _checkpoint(self, path, every, t_start):
+        """
+        Write the data and the random state to a checkpoint if every seconds have passed since the last one. 
+        The file is written next to path and then renamed, so path always holds a complete checkpoint. 
+
+        Args:
+            path (str): checkpoint file, None to not checkpoint
+            every (float): minimum seconds between checkpoints, 0 to always write
+            t_start (float): start time of the integration
+        """
+        if path is None or time()-self._t_checkpoint < every:
+            return
+        state = self.data._get_state()
+        _,key,pos,has_gauss,cached_gaussian = random.get_state()
+        state.update(stopping_crit=type(self).__name__, time_integrate=time()-t_start,
+            rng_key=key, rng_pos=pos, rng_has_gauss=has_gauss, rng_cached_gaussian=cached_gaussian)
+        path_tmp = str(path)+'.tmp'
+        with open(path_tmp,'wb') as f:
+            savez_compressed(f,**state)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path_tmp,path)
+        self._t_checkpoint = time()
+
+    def _resume(self, resume):
+        """
+        Whether integrate continues from the data of the previous call. 
+
+        Args:
+            resume (bool): the resume argument to integrate
+        
+        Return:
+            bool: True if resume and a previous call has completed
+        """
+        return resume and hasattr(getattr(self,'data',None),'time_integrate')
+
+    @staticmethod
+    def _parse_tol(tol):
+        """
+        Parse an error tolerance. 
+
+        Args:
+            tol (float/ndarray): a tolerance or a length k vector of tolerances, 
+                one for each output of a multi-output integrand. 
+                Outputs with infinite absolute and relative tolerance do not affect stopping.
+        
+        Return:
+            float/ndarray: tolerance as a float or a float ndarray
+        """
+        return float(tol) if isscalar(tol) else array(tol,dtype=float)
+
     def __repr__(self):
         return _univ_repr(self, "StoppingCriterion", self.parameters)
     
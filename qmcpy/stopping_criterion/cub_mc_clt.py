@@ -5,7 +5,6 @@ from ..true_measure import Gaussian, BrownianMotion
 from ..integrand import Keister, AsianOption
 from ..util import MaxSamplesWarning
 from numpy import *
-from scipy.stats import norm
 from time import time
 import warnings
 
@@ -55,21 +54,29 @@ class CubMCCLT(StoppingCriterion):
     parameters = ['inflate','alpha','abs_tol','rel_tol','n_init','n_max']
     
     def __init__(self, integrand, abs_tol=1e-2, rel_tol=0., n_init=1024., n_max=1e10,
-                 inflate=1.2, alpha=0.01):
+                 inflate=1.2, alpha=0.01, time_budget=None, eval_budget=None):
         """
         Args:
             integrand (Integrand): an instance of Integrand
             inflate (float): inflation factor when estimating variance
             alpha (float): significance level for confidence interval
-            abs_tol (float): absolute error tolerance
-            rel_tol (float): relative error tolerance
+            abs_tol (float/ndarray): absolute error tolerance, 
+                or one per output of a multi-output integrand
+            rel_tol (float/ndarray): relative error tolerance, 
+                or one per output of a multi-output integrand
             n_max (int): maximum number of samples
+            time_budget (float): seconds integrate may take, including resumed calls. 
+                Stops before an update which is predicted to exceed it. None for no budget. 
+            eval_budget (int): maximum number of integrand evaluations, including resumed calls. 
+                Unlike n_max, stopping on the budget does not warn. None for no budget. 
         """
         # Set Attributes
-        self.abs_tol = float(abs_tol)
-        self.rel_tol = float(rel_tol)
+        self.abs_tol = self._parse_tol(abs_tol)
+        self.rel_tol = self._parse_tol(rel_tol)
         self.n_init = float(n_init)
         self.n_max = float(n_max)
+        self.time_budget = time_budget
+        self.eval_budget = eval_budget
         self.alpha = float(alpha)
         self.inflate = float(inflate)
         # QMCPy Objs
@@ -81,25 +88,44 @@ class CubMCCLT(StoppingCriterion):
         allowed_distribs = ["IIDStdUniform"]
         super(CubMCCLT,self).__init__(allowed_levels, allowed_distribs)
 
-    def integrate(self):
-        """ See abstract method. """
-        # Construct AccumulateData Object to House Integration data
-        self.data = MeanVarData(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init)
-        t_start = time()
-        # Pilot Sample
-        self.data.update_data()
+    def integrate(self, resume=False):
+        """
+        See abstract method. 
+        
+        Note:
+            On resume the samples of the final estimate are extended to the sample size for the new tolerance. 
+        """
+        from scipy.stats import norm
+        resume = self._resume(resume)
+        if not resume:
+            # Construct AccumulateData Object to House Integration data
+            self.data = MeanVarData(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init)
+        t_start = time() - (self.data.time_integrate if resume else 0)
+        self.data.status = 'converged'
+        if not resume:
+            # Pilot Sample
+            self.data.update_data()
         # use cost of function values to decide how to allocate
         temp_a = self.data.t_eval ** 0.5
-        temp_b = (temp_a * self.data.sighat).sum()
+        temp_a = temp_a.reshape(temp_a.shape+(1,)*(self.data.sighat.ndim-1)) # align with outputs
+        temp_b = (temp_a * self.data.sighat).sum(0)
         # samples for computation of the mean
         # n_mu_temp := n such that confidence intervals width and conficence will be satisfied
-        tol_up = max(self.abs_tol, abs(self.data.solution) * self.rel_tol)
+        tol_up = maximum(self.abs_tol, abs(self.data.solution) * self.rel_tol)
         z_star = -norm.ppf(self.alpha / 2.)
         n_mu_temp = ceil(temp_b * (self.data.sighat / temp_a) * \
                             (z_star * self.inflate / tol_up)**2)
-        # n_mu := n_mu_temp adjusted for previous n
-        self.data.n_mu = maximum(self.data.n, n_mu_temp)
-        self.data.n += self.data.n_mu.astype(int)
+        if n_mu_temp.ndim>1: # samples are shared, so take enough for every output
+            n_mu_temp = n_mu_temp.max(1)
+        if not resume:
+            # n_mu := n_mu_temp adjusted for previous n
+            self.data.n_mu = maximum(self.data.n, n_mu_temp)
+            self.data.n += self.data.n_mu.astype(int)
+        else:
+            # extend the final samples of the previous call to n_init + n_mu samples
+            self.data.n_mu = maximum(self.data.n_mu, n_mu_temp)
+            n_prev = array([moments.n for moments in self.data.moments_level])
+            self.data.n = maximum(self.n_init + self.data.n_mu.astype(int) - n_prev, 0)
         if self.data.n_total + self.data.n.sum() > self.n_max:
             # cannot generate this many new samples
             warning_s = """
@@ -113,12 +139,20 @@ class CubMCCLT(StoppingCriterion):
             n_decease = self.data.n_total + self.data.n.sum() - self.n_max
             dec_prop = n_decease / self.data.n.sum()
             self.data.n = floor(self.data.n - self.data.n * dec_prop)
-        # Final Sample
-        self.data.update_data()
+            self.data.status = 'n_max'
+        # fit the final sample in the time and evaluation budgets, predicting its time from t_eval
+        fit = self._budget(t_start, self.data.n.sum(), (self.data.t_eval*self.data.n).sum())
+        if fit < 1:
+            self.data.n = floor(self.data.n*fit)
+        # Final Sample, which extends the pilot sample when over budget
+        self.data.update_data(extend=resume or fit<1)
+        if fit < 1:
+            self.data.n_mu = array([moments.n for moments in self.data.moments_level])
         # CLT confidence interval
-        sigma_up = (self.data.sighat ** 2 / self.data.n_mu).sum(0) ** 0.5
+        n_mu = self.data.n_mu.reshape(self.data.n_mu.shape+(1,)*(self.data.sighat.ndim-1))
+        sigma_up = (self.data.sighat ** 2 / n_mu).sum(0) ** 0.5
         self.data.error_bound = z_star * self.inflate * sigma_up
-        self.data.confid_int = self.data.solution + self.data.error_bound * array([-1, 1])
+        self.data.confid_int = stack((self.data.solution-self.data.error_bound, self.data.solution+self.data.error_bound),-1)
         self.data.time_integrate = time() - t_start
         return self.data.solution, self.data
 
@@ -127,8 +161,8 @@ class CubMCCLT(StoppingCriterion):
         See abstract method. 
         
         Args:
-            abs_tol (float): absolute tolerance. Reset if supplied, ignored if not. 
-            rel_tol (float): relative tolerance. Reset if supplied, ignored if not. 
+            abs_tol (float/ndarray): absolute tolerance. Reset if supplied, ignored if not. 
+            rel_tol (float/ndarray): relative tolerance. Reset if supplied, ignored if not. 
         """
-        if abs_tol != None: self.abs_tol = abs_tol
-        if rel_tol != None: self.rel_tol = rel_tol
\ No newline at end of file
+        if abs_tol is not None: self.abs_tol = self._parse_tol(abs_tol)
+        if rel_tol is not None: self.rel_tol = self._parse_tol(rel_tol)
\ No newline at end of file
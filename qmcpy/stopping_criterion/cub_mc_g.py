@@ -4,10 +4,8 @@ from ..discrete_distribution._discrete_distribution import DiscreteDistribution
 from ..integrand import Keister
 from ..true_measure import Gaussian
 from ..discrete_distribution import IIDStdUniform
-from ..util import _tol_fun, MaxSamplesWarning, NotYetImplemented
+from ..util import _tol_fun, MaxSamplesWarning, NotYetImplemented, ParameterError
 from numpy import *
-from scipy.optimize import fsolve
-from scipy.stats import norm
 from time import time
 import warnings
 
@@ -76,7 +74,7 @@ class CubMCG(StoppingCriterion):
 
     parameters = ['inflate','alpha','abs_tol','rel_tol','n_init','n_max']
     def __init__(self, integrand, abs_tol=1e-2, rel_tol=0., n_init=1024., n_max=1e10,
-                 inflate=1.2, alpha=0.01):
+                 inflate=1.2, alpha=0.01, time_budget=None, eval_budget=None):
         """
         Args:
             integrand (Integrand): an instance of Integrand
@@ -86,12 +84,18 @@ class CubMCG(StoppingCriterion):
             rel_tol: relative error tolerance
             n_init: initial number of samples
             n_max: maximum number of samples
+            time_budget: seconds integrate may take, including resumed calls. 
+                Stops before an update which is predicted to exceed it. None for no budget. 
+            eval_budget: maximum number of integrand evaluations, including resumed calls. 
+                Unlike n_max, stopping on the budget does not warn. None for no budget. 
         """
         # Set Attributes
         self.abs_tol = float(abs_tol)
         self.rel_tol = float(rel_tol)
         self.n_init = float(n_init)
         self.n_max = float(n_max)
+        self.time_budget = time_budget
+        self.eval_budget = eval_budget
         self.alpha = float(alpha)
         self.inflate = float(inflate)
         self.alpha_sigma = float(self.alpha) / 2.  # the uncertainty for variance estimation
@@ -107,21 +111,35 @@ class CubMCG(StoppingCriterion):
         allowed_distribs = ["IIDStdUniform"]
         super(CubMCG,self).__init__(allowed_levels, allowed_distribs)
 
-    def integrate(self):
-        """ See abstract method. """
-        # Construct AccumulateData Object to House Integration data
-        self.data = MeanVarData(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init)  # house integration data
-        t_start = time()
-        # Pilot Sample
-        self.data.update_data()
-        self.sigma_up = self.inflate * self.data.sighat
+    def integrate(self, resume=False):
+        """
+        See abstract method. 
+        
+        Note:
+            On resume the pilot sample is kept. 
+            With only an absolute tolerance, the samples of the mean estimate are extended to the new sample size. 
+            With a relative tolerance, the iteration is run again on new samples. 
+        """
+        resume = self._resume(resume)
+        if not resume:
+            # Construct AccumulateData Object to House Integration data
+            self.data = MeanVarData(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init)  # house integration data
+        t_start = time() - (self.data.time_integrate if resume else 0)
+        self.data.status = 'converged'
+        if not resume:
+            # Pilot Sample
+            self.data.update_data()
+            if self.data.sighat.ndim>1:
+                raise ParameterError("CubMCG does not support multi-output integrands.")
+            self.sigma_up = self.inflate * self.data.sighat
         if self.rel_tol == 0:
             self.alpha_mu = 1 - (1 - self.alpha) / (1 - self.alpha_sigma)
             toloversig = self.abs_tol / self.sigma_up
             # absolute error tolerance over sigma
             n, self.data.error_bound = \
                 self._nchebe(toloversig, self.alpha_mu, self.kurtmax, self.n_max, self.sigma_up)
-            self.data.n[:] = n
+            # on resume, samples of the previous mean estimate count towards n
+            self.data.n[:] = max(n-self.data.moments_level[0].n,0) if resume else n
             if self.data.n_total + self.data.n > self.n_max:
                 # cannot generate this many new samples
                 n_low = int(self.n_max-self.data.n_total)
@@ -133,7 +151,15 @@ class CubMCG(StoppingCriterion):
                 % (int(self.data.n_total), int(self.data.n), int(self.n_max), n_low)
                 warnings.warn(warning_s, MaxSamplesWarning)
                 self.data.n[:] = n_low
-            self.data.update_data()
+                self.data.status = 'n_max'
+            # fit the mean estimate in the time and evaluation budgets, predicting its time from t_eval
+            fit = self._budget(t_start, self.data.n.sum(), (self.data.t_eval*self.data.n).sum())
+            if fit < 1:
+                self.data.n[:] = floor(self.data.n*fit)
+            # the mean estimate extends the pilot sample when over budget
+            self.data.update_data(extend=resume or fit<1)
+            if fit < 1:
+                _,self.data.error_bound = self._nchebe(toloversig, self.alpha_mu, self.kurtmax, self.data.moments_level[0].n, self.sigma_up)
         else: # self.rel_tol > 0
             alphai = (self.alpha-self.alpha_sigma)/(2*(1-self.alpha_sigma)) # uncertainty to do iteration
             eps1 = self._ncbinv(1e4,alphai,self.kurtmax)
@@ -153,6 +179,14 @@ class CubMCG(StoppingCriterion):
                     warnings.warn(warning_s, MaxSamplesWarning)
                     self.data.n[:] = n_low
                     self.data.update_data()
+                    self.data.status = 'n_max'
+                    break
+                fit = self._budget(t_start, self.data.n.sum(), (self.data.t_eval*self.data.n).sum())
+                if fit < 1:
+                    # extend the previous samples by what fits in the time or evaluation budget
+                    self.data.n[:] = floor(self.data.n*fit)
+                    self.data.update_data(extend=True)
+                    _,self.data.error_bound = self._nchebe(self.data.error_bound/self.sigma_up, alphai, self.kurtmax, self.data.moments_level[0].n, self.sigma_up)
                     break
                 self.data.update_data()
                 lb_tol = _tol_fun(self.abs_tol, self.rel_tol, 0., self.data.solution-self.data.error_bound, 'max')
@@ -178,6 +212,8 @@ class CubMCG(StoppingCriterion):
         return self.data.solution, self.data
 
     def _nchebe(self, toloversig, alpha, kurtmax, n_budget, sigma_0_up):
+        from scipy.optimize import fsolve
+        from scipy.stats import norm
         ncheb = ceil(1 / (alpha * toloversig**2))  # sample size by Chebyshev's Inequality
         A = 18.1139
         A1 = 0.3328
@@ -204,6 +240,8 @@ class CubMCG(StoppingCriterion):
         return ncb, err
 
     def _ncbinv(self, n1, alpha1, kurtmax):
+        from scipy.optimize import fsolve
+        from scipy.stats import norm
         NCheb_inv = 1/sqrt(n1*alpha1)
         # use Chebyshev inequality
         A = 18.1139
@@ -5,7 +5,6 @@ from ..true_measure import Gaussian
 from ..integrand import MLCallOptions
 from ..util import MaxSamplesWarning, ParameterError, MaxLevelsWarning, ParameterWarning
 from numpy import *
-from scipy.stats import norm
 from time import time
 import warnings
 
@@ -69,7 +68,7 @@ class CubMCML(StoppingCriterion):
     parameters = ['rmse_tol','n_init','levels_min','levels_max','theta']
 
     def __init__(self, integrand, abs_tol=.05, alpha=.01, rmse_tol=None, n_init=256., n_max=1e10, 
-        levels_min=2., levels_max=10., alpha0=-1., beta0=-1., gamma0=-1.):
+        levels_min=2., levels_max=10., alpha0=-1., beta0=-1., gamma0=-1., time_budget=None, eval_budget=None):
         """
         Args:
             integrand (Integrand): integrand with multi-level g method
@@ -85,10 +84,15 @@ class CubMCML(StoppingCriterion):
             alpha0 (float): weak error is O(2^{-alpha0*level})
             beta0 (float): variance is O(2^{-bet0a*level})
             gamma0 (float): sample cost is O(2^{gamma0*level})
+            time_budget (float): seconds integrate may take, including resumed calls. 
+                Stops before an update which is predicted to exceed it. None for no budget. 
+            eval_budget (int): maximum number of integrand evaluations, including resumed calls. 
+                Unlike n_max, stopping on the budget does not warn. None for no budget. 
         
         Note:
             if alpha, beta, gamma are not positive, then they will be estimated
         """
+        from scipy.stats import norm
         if levels_min < 2:
             raise ParameterError('needs levels_min >= 2')
         if levels_max < levels_min:
@@ -102,6 +106,8 @@ class CubMCML(StoppingCriterion):
             self.rmse_tol =  float(abs_tol) / norm.ppf(1-alpha/2)
         self.n_init = float(n_init)
         self.n_max = float(n_max)
+        self.time_budget = time_budget
+        self.eval_budget = eval_budget
         self.levels_min = float(levels_min)
         self.levels_max = float(levels_max)
         self.theta = 0.25
@@ -117,15 +123,43 @@ class CubMCML(StoppingCriterion):
         allowed_distribs = ["IIDStdUniform"]
         super(CubMCML,self).__init__(allowed_levels, allowed_distribs)
     
-    def integrate(self):
-        """ See abstract method. """
-         # Construct AccumulateData Object to House Integration Data
-        self.data = MLMCData(self, self.integrand, self.true_measure, self.discrete_distrib,
-            self.levels_min, self.n_init, self.alpha0, self.beta0, self.gamma0)
-        t_start = time()
-        while self.data.diff_n_level.sum() > 0:
-            self.data.update_data()
-            self.data.n_total += self.data.diff_n_level.sum()
+    def integrate(self, resume=False, checkpoint_path=None, checkpoint_every=600.):
+        """
+        See abstract method. 
+        
+        Args:
+            resume (bool): see abstract method
+            checkpoint_path (str): file to which the data and random state are written 
+                after the update of each iteration, atomically, as a compressed .npz. 
+                Continue an interrupted run with restore(checkpoint_path) and integrate(resume=True). 
+                None to not write checkpoints. 
+            checkpoint_every (float): minimum seconds between checkpoints. 
+                A checkpoint is always written when integration ends.
+
+        Note:
+            On resume the number of samples on each level is planned for the new tolerance 
+            from the samples of the previous call, which are kept. 
+        """
+        resume = self._resume(resume)
+        if not resume:
+            self.data = self._new_data()
+        else:
+            self.data.levels -= 1 # undo the count of levels returned by the previous call
+        t_start = time() - (self.data.time_integrate if resume else 0)
+        self._t_checkpoint = time()
+        self.data.status = 'converged'
+        while resume or self.data.diff_n_level.sum() > 0:
+            if resume:
+                resume = False
+            else:
+                if self.data.n_total > 0 and self._budget(t_start, self.data.diff_n_level.sum(), self._t_next(t_start)) < 1:
+                    self._spend_budget(t_start)
+                    break
+                self.data.update_data()
+                # checkpoint with the count of levels returned, as resume expects
+                self.data.levels += 1
+                self._checkpoint(checkpoint_path, checkpoint_every, t_start)
+                self.data.levels -= 1
             # set optimal number of additional samples
             n_samples = self._get_next_samples()
             self.data.diff_n_level = maximum(0, n_samples-self.data.n_level)
@@ -138,6 +172,7 @@ class CubMCML(StoppingCriterion):
                 Note that error tolerances may no longer be satisfied""" \
                 % (int(self.data.n_total), int(self.data.diff_n_level.sum()), int(self.n_max))
                 warnings.warn(warning_s, MaxSamplesWarning)
+                self.data.status = 'n_max'
                 break
             # if (almost) converged, estimate remaining error and decide 
             # whether a new level is required
@@ -153,24 +188,50 @@ class CubMCML(StoppingCriterion):
                             'Failed to achieve weak convergence. levels == levels_max.',
                             MaxLevelsWarning)
                     else:
-                        self.data.levels += 1
-                        self.data.dimensions = hstack((self.data.dimensions,0))
-                        self.data.var_level = hstack((self.data.var_level,
-                            self.data.var_level[-1] / 2**self.data.beta))
-                        self.data.cost_per_sample = hstack((self.data.cost_per_sample, 
-                            self.data.cost_per_sample[-1] * 2**self.data.gamma))
-                        self.data.n_level = hstack((self.data.n_level, 0.))
-                        self.data.sum_level = hstack((self.data.sum_level,
-                            zeros((2,1))))
-                        self.data.cost_level = hstack((self.data.cost_level, 0.))
+                        self.data._add_level()
                         n_samples = self._get_next_samples()
                         self.data.diff_n_level = maximum(0., n_samples-self.data.n_level)
         # finally, evaluate multilevel estimator
-        self.data.solution = (self.data.sum_level[0,:]/self.data.n_level).sum()
+        self.data.solution = sum([moments.mean for moments in self.data.moments_level])
         self.data.levels += 1
         self.data.time_integrate = time() - t_start
+        self._checkpoint(checkpoint_path, 0, t_start)
         return self.data.solution,self.data
+
+    def _new_data(self):
+        """ See abstract method. """
+        # Construct AccumulateData Object to House Integration Data
+        return MLMCData(self, self.integrand, self.true_measure, self.discrete_distrib,
+            self.levels_min, self.n_init, self.alpha0, self.beta0, self.gamma0)
     
+    def _t_next(self, t_start, diff_n_level=None):
+        """ Predict the time of the next samples from the cost per sample on each level. """
+        if diff_n_level is None:
+            diff_n_level = self.data.diff_n_level
+        return (time()-t_start)*(diff_n_level*self.data.cost_per_sample).sum()/self.data.cost_level.sum()
+
+    def _spend_budget(self, t_start):
+        """
+        Generate the part of the next samples which fits in the time and evaluation budgets. 
+        First n_init samples on each level, if these fit, 
+        then parts of the rest of the allocation scaled down to the remaining budgets. 
+        """
+        diff_n_level = self.data.diff_n_level
+        n_least = minimum(diff_n_level, self.n_init)
+        if self._budget(t_start, n_least.sum(), self._t_next(t_start,n_least)) < 1:
+            return
+        self.data.diff_n_level = n_least
+        self.data.update_data()
+        diff_n_level = diff_n_level-n_least
+        while diff_n_level.sum() > 0:
+            # the time per sample is measured again after each part, so later parts predict their time better
+            fit = min(self._budget(t_start, diff_n_level.sum(), self._t_next(t_start,diff_n_level)),1)
+            self.data.diff_n_level = floor(diff_n_level*fit)
+            if self.data.diff_n_level.sum() == 0:
+                break
+            self.data.update_data()
+            diff_n_level = diff_n_level-self.data.diff_n_level
+
     def _get_next_samples(self):
         ns = ceil( sqrt(self.data.var_level/self.data.cost_per_sample) * 
                 sqrt(self.data.var_level*self.data.cost_per_sample).sum() / 
@@ -188,6 +249,7 @@ class CubMCML(StoppingCriterion):
             rel_tol (float): relative tolerance. Reset if supplied, ignored if not.
                 Takes priority over aboluste tolerance and alpha if supplied. 
         """
+        from scipy.stats import norm
         if rmse_tol != None:
             self.rmse_tol = float(rmse_tol)
         elif abs_tol != None:
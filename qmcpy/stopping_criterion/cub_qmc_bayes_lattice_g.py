@@ -1,16 +1,13 @@
 from ._stopping_criterion import StoppingCriterion
-from ..accumulate_data.ld_transform_bayes_data import LDTransformBayesData
+from ..accumulate_data.ld_transform_bayes_data import LDTransformBayesData, _extends, _extend_table
 from ..discrete_distribution import Lattice
 from ..true_measure import Gaussian
 from ..integrand import Keister
-from ..util import MaxSamplesWarning, ParameterError, ParameterWarning
+from ..util import MaxSamplesWarning, ParameterError, ParameterWarning, _fminbound_warm
 from numpy import sqrt, log2, exp, log
 from math import factorial
 import numpy as np
 from time import time
-from scipy.optimize import fminbound as fminbnd
-from scipy.stats import norm as gaussnorm
-from scipy.stats import t as tnorm
 import warnings
 
 
@@ -78,8 +75,11 @@ class CubBayesLatticeG(StoppingCriterion):
     parameters = ['abs_tol', 'rel_tol', 'n_init', 'n_max']
 
     def __init__(self, integrand, abs_tol=1e-2, rel_tol=0,
-                 n_init=2 ** 8, n_max=2 ** 22, alpha=0.01, ptransform='C1sin'):
+                 n_init=2 ** 8, n_max=2 ** 22, alpha=0.01, ptransform='C1sin', one_theta=True, use_gradient=False, debug_enable=False,
+                 time_budget=None, eval_budget=None):
         # Set Attributes
+        from scipy.stats import norm as gaussnorm
+        from scipy.stats import t as tnorm
         self.abs_tol = abs_tol
         self.rel_tol = rel_tol
         m_min = log2(n_init)
@@ -96,11 +96,13 @@ class CubBayesLatticeG(StoppingCriterion):
         self.m_max = m_max
         self.n_init = n_init  # number of samples to start with = 2^mmin
         self.n_max = n_max  # max number of samples allowed = 2^mmax
+        self.time_budget = time_budget  # seconds integrate may take, None for no budget
+        self.eval_budget = eval_budget  # max number of integrand evaluations, None for no budget
         self.alpha = alpha  # p-value, default 0.1%.
         self.order = 2  # Bernoulli kernel's order. If zero, choose order automatically
 
-        self.useGradient = False  # If true uses gradient descent in parameter search
-        self.oneTheta = True  # If true use common shape parameter for all dimensions
+        self.useGradient = use_gradient  # If true uses L-BFGS-B with the analytic gradient in parameter search
+        self.oneTheta = one_theta  # If true use common shape parameter for all dimensions
         # else allow shape parameter vary across dimensions
         self.ptransform = ptransform  # periodization transform
         self.stop_at_tol = True  # automatic mode: stop after meeting the error tolerance
@@ -114,8 +116,20 @@ class CubBayesLatticeG(StoppingCriterion):
 
         self.avoid_cancel_error = True  # avoid cancellation error in stopping criterion
         self.uncert = 0  # quantile value for the error bound
-        self.debug_enable = True  # enable debug prints
+        self.debug_enable = debug_enable  # check the kernel eigenvalues and losses, warn on NaN, Inf, or complex values
         self.data = None
+        # a-independent kernel factors of the current points, see _kernel_vals
+        self._kernel_key = None
+        self._kernel_xun = None
+        self._kernel_table = None
+        self._kernel_prev = None
+        # transforms of C1 - 1 at the shape parameter estimates, kept across doublings, see _lambda_ring
+        self._lna_mle = None
+        self._rings_prev = []
+        self._rings = []
+        self._ring_last = None
+        # points passed to stopping_criterion and their linear order, see _linear_order
+        self._xun_order = (None, None)
 
         # Credible interval : two-sided confidence, i.e., 1-alpha percent quantile
         if self.full_Bayes:
@@ -140,18 +154,33 @@ class CubBayesLatticeG(StoppingCriterion):
             raise ParameterError("CubBayesLattice_g requires discrete_distrib to have order='linear'")
 
     # computes the integral
-    def integrate(self):
-        # Construct AccumulateData Object to House Integration data
-        self.data = LDTransformBayesData(self, self.integrand, self.true_measure, self.discrete_distrib,
-            self.m_min, self.m_max, self._fft, self._merge_fft)
-        tstart = time()  # start the timer
+    def integrate(self, resume=False):
+        """
+        See abstract method. 
+        
+        Note:
+            On resume the samples of the previous call are checked against the new tolerance first, 
+            then the points are doubled from n_total. 
+        """
+        resume = self._resume(resume)
+        if not resume:
+            # Construct AccumulateData Object to House Integration data
+            self.data = LDTransformBayesData(self, self.integrand, self.true_measure, self.discrete_distrib,
+                self.m_min, self.m_max, self._fft, self._merge_fft)
+            self._lna_mle, self._rings_prev, self._rings = None, [], []
+        tstart = time() - (self.data.time_integrate if resume else 0)  # start the timer
+        self.data.status = 'converged'
 
         # Iteratively find the number of points required for the cubature to meet
         # the error threshold
         while True:
             # Update function values
-            xun_, ftilde_, m = self.data.update_data()
-            stop_flag, muhat, order_, err_bnd = self.stopping_criterion(xun_, ftilde_, m)
+            if resume:
+                resume = False
+                xun_, ftilde_, m = self.data.xun_buf[:self.data.n_total], self.data.ftilde_, self.data.m
+            else:
+                xun_, ftilde_, m = self.data.update_data()
+            stop_flag, muhat, order_, err_bnd = self.stopping_criterion(xun_, ftilde_, m, self.data.xun_order)
 
             # if stop_at_tol true, exit the loop
             # else, run for for all 'n' values.
@@ -163,6 +192,11 @@ class CubBayesLatticeG(StoppingCriterion):
                 warnings.warn(f'Already used maximum allowed sample size {2 ** self.m_max}.'
                               f' Note that error tolerances may no longer be satisfied',
                               MaxSamplesWarning)
+                self.data.status = 'n_max'
+                break
+
+            # doubling the points would go over the time or evaluation budget
+            if self._budget(tstart, 2 ** m) < 1:
                 break
 
         self.data.time_integrate = time() - tstart
@@ -171,39 +205,80 @@ class CubBayesLatticeG(StoppingCriterion):
 
         return muhat, self.data
 
+    def set_tolerance(self, abs_tol=None, rel_tol=None):
+        """
+        See abstract method. 
+        
+        Args:
+            abs_tol (float/ndarray): absolute tolerance. Reset if supplied, ignored if not. 
+            rel_tol (float/ndarray): relative tolerance. Reset if supplied, ignored if not. 
+        """
+        if abs_tol is not None: self.abs_tol = abs_tol
+        if rel_tol is not None: self.rel_tol = rel_tol
+
     @staticmethod
     def _fft(y):
-        ytilde = np.fft.fft(y)
+        ytilde = np.fft.fft(y, axis=0)  # columns are integrand outputs
         return ytilde
 
     @staticmethod
     def _merge_fft(ftilde_new, ftilde_next_new, mnext):
         # using FFT butterfly plot technique merges two halves of fft
-        ftilde_new = np.vstack([ftilde_new, ftilde_next_new])
         nl = 2 ** mnext
-        ptind = np.ndarray(shape=(2 * nl, 1), buffer=np.array([True] * nl + [False] * nl), dtype=bool)
-        coef = np.exp(-2 * np.pi * 1j * np.ndarray(shape=(nl, 1), buffer=np.arange(0, nl), dtype=int) / (2 * nl))
-        coefv = np.tile(coef, (1, 1))
-        evenval = ftilde_new[ptind].reshape((nl, 1))
-        oddval = ftilde_new[~ptind].reshape((nl, 1))
-        ftilde_new[ptind] = np.squeeze(evenval + coefv * oddval)
-        ftilde_new[~ptind] = np.squeeze(evenval - coefv * oddval)
-        return ftilde_new
-
-    # decides if the user-defined error threshold is met
-    def stopping_criterion(self, xpts, ftilde, m):
-        ftilde = ftilde.squeeze()
+        coef = np.exp(-2 * np.pi * 1j * np.arange(0, nl) / (2 * nl)).reshape((nl, 1))
+        evenval = ftilde_new
+        oddval = coef * ftilde_next_new
+        return np.vstack([evenval + oddval, evenval - oddval])
+
+    # decides if the user-defined error threshold is met by every integrand output
+    # xun_order gives the rows of xpts in linear lattice order, the order of ftilde, when they are stored in another order
+    def stopping_criterion(self, xpts, ftilde, m, xun_order=None):
+        self._xun_order = (xpts, xun_order)
+        ftilde = ftilde.reshape((2 ** m, -1))
+        n_outputs = ftilde.shape[1]
+        abs_tol = np.broadcast_to(self.abs_tol, (n_outputs,))
+        rel_tol = np.broadcast_to(self.rel_tol, (n_outputs,))
+        # each output gets its own shape parameter, warm started at its estimate for the previous sample size
+        self._rings_prev, self._rings = self._rings, []
+        lna_prev = self._lna_mle if self._lna_mle is not None else [None] * n_outputs
+        results = [self._stopping_criterion_output(xpts, ftilde[:, j], m, abs_tol[j], rel_tol[j], lna_prev[j])
+                   for j in range(n_outputs)]
+        self._lna_mle = [result[4] for result in results]
+        success = all(result[0] for result in results)
+        muhat = np.array([result[1] for result in results])
+        err_bd = np.array([result[3] for result in results])
+        if n_outputs == 1:
+            muhat, err_bd = muhat[0], err_bd[0]
+        self.data.error_bound = err_bd
+        return success, muhat, self.order, err_bd
+
+    # decides if the user-defined error threshold is met for a single output
+    def _stopping_criterion_output(self, xpts, ftilde, m, abs_tol, rel_tol, lna_prev=None):
         n = 2 ** m
         success = False
         lna_range = [-5, 5]
         r = self.order
 
-        # search for optimal shape parameter
-        lna_MLE = fminbnd(lambda lna: self.objective_function(exp(lna), xpts, ftilde)[0],
-                          x1=lna_range[0], x2=lna_range[1], xtol=1e-2, disp=0)
+        # search for optimal shape parameter, keeping the evaluation with the smallest loss
+        best = {}
 
-        aMLE = exp(lna_MLE)
-        _, vec_lambda, vec_lambda_ring, RKHS_norm = self.objective_function(aMLE, xpts, ftilde)
+        def objective(lna, grad=False):
+            out = self.objective_function(exp(lna), xpts, ftilde)
+            if not best or out[0] <= best['out'][0]:
+                best.update(lna=np.copy(lna) if grad else lna, out=out, ring=self._ring_last)
+            if grad:
+                return out[0], self.objective_grad(exp(lna), xpts, ftilde, out[1])
+            return out[0]
+
+        if self.oneTheta and not self.useGradient:
+            lna_MLE = _fminbound_warm(objective, lna_range, lna_prev, xtol=1e-2)
+        else:
+            lna_MLE = self._search_lna_grad(objective, xpts.shape[1], lna_range, lna_prev)
+        if not np.array_equal(best.get('lna'), lna_MLE):  # e.g. NaN losses
+            best.update(lna=lna_MLE, out=self.objective_function(exp(lna_MLE), xpts, ftilde), ring=self._ring_last)
+        _, vec_lambda, vec_lambda_ring, RKHS_norm = best['out']
+        if best['ring'] is not None:
+            self._rings.append((lna_MLE, best['ring']))  # merged with the new half of C1 - 1 after the next doubling
 
         # Check error criterion
         # compute DSC
@@ -240,19 +315,18 @@ class CubBayesLatticeG(StoppingCriterion):
         else:  # non zero mean case
             muhat = ftilde[0] / vec_lambda[0]
 
-        self.data.error_bound = err_bd
         muhat = np.abs(muhat)
         muminus = muhat - err_bd
         muplus = muhat + err_bd
 
-        if 2 * err_bd <= max(self.abs_tol, self.rel_tol * abs(muminus)) + max(self.abs_tol, self.rel_tol * abs(muplus)):
+        if 2 * err_bd <= max(abs_tol, rel_tol * abs(muminus)) + max(abs_tol, rel_tol * abs(muplus)):
             if err_bd == 0:
                 err_bd = np.finfo(float).eps
 
             # stopping criterion achieved
             success = True
 
-        return success, muhat, r, err_bd
+        return success, muhat, r, err_bd, lna_MLE
 
     # objective function to estimate parameter theta
     # MLE : Maximum likelihood estimation
@@ -270,26 +344,26 @@ class CubBayesLatticeG(StoppingCriterion):
         if self.GCV:
             # GCV
             temp_gcv = abs(ftilde[vec_lambda != 0] / (vec_lambda[vec_lambda != 0])) ** 2
-            loss1 = 2 * log(sum(1. / vec_lambda[vec_lambda != 0]))
-            loss2 = log(sum(temp_gcv[1:]))
+            loss1 = 2 * log(np.sum(1. / vec_lambda[vec_lambda != 0]))
+            loss2 = log(np.sum(temp_gcv[1:]))
             # ignore all zero eigenvalues
             loss = loss2 - loss1
 
             if self.arb_mean:
-                RKHS_norm = sum(temp_gcv[1:]) / n
+                RKHS_norm = np.sum(temp_gcv[1:]) / n
             else:
-                RKHS_norm = sum(temp_gcv) / n
+                RKHS_norm = np.sum(temp_gcv) / n
         else:
             # default: MLE
             if self.arb_mean:
-                RKHS_norm = sum(temp[1:]) / n
-                temp_1 = sum(temp[1:])
+                RKHS_norm = np.sum(temp[1:]) / n
+                temp_1 = np.sum(temp[1:])
             else:
-                RKHS_norm = sum(temp) / n
-                temp_1 = sum(temp)
+                RKHS_norm = np.sum(temp) / n
+                temp_1 = np.sum(temp)
 
             # ignore all zero eigenvalues
-            loss1 = sum(log(abs(vec_lambda[vec_lambda != 0])))
+            loss1 = np.sum(log(abs(vec_lambda[vec_lambda != 0])))
             loss2 = n * log(temp_1)
             loss = loss1 + loss2
 
@@ -302,21 +376,103 @@ class CubBayesLatticeG(StoppingCriterion):
 
         return loss, vec_lambda, vec_lambda_ring, RKHS_norm
 
+    def objective_grad(self, a, xun, ftilde, vec_lambda):
+        """
+        Gradient of the objective function in the log shape parameters.
+        The derivative of each eigenvalue is the transform of the derivative of C1, see kernel_grad.
+        Eigenvalues are taken to be positive, as for a positive definite kernel.
+
+        Args:
+            a (ndarray): shape parameters, one shared by all dimensions or one per dimension
+            xun (ndarray): n x d array of unshifted lattice points
+            ftilde (ndarray): transformed integrand values
+            vec_lambda (ndarray): kernel eigenvalues from objective_function
+
+        Return:
+            ndarray: gradient in log(a), with the size of a
+        """
+        n = len(ftilde)
+        nz = vec_lambda != 0
+        i0 = np.argmax(nz)  # the first nonzero eigenvalue
+        dloss = np.zeros(n)
+        if self.GCV:
+            temp_gcv = np.zeros(n)
+            temp_gcv[nz] = abs(ftilde[nz] / vec_lambda[nz]) ** 2
+            temp_gcv[i0] = 0
+            dloss[nz] = -2 * temp_gcv[nz] / (vec_lambda[nz] * np.sum(temp_gcv)) \
+                + 2 / (vec_lambda[nz] ** 2 * np.sum(1. / vec_lambda[nz]))
+        else:
+            temp = np.zeros(n)
+            temp[nz] = abs(ftilde[nz] ** 2) / vec_lambda[nz]
+            if self.arb_mean:
+                temp[i0] = 0
+            dloss[nz] = 1. / vec_lambda[nz] - n * temp[nz] / (vec_lambda[nz] * np.sum(temp))
+        grad = dloss @ self.kernel_grad(xun, self.order, a)
+        return grad if np.size(a) > 1 else np.atleast_1d(np.sum(grad))
+
+    def kernel_grad(self, xun, order, a):
+        """
+        Derivatives of the kernel eigenvalues in the log shape parameters.
+        C1 is the product over dimensions of 1 + theta_j k(x_j),
+        so its derivative in log(a_j) is theta_j k(x_j) times the factors of the other dimensions.
+
+        Args:
+            xun (ndarray): n x d array of unshifted lattice points
+            order (int): kernel order
+            a (float/ndarray): shape parameter, one shared by all dimensions or one per dimension
+
+        Return:
+            ndarray: n x d matrix whose column j is the derivative in log(a_j)
+        """
+        kernel_vals = self._kernel_vals(xun, order, self.kernType)
+        n, d = kernel_vals.shape
+        dC1 = np.broadcast_to(a * CubBayesLatticeG.kernel_func(order, self.kernType)[1], (d,)) * kernel_vals
+        factors = 1 + dC1
+        others = np.ones_like(factors)  # products of the factors of the other dimensions
+        np.cumprod(factors[:, :-1], axis=1, out=others[:, 1:])
+        others[:, :-1] *= np.cumprod(factors[:, :0:-1], axis=1)[:, ::-1]
+        dC1 *= others
+        return np.real(CubBayesLatticeG._fft(self._linear_order(xun, dC1))).reshape((n, d))
+
+    def _search_lna_grad(self, objective, d, lna_range, lna_prev):
+        """
+        L-BFGS-B search for the log shape parameters with the analytic gradient,
+        one shared by all dimensions if oneTheta, otherwise one per dimension.
+        The search is warm started at the estimate for the previous sample size,
+        or at the shared fminbound estimate for the first sample size.
+
+        Args:
+            objective (function): objective of the log shape parameters, with its gradient if grad=True
+            d (int): dimension
+            lna_range (list): bounds of each log shape parameter
+            lna_prev (float/ndarray): estimate for the previous sample size, or None
+
+        Return:
+            ndarray: log shape parameters
+        """
+        from scipy.optimize import minimize
+        k = 1 if self.oneTheta else d
+        if lna_prev is None:
+            lna_prev = _fminbound_warm(objective, lna_range, xtol=1e-2)
+        lna0 = np.array(np.broadcast_to(lna_prev, (k,)), dtype=float)
+        res = minimize(objective, lna0, args=(True,), jac=True, method='L-BFGS-B', bounds=[lna_range] * k)
+        return res.x
+
     # Computes modified kernel Km1 = K - 1
     # Useful to avoid cancellation error in the computation of (1 - n/\lambda_1)
     @staticmethod
     def kernel_t(aconst, Bern):
-        theta = aconst
         d = np.size(Bern, 1)
+        theta = np.broadcast_to(aconst, (d,))  # one shape parameter shared by all dimensions or one per dimension
 
-        Kjm1 = theta * Bern[:, 0]  # Kernel at j-dim minus One
+        Kjm1 = theta[0] * Bern[:, 0]  # Kernel at j-dim minus One
         Kj = 1 + Kjm1  # Kernel at j-dim
 
         for j in range(1, d):
             Kjm1_prev = Kjm1
             Kj_prev = Kj  # save the Kernel at the prev dim
 
-            Kjm1 = theta * Bern[:, j] * Kj_prev + Kjm1_prev
+            Kjm1 = theta[j] * Bern[:, j] * Kj_prev + Kjm1_prev
             Kj = 1 + Kjm1
 
         Km1 = Kjm1
@@ -331,45 +487,132 @@ class CubBayesLatticeG(StoppingCriterion):
     '''
 
     @staticmethod
-    def kernel(xun, order, a, avoid_cancel_error, kern_type, debug_enable):
+    def kernel_func(order, kern_type):
+        """
+        Kernel function of one coordinate and its constant multiplier.
+
+        Args:
+            order (int): kernel order
+            kern_type (int): 1 for the Bernoulli polynomial kernel, otherwise the truncated series
 
+        Return:
+            tuple: the kernel function and its constant multiplier
+        """
         if kern_type == 1:
             b_order = order * 2  # Bernoulli polynomial order as per the equation
+            if b_order not in [2, 4]:
+                raise ParameterError("CubBayesLattice_g kernel order must be 1 or 2, i.e. Bernoulli polynomial order 2 or 4.")
             const_mult = -(-1) ** (b_order / 2) * ((2 * np.pi) ** b_order) / factorial(b_order)
             if b_order == 2:
                 bern_poly = lambda x: (-x * (1 - x) + 1 / 6)
-            elif b_order == 4:
-                bern_poly = lambda x: (((x * (1 - x)) ** 2) - 1 / 30)
             else:
-                print('Error: Bernoulli order not implemented !')
+                bern_poly = lambda x: (((x * (1 - x)) ** 2) - 1 / 30)
 
             kernel_func = lambda x: bern_poly(x)
         else:
             b = order
             kernel_func = lambda x: 2 * b * (np.cos(2 * np.pi * x) - b) / (1 + b ** 2 - 2 * b * np.cos(2 * np.pi * x))
             const_mult = 1
+        return kernel_func, const_mult
+
+    def _kernel_vals(self, xun, order, kern_type):
+        """
+        Kernel factors of each point and dimension, which do not depend on the shape parameter.
+        The table is kept between calls, so the shape parameter search evaluates the kernel function once.
+        LDTransformBayesData stores the points in the order they were generated, not in linear order,
+        so after each doubling only the rows of the new points are evaluated and written after the old rows.
+
+        Args:
+            xun (ndarray): n x d array of unshifted lattice points
+            order (int): kernel order
+            kern_type (int): kernel type
+
+        Return:
+            ndarray: n x d array of kernel factors
+        """
+        key = (order, kern_type)
+        prev = self._kernel_xun
+        if prev is xun and self._kernel_key == key:
+            return self._kernel_table
+        n_prev = 0
+        self._kernel_prev = None
+        if prev is not None and self._kernel_key == key and _extends(xun, prev):
+            n_prev = prev.shape[0]
+            self._kernel_prev = prev
+        table = _extend_table(xun, self._kernel_table, n_prev)
+        table[n_prev:] = CubBayesLatticeG.kernel_func(order, kern_type)[0](xun[n_prev:])
+        self._kernel_key, self._kernel_xun, self._kernel_table = key, xun, table
+        return table
+
+    def _linear_order(self, xun, v):
+        """
+        Values at the points in linear lattice order, the order the FFT requires.
+
+        Args:
+            xun (ndarray): n x d array of unshifted lattice points
+            v (ndarray): values at the points, one per row of xun
+
+        Return:
+            ndarray: v reordered by xun_order if xun are the points of the last stopping_criterion call, otherwise v
+        """
+        xpts, xun_order = self._xun_order
+        return v if xun_order is None or xun is not xpts else v[xun_order]
+
+    def _lambda_ring(self, xun, kernel_vals, a, theta):
+        """
+        fft(C1 - 1), whose real part is the kernel eigenvalues with n subtracted from the first.
+        The transform at each shape parameter estimate is kept for the next sample size (see _stopping_criterion_output).
+        The warm started search first evaluates the previous estimate, so after the points double
+        only C1 - 1 at the new points, the odd indices in linear order, is transformed and merged with the kept transform
+        by the FFT butterfly.
+        The transform of the last call is stored in _ring_last.
+
+        Args:
+            xun (ndarray): n x d array of unshifted lattice points
+            kernel_vals (ndarray): n x d array of kernel factors from _kernel_vals
+            a (float/ndarray): shape parameter, one shared by all dimensions or one per dimension
+            theta (float/ndarray): shape parameter times the kernel constant
+
+        Return:
+            ndarray: complex length n vector fft(C1 - 1)
+        """
+        n = len(kernel_vals)
+        for lna_prev, (xun_prev, ring_prev) in self._rings_prev:
+            if np.all(abs(log(a) - lna_prev) <= 1e-12) and xun_prev is self._kernel_prev and 2 * len(ring_prev) == n:
+                ring_new = CubBayesLatticeG._fft(CubBayesLatticeG.kernel_t(theta, kernel_vals[n // 2:])[0])
+                ring = CubBayesLatticeG._merge_fft(ring_prev[:, None], ring_new[:, None], int(log2(n)) - 1)[:, 0]
+                break
+        else:
+            ring = CubBayesLatticeG._fft(self._linear_order(xun, CubBayesLatticeG.kernel_t(theta, kernel_vals)[0]))
+        self._ring_last = (xun, ring)
+        return ring
+
+    def kernel(self, xun, order, a, avoid_cancel_error, kern_type, debug_enable):
+        kernel_vals = self._kernel_vals(xun, order, kern_type)
+        const_mult = CubBayesLatticeG.kernel_func(order, kern_type)[1]
 
         if avoid_cancel_error:
             # Computes C1m1 = C1 - 1
             # C1_new = 1 + C1m1 indirectly computed in the process
-            (vec_C1m1, C1_alt) = CubBayesLatticeG.kernel_t(a * const_mult, kernel_func(xun))
             # eigenvalues must be real : Symmetric pos definite Kernel
-            vec_lambda_ring = np.real(CubBayesLatticeG._fft(vec_C1m1))
+            vec_lambda_ring = np.real(self._lambda_ring(xun, kernel_vals, a, a * const_mult))
 
             vec_lambda = vec_lambda_ring.copy()
             vec_lambda[0] = vec_lambda_ring[0] + len(vec_lambda_ring)
 
             if debug_enable:
                 # eigenvalues must be real : Symmetric pos definite Kernel
-                vec_lambda_direct = np.real(CubBayesLatticeG._fft(C1_alt))  # Note: fft output unnormalized
-                if sum(abs(vec_lambda_direct - vec_lambda)) > 1:
-                    print('Possible error: check vec_lambda_ring computation')
+                C1_alt = CubBayesLatticeG.kernel_t(a * const_mult, kernel_vals)[1]
+                vec_lambda_direct = np.real(CubBayesLatticeG._fft(self._linear_order(xun, C1_alt)))  # Note: fft output unnormalized
+                if np.sum(abs(vec_lambda_direct - vec_lambda)) > 1:
+                    self.data.alert('Possible error: check vec_lambda_ring computation')
         else:
             # direct approach to compute first row of the kernel Gram matrix
-            vec_C1 = np.prod(1 + a * const_mult * kernel_func(xun), 2)
+            vec_C1 = np.prod(1 + a * const_mult * kernel_vals, 1)
             # matlab's builtin fft is much faster and accurate
             # eigenvalues must be real : Symmetric pos definite Kernel
-            vec_lambda = np.real(CubBayesLatticeG._fft(vec_C1))
+            vec_lambda = np.real(CubBayesLatticeG._fft(self._linear_order(xun, vec_C1)))
             vec_lambda_ring = 0
+            self._ring_last = None
 
         return vec_lambda, vec_lambda_ring
@@ -6,7 +6,6 @@ from ..true_measure import Gaussian
 from ..integrand import Keister
 from ..util import MaxSamplesWarning, NotYetImplemented, ParameterWarning, ParameterError
 from numpy import *
-from scipy.stats import norm
 from time import time
 import warnings
 
@@ -54,27 +53,36 @@ class CubQMCCLT(StoppingCriterion):
     parameters = ['inflate','alpha','abs_tol','rel_tol','n_init','n_max']
 
     def __init__(self, integrand, abs_tol=1e-2, rel_tol=0., n_init=256., n_max=2**30,
-                 inflate=1.2, alpha=0.01, replications=16.):
+                 inflate=1.2, alpha=0.01, replications=16., time_budget=None, eval_budget=None):
         """
         Args:
             integrand (Integrand): an instance of Integrand
             inflate (float): inflation factor when estimating variance
             alpha (float): significance level for confidence interval
-            abs_tol (float): absolute error tolerance
-            rel_tol (float): relative error tolerance
+            abs_tol (float/ndarray): absolute error tolerance, 
+                or one per output of a multi-output integrand
+            rel_tol (float/ndarray): relative error tolerance, 
+                or one per output of a multi-output integrand
             n_max (int): maximum number of samples
             replications (int): number of replications
+            time_budget (float): seconds integrate may take, including resumed calls. 
+                Stops before an update which is predicted to exceed it. None for no budget. 
+            eval_budget (int): maximum number of integrand evaluations, including resumed calls. 
+                Unlike n_max, stopping on the budget does not warn. None for no budget. 
         """
+        from scipy.stats import norm
         # Input Checks
         if log2(n_init) % 1 != 0:
             warning_s = ' n_init must be a power of 2. Using n_init = 32'
             warnings.warn(warning_s, ParameterWarning)
             n_init = 32
         # Set Attributes
-        self.abs_tol = float(abs_tol)
-        self.rel_tol = float(rel_tol)
+        self.abs_tol = self._parse_tol(abs_tol)
+        self.rel_tol = self._parse_tol(rel_tol)
         self.n_init = float(n_init)
         self.n_max = float(n_max)
+        self.time_budget = time_budget
+        self.eval_budget = eval_budget
         self.alpha = float(alpha)
         self.z_star = -norm.ppf(self.alpha / 2)
         self.inflate = float(inflate)
@@ -90,16 +98,28 @@ class CubQMCCLT(StoppingCriterion):
         if not self.discrete_distrib.randomize:
             raise ParameterError("CLTRep requires distribution to have randomize=True")
          
-    def integrate(self):
-        """ See abstract method. """
-        # Construct AccumulateData Object to House Integration data
-        self.data = MeanVarDataRep(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init, self.replications)
-        t_start = time()
+    def integrate(self, resume=False):
+        """
+        See abstract method. 
+        
+        Note:
+            On resume the samples of the previous call are checked against the new tolerance first, 
+            then each replication is extended from n_r. 
+        """
+        resume = self._resume(resume)
+        if not resume:
+            # Construct AccumulateData Object to House Integration data
+            self.data = MeanVarDataRep(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init, self.replications)
+        t_start = time() - (self.data.time_integrate if resume else 0)
+        self.data.status = 'converged'
         while True:
-            self.data.update_data()
+            if resume:
+                resume = False
+            else:
+                self.data.update_data()
             self.data.error_bound = self.z_star * self.inflate * self.data.sighat / sqrt(self.data.replications)
-            tol_up = max(self.abs_tol, abs(self.data.solution) * self.rel_tol)
-            if self.data.error_bound < tol_up:
+            tol_up = maximum(self.abs_tol, abs(self.data.solution) * self.rel_tol)
+            if (self.data.error_bound < tol_up).all():
                 # sufficiently estimated
                 break
             elif 2 * self.data.n_total > self.n_max:
@@ -111,12 +131,16 @@ class CubQMCCLT(StoppingCriterion):
                 Note that error tolerances may not be satisfied""" \
                 % (int(self.data.n_total), int(self.data.n_total), int(self.n_max))
                 warnings.warn(warning_s, MaxSamplesWarning)
+                self.data.status = 'n_max'
+                break
+            elif self._budget(t_start, self.data.n_total) < 1:
+                # doubling samples would go over the time or evaluation budget
                 break
             else:
                 # double sample size
                 self.data.n_r *= 2
         # CLT confidence interval
-        self.data.confid_int = self.data.solution +  self.data.error_bound * array([-1., 1.])
+        self.data.confid_int = stack((self.data.solution-self.data.error_bound, self.data.solution+self.data.error_bound),-1)
         self.data.time_integrate = time() - t_start
         return self.data.solution, self.data
     
@@ -125,8 +149,8 @@ class CubQMCCLT(StoppingCriterion):
         See abstract method. 
         
         Args:
-            abs_tol (float): absolute tolerance. Reset if supplied, ignored if not. 
-            rel_tol (float): relative tolerance. Reset if supplied, ignored if not. 
+            abs_tol (float/ndarray): absolute tolerance. Reset if supplied, ignored if not. 
+            rel_tol (float/ndarray): relative tolerance. Reset if supplied, ignored if not. 
         """
-        if abs_tol != None: self.abs_tol = abs_tol
-        if rel_tol != None: self.rel_tol = rel_tol
\ No newline at end of file
+        if abs_tol is not None: self.abs_tol = self._parse_tol(abs_tol)
+        if rel_tol is not None: self.rel_tol = self._parse_tol(rel_tol)
\ No newline at end of file
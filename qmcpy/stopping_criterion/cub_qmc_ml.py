@@ -5,7 +5,6 @@ from ..true_measure import Gaussian
 from ..integrand import MLCallOptions
 from ..util import MaxSamplesWarning, ParameterError
 from numpy import *
-from scipy.stats import norm
 from time import time
 import warnings
 
@@ -63,7 +62,7 @@ class CubQMCML(StoppingCriterion):
 
     parameters = ['rmse_tol','n_init','n_max','replications']
 
-    def __init__(self, integrand, abs_tol=.05, alpha=.01, rmse_tol=None, n_init=256., n_max=1e10, replications=32.):
+    def __init__(self, integrand, abs_tol=.05, alpha=.01, rmse_tol=None, n_init=256., n_max=1e10, replications=32., time_budget=None, eval_budget=None):
         """
         Args:
             integrand (Integrand): integrand with multi-level g method
@@ -75,7 +74,12 @@ class CubQMCML(StoppingCriterion):
                 in favor of the rmse tolerance
             n_max (int): maximum number of samples
             replications (int): number of replications on each level
+            time_budget (float): seconds integrate may take, including resumed calls. 
+                Stops before an update which is predicted to exceed it. None for no budget. 
+            eval_budget (int): maximum number of integrand evaluations, including resumed calls. 
+                Unlike n_max, stopping on the budget does not warn. None for no budget. 
         """
+        from scipy.stats import norm
         # initialization
         if rmse_tol:
             self.rmse_tol = float(rmse_tol)
@@ -83,6 +87,8 @@ class CubQMCML(StoppingCriterion):
             self.rmse_tol =  float(abs_tol) / norm.ppf(1-alpha/2)
         self.n_init = float(n_init)
         self.n_max = float(n_max)
+        self.time_budget = time_budget
+        self.eval_budget = eval_budget
         self.replications = float(replications)
         # QMCPy Objs
         self.integrand = integrand
@@ -93,13 +99,42 @@ class CubQMCML(StoppingCriterion):
         allowed_distribs = ["Lattice", "Sobol","Halton"]
         super(CubQMCML,self).__init__(allowed_levels, allowed_distribs)
 
-    def integrate(self):
-        """ See abstract method. """
-        # Construct AccumulateData Object to House Integration Data
-        self.data = MLQMCData(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init, self.replications)
-        t_start = time()
+    def integrate(self, resume=False, checkpoint_path=None, checkpoint_every=600.):
+        """
+        See abstract method. 
+        
+        Args:
+            resume (bool): see abstract method
+            checkpoint_path (str): file to which the data and random state are written 
+                after the update of each iteration, atomically, as a compressed .npz. 
+                Continue an interrupted run with restore(checkpoint_path) and integrate(resume=True). 
+                None to not write checkpoints. 
+            checkpoint_every (float): minimum seconds between checkpoints. 
+                A checkpoint is always written when integration ends.
+
+        Note:
+            On resume the samples of the previous call are checked against the new tolerance first, 
+            then the sequences on each level are extended from n_level. 
+        """
+        resume = self._resume(resume)
+        if not resume:
+            self.data = self._new_data()
+        t_start = time() - (self.data.time_integrate if resume else 0)
+        self._t_checkpoint = time()
+        self.data.status = 'converged'
         while True:
-            self.data.update_data()
+            if resume:
+                resume = False
+            else:
+                if self.data.n_total > 0:
+                    # predict the time of the next samples from their dimension on each level
+                    n_next = self.data.replications*self.data.eval_level*where(self.data.n_level==0,self.data.n_init,self.data.n_level)
+                    dims = array([self.integrand._dim_at_level(l) for l in range(self.data.levels)])
+                    t_next = (time()-t_start)*(n_next*dims).sum()/(self.data.replications*self.data.n_level*dims).sum()
+                    if self._budget(t_start, n_next.sum(), t_next) < 1:
+                        break
+                self.data.update_data()
+                self._checkpoint(checkpoint_path, checkpoint_every, t_start)
             self.data.eval_level[:] = False
             if self.data.var_level.sum() > (self.rmse_tol**2/2.):
                 # double N_l on level with largest V_l/(2^l*N_l)
@@ -120,9 +155,16 @@ class CubQMCML(StoppingCriterion):
                 Note that error tolerances may no longer be satisfied""" \
                 % (int(self.data.n_total), int(total_next_samples), int(self.n_max))
                 warnings.warn(warning_s, MaxSamplesWarning)
+                self.data.status = 'n_max'
                 break
         self.data.time_integrate = time() - t_start
+        self._checkpoint(checkpoint_path, 0, t_start)
         return self.data.solution,self.data
+
+    def _new_data(self):
+        """ See abstract method. """
+        # Construct AccumulateData Object to House Integration Data
+        return MLQMCData(self, self.integrand, self.true_measure, self.discrete_distrib, self.n_init, self.replications)
     
     def set_tolerance(self, abs_tol=None, alpha=.01, rmse_tol=None):
         """
@@ -136,6 +178,7 @@ class CubQMCML(StoppingCriterion):
             rel_tol (float): relative tolerance. Reset if supplied, ignored if not.
                 Takes priority over aboluste tolerance and alpha if supplied. 
         """
+        from scipy.stats import norm
         if rmse_tol != None:
             self.rmse_tol = float(rmse_tol)
         elif abs_tol != None:
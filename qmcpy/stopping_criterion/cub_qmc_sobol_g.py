@@ -1,6 +1,6 @@
 from ._stopping_criterion import StoppingCriterion
 from ..accumulate_data import LDTransformData
-from ..util import MaxSamplesWarning, ParameterError, ParameterWarning
+from ..util import MaxSamplesWarning, ParameterError, ParameterWarning, _fudge
 from ..discrete_distribution import Sobol
 from ..true_measure import Gaussian
 from ..integrand import Keister
@@ -79,22 +79,28 @@ class CubQMCSobolG(StoppingCriterion):
 
 
     def __init__(self, integrand, abs_tol=1e-2, rel_tol=0., n_init=2.**10, n_max=2.**35,
-                 fudge=lambda m: 5.*2.**(-m), check_cone=False):
+                 fudge=_fudge, check_cone=False, time_budget=None, eval_budget=None):
         """
         Args:
             integrand (Integrand): an instance of Integrand
-            abs_tol (float): absolute error tolerance
-            rel_tol (float): relative error tolerance
+            abs_tol (float/ndarray): absolute error tolerance, 
+                or one per output of a multi-output integrand
+            rel_tol (float/ndarray): relative error tolerance, 
+                or one per output of a multi-output integrand
             n_init (int): initial number of samples
             n_max (int): maximum number of samples
             fudge (function): positive function multiplying the finite
                               sum of Fast Fourier coefficients specified 
                               in the cone of functions
             check_cone (boolean): check if the function falls in the cone
+            time_budget (float): seconds integrate may take, including resumed calls. 
+                Stops before an update which is predicted to exceed it. None for no budget. 
+            eval_budget (int): maximum number of integrand evaluations, including resumed calls. 
+                Unlike n_max, stopping on the budget does not warn. None for no budget. 
         """
         # Input Checks
-        self.abs_tol = float(abs_tol)
-        self.rel_tol = float(rel_tol)
+        self.abs_tol = self._parse_tol(abs_tol)
+        self.rel_tol = self._parse_tol(rel_tol)
         m_min = log2(n_init)
         m_max = log2(n_max)
         if m_min%1 != 0. or m_min < 8. or m_max%1 != 0.:
@@ -107,6 +113,8 @@ class CubQMCSobolG(StoppingCriterion):
             m_max = 35.
         self.n_init = 2.**m_min
         self.n_max = 2.**m_max
+        self.time_budget = time_budget
+        self.eval_budget = eval_budget
         self.m_min = m_min
         self.m_max = m_max
         self.fudge = fudge
@@ -122,21 +130,37 @@ class CubQMCSobolG(StoppingCriterion):
         if (not self.discrete_distrib.randomize) or self.discrete_distrib.graycode:
             raise ParameterError("CubSobol_g requires distribution to have randomize=True and graycode=False. Use QRNG backend.")
 
-    def integrate(self):
-        """ See abstract method. """
-        # Construct AccumulateData Object to House Integration data
-        self.data = LDTransformData(self, self.integrand, self.true_measure, self.discrete_distrib,
-            self._fwt_update, self.m_min, self.m_max, self.fudge, self.check_cone, ptransform='none')
-        t_start = time()
+    def integrate(self, resume=False):
+        """
+        See abstract method. 
+        
+        Note:
+            On resume the samples of the previous call are checked against the new tolerance first, 
+            then the sequence is extended from n_total. 
+        """
+        resume = self._resume(resume)
+        if not resume:
+            # Construct AccumulateData Object to House Integration data
+            self.data = LDTransformData(self, self.integrand, self.true_measure, self.discrete_distrib,
+                self._fwt_update, self.m_min, self.m_max, self.fudge, self.check_cone, ptransform='none')
+        else:
+            self.data.solution = self.data.yval.mean(0) # undo the tolerance dependent shift
+        t_start = time() - (self.data.time_integrate if resume else 0)
+        self.data.status = 'converged'
         while True:
-            self.data.update_data()
+            if resume:
+                resume = False
+            else:
+                self.data.update_data()
             # Check the end of the algorithm
             self.data.error_bound = self.data.fudge(self.data.m)*self.data.stilde
             # Compute optimal estimator
-            ub = max(self.abs_tol, self.rel_tol*abs(self.data.solution + self.data.error_bound))
-            lb = max(self.abs_tol, self.rel_tol*abs(self.data.solution - self.data.error_bound))
-            self.data.solution = self.data.solution - self.data.error_bound*(ub-lb) / (ub+lb)
-            if 4*self.data.error_bound**2./(ub+lb)**2. <= 1.:
+            ub = maximum(self.abs_tol, self.rel_tol*abs(self.data.solution + self.data.error_bound))
+            lb = maximum(self.abs_tol, self.rel_tol*abs(self.data.solution - self.data.error_bound))
+            with errstate(invalid='ignore'): # outputs with infinite tolerance are not adjusted
+                shift = nan_to_num((ub-lb) / (ub+lb))
+            self.data.solution = self.data.solution - self.data.error_bound*shift
+            if (4*self.data.error_bound**2./(ub+lb)**2. <= 1.).all():
                 # stopping criterion met
                 break
             elif self.data.m == self.data.m_max:
@@ -148,6 +172,10 @@ class CubQMCSobolG(StoppingCriterion):
                 Note that error tolerances may no longer be satisfied""" \
                 % (int(2**self.data.m), int(2**self.data.m), int(2**self.data.m_max))
                 warnings.warn(warning_s, MaxSamplesWarning)
+                self.data.status = 'n_max'
+                break
+            elif self._budget(t_start, 2.**self.data.m) < 1:
+                # doubling samples would go over the time or evaluation budget
                 break
             else:
                 # double sample size
@@ -160,8 +188,8 @@ class CubQMCSobolG(StoppingCriterion):
         Fast Walsh Transform (FWT) ynext, combine with y, then FWT all points.
         
         Args:
-            y (ndarray): all previous samples
-            ynext (ndarray): next samples
+            y (ndarray): all previous samples, n x k for k integrand outputs
+            ynext (ndarray): next samples, n x k for k integrand outputs
         
         Return:
             ndarray: y and ynext combined and transformed
@@ -177,7 +205,7 @@ class CubQMCSobolG(StoppingCriterion):
             oddval = ynext[~ptind]
             ynext[ptind] = (evenval + oddval) / 2.
             ynext[~ptind] = (evenval - oddval) / 2.
-        y = hstack((y,ynext))
+        y = concatenate((y,ynext)) if y.size else ynext
         if len(y) > len(ynext): # already generated some samples samples
             ## Compute FWT on all points
             nl = 2**mnext
@@ -193,8 +221,8 @@ class CubQMCSobolG(StoppingCriterion):
         See abstract method. 
         
         Args:
-            abs_tol (float): absolute tolerance. Reset if supplied, ignored if not. 
-            rel_tol (float): relative tolerance. Reset if supplied, ignored if not. 
+            abs_tol (float/ndarray): absolute tolerance. Reset if supplied, ignored if not. 
+            rel_tol (float/ndarray): relative tolerance. Reset if supplied, ignored if not. 
         """
-        if abs_tol != None: self.abs_tol = abs_tol
-        if rel_tol != None: self.rel_tol = rel_tol
+        if abs_tol is not None: self.abs_tol = self._parse_tol(abs_tol)
+        if rel_tol is not None: self.rel_tol = self._parse_tol(rel_tol)
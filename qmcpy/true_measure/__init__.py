@@ -1,5 +1,27 @@
-from .brownian_motion import BrownianMotion
-from .gaussian import Gaussian
-from .lebesgue import Lebesgue
-from .uniform import Uniform
-from .kumaraswamy import Kumaraswamy
\ No newline at end of file
+from importlib import import_module
+
+# public objects and the module defining each, imported on first access
+_modules = {
+    'BrownianMotion':      '.brownian_motion',
+    'Gaussian':            '.gaussian',
+    'Lebesgue':            '.lebesgue',
+    'Uniform':             '.uniform',
+    'Kumaraswamy':         '.kumaraswamy',
+    'DenseCovariance':     '.covariance',
+    'ScalarCovariance':    '.covariance',
+    'DiagonalCovariance':  '.covariance',
+    'LowRankCovariance':   '.covariance',
+    'KroneckerCovariance': '.covariance',
+    'ToeplitzCovariance':  '.covariance'
+}
+__all__ = list(_modules)
+
+def __getattr__(name):
+    if name not in _modules:
+        raise AttributeError("module %r has no attribute %r"%(__name__,name))
+    value = getattr(import_module(_modules[name],__name__),name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals())|set(__all__))
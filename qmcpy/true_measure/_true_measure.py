@@ -69,13 +69,29 @@ class TrueMeasure(object):
         
         Returns:
             ndarray: length n vector of transformed samples at locations of x
-            ndarray: length n vector of Jacobian values at locations of x
+            ndarray/float: length n vector of Jacobian values at locations of x 
+                or a float if every composed Jacobian is constant
         """
         if self.transform == self: # is \Psi_0
-            return self._transform(x),self._jacobian(x)
+            return self._jacobian_transform(x)
         else: # is transform \Psi_j for j>0
             xtf,jtf = self.transform._jacobian_transform_r(x)
-            return self._transform(xtf),self._jacobian(xtf)*jtf
+            xtf,j = self._jacobian_transform(xtf)
+            return xtf,j*jtf
+
+    def _jacobian_transform(self, x):
+        """
+        Transformed samples and Jacobian for this true measure. 
+        Override to share intermediate computations between the two. 
+
+        Args:
+            x (ndarray): n x d matrix of samples
+        
+        Returns:
+            ndarray: n x d matrix of transformed x
+            ndarray/float: length n vector of Jacobian values at locations of x
+        """
+        return self._transform(x),self._jacobian(x)
     
     def _jacobian(self, x):
         """
@@ -85,7 +101,8 @@ class TrueMeasure(object):
             x (ndarray): n x d matrix of samples
         
         Returns:
-            ndarray: length n vector of Jacobian values at locations of x
+            ndarray/float: length n vector of Jacobian values at locations of x. 
+                A constant Jacobian may be returned as a float, which callers broadcast. 
         """ 
         raise MethodImplementationError(self,'jacobian. Try setting sampler to be in a PDF TrueMeasure to importance sample by.')
 
@@ -119,7 +136,8 @@ class TrueMeasure(object):
             x (ndarray): n x d  matrix of samples
         
         Returns:
-            ndarray: length n vector of weights at locations of x
+            ndarray/float: length n vector of weights at locations of x. 
+                A constant weight may be returned as a float, which callers broadcast. 
         """ 
         raise MethodImplementationError(self,'weight. Try a different true measure with a weight method.')
 
@@ -0,0 +1,426 @@
+from ..util import MethodImplementationError, DimensionError, ParameterError, _univ_repr
+from numpy import *
+from numpy.linalg import cholesky, eigh, inv, slogdet, svd
+from functools import reduce
+
+
+class Covariance(object):
+    """
+    Covariance abstract class. DO NOT INSTANTIATE.
+
+    A covariance object stands in for a dense d x d covariance matrix in a Gaussian true measure.
+    Each concrete class evaluates the Gaussian transform, weight, and log-determinant through an
+    algorithm specific to its structure so the dense matrix is never formed.
+    """
+
+    def __init__(self):
+        prefix = 'A concrete implementation of Covariance must have '
+        if not hasattr(self, 'd'):
+            raise ParameterError(prefix + 'self.d, the dimension')
+        if not hasattr(self, 'logdet'):
+            raise ParameterError(prefix + 'self.logdet, the log-determinant of the covariance')
+        if not hasattr(self,'parameters'):
+            self.parameters = []
+
+    def _set_decomp(self, decomp_type):
+        """
+        ABSTRACT METHOD to set up the factor A, where A A^T is the covariance.
+
+        Args:
+            decomp_type (str): 'pca' for principal component analysis or 'cholesky' for Cholesky decomposition
+        """
+        raise MethodImplementationError(self, '_set_decomp')
+
+    def _mult_factor(self, z):
+        """
+        ABSTRACT METHOD to multiply standard normal samples by the factor.
+
+        Args:
+            z (ndarray): n x d matrix of standard normal samples
+
+        Returns:
+            ndarray: n x d matrix z A^T
+        """
+        raise MethodImplementationError(self, '_mult_factor')
+
+    def _quad_form(self, delta):
+        """
+        ABSTRACT METHOD to evaluate the quadratic form with the inverse covariance.
+
+        Args:
+            delta (ndarray): n x d matrix of deviations from the mean
+
+        Returns:
+            ndarray: length n vector with entries delta_i^T covariance^{-1} delta_i
+        """
+        raise MethodImplementationError(self, '_quad_form')
+
+    def _factor_row(self, i):
+        """
+        Row i of the factor A, so that (z A^T)[:,i] = z A[i]. 
+
+        Args:
+            i (int): row index
+        
+        Returns:
+            ndarray: length d vector
+        """
+        return self._mult_factor(eye(self.d))[:,i]
+
+    def _scalar(self):
+        """
+        Scalar c if the covariance is c times the identity, otherwise None.
+        Only scalar covariances may have their dimension reset.
+        """
+        return None
+
+    def dense(self):
+        """
+        ABSTRACT METHOD to materialize the covariance. Only use for small d.
+
+        Returns:
+            ndarray: d x d covariance matrix
+        """
+        raise MethodImplementationError(self, 'dense')
+
+    @staticmethod
+    def _check_decomp(decomp_type):
+        if decomp_type not in ['pca','cholesky']:
+            raise ParameterError("decomp_type should be 'PCA' or 'Cholesky'")
+
+    def __repr__(self):
+        return _univ_repr(self, "Covariance", self.parameters)
+
+
+class DenseCovariance(Covariance):
+    """
+    Dense d x d covariance matrix. Setup costs O(d^3) and each sample costs O(d^2).
+
+    >>> c = DenseCovariance([[9,4],[4,5]])
+    >>> c.logdet
+    3.367...
+    """
+
+    parameters = ['d']
+
+    def __init__(self, sigma):
+        """
+        Args:
+            sigma (ndarray): d x d symmetric positive definite covariance matrix
+        """
+        self.sigma = array(sigma)
+        if self.sigma.ndim!=2 or self.sigma.shape[0]!=self.sigma.shape[1]:
+            raise DimensionError('covariance must be of shape d x d')
+        self.d = self.sigma.shape[0]
+        self.logdet = slogdet(self.sigma)[1]
+        super(DenseCovariance,self).__init__()
+
+    def _set_decomp(self, decomp_type):
+        self._check_decomp(decomp_type)
+        if decomp_type == 'pca':
+            evals,evecs = eigh(self.sigma) # get eigenvectors and eigenvalues for
+            order = argsort(-evals)
+            self.a = dot(evecs[:,order],diag(sqrt(evals[order])))
+        else: # cholesky
+            self.a = cholesky(self.sigma).T
+        self.inv_sigma = inv(self.sigma)
+
+    def _mult_factor(self, z):
+        return z@self.a.T
+
+    def _factor_row(self, i):
+        return self.a[i]
+
+    def _quad_form(self, delta):
+        return ((delta@self.inv_sigma)*delta).sum(1)
+
+    def _scalar(self):
+        c = self.sigma[0,0]
+        return c if (self.sigma==c*eye(self.d)).all() else None
+
+    def dense(self):
+        return self.sigma
+
+
+class ScalarCovariance(Covariance):
+    """
+    Scalar times the identity, c*I. No matrix is ever formed.
+
+    >>> c = ScalarCovariance(2,d=3)
+    >>> c.logdet
+    2.079...
+    """
+
+    parameters = ['c', 'd']
+
+    def __init__(self, c, d):
+        """
+        Args:
+            c (float): variance of each coordinate
+            d (int): dimension
+        """
+        self.c = c
+        self.d = int(d)
+        self.sqrt_c = sqrt(self.c)
+        self.logdet = self.d*log(self.c)
+        super(ScalarCovariance,self).__init__()
+
+    def _set_decomp(self, decomp_type):
+        self._check_decomp(decomp_type) # PCA and Cholesky factors coincide
+
+    def _mult_factor(self, z):
+        return self.sqrt_c*z
+
+    def _quad_form(self, delta):
+        return (delta**2).sum(1)/self.c
+
+    def _scalar(self):
+        return self.c
+
+    def dense(self):
+        return self.c*eye(self.d)
+
+
+class DiagonalCovariance(Covariance):
+    """
+    Diagonal covariance diag(v). Setup and each sample cost O(d).
+
+    >>> c = DiagonalCovariance([1,2,4])
+    >>> c.logdet
+    2.079...
+    """
+
+    parameters = ['variance']
+
+    def __init__(self, variance):
+        """
+        Args:
+            variance (ndarray): length d vector of positive variances
+        """
+        self.variance = array(variance)
+        if self.variance.ndim!=1:
+            raise DimensionError('variance must be a length d vector')
+        self.d = len(self.variance)
+        self.inv_variance = 1./self.variance
+        self.logdet = log(self.variance).sum()
+        super(DiagonalCovariance,self).__init__()
+
+    def _set_decomp(self, decomp_type):
+        self._check_decomp(decomp_type)
+        if decomp_type == 'pca':
+            # largest variance coordinate is driven by the first column of samples
+            self.order = argsort(-self.variance,kind='stable')
+            self.sqrt_variance = sqrt(self.variance[self.order])
+        else: # cholesky
+            self.order = None
+            self.sqrt_variance = sqrt(self.variance)
+
+    def _mult_factor(self, z):
+        if self.order is None:
+            return z*self.sqrt_variance
+        x = empty_like(z,dtype=float)
+        x[:,self.order] = z*self.sqrt_variance
+        return x
+
+    def _quad_form(self, delta):
+        return (delta**2)@self.inv_variance
+
+    def _scalar(self):
+        c = self.variance[0]
+        return c if (self.variance==c).all() else None
+
+    def dense(self):
+        return diag(self.variance)
+
+
+class LowRankCovariance(Covariance):
+    """
+    Low-rank plus diagonal covariance diag(D) + U U^T for U a d x k matrix with k << d,
+    e.g. a factor model. Setup costs O(d k^2) and each sample costs O(d k).
+
+    The factor is the symmetric square root
+    diag(D)^{1/2} (I + Q diag(sqrt(1+s^2)-1) Q^T)
+    where Q diag(s) V^T is the thin SVD of diag(D)^{-1/2} U.
+    This factor is used for both decomposition types.
+
+    >>> c = LowRankCovariance([[1],[1]],diagonal=1)
+    >>> c.logdet
+    1.098...
+    """
+
+    parameters = ['d', 'rank']
+
+    def __init__(self, u, diagonal=1.):
+        """
+        Args:
+            u (ndarray): d x k low rank factor U
+            diagonal (ndarray): length d vector D of positive diagonal entries or a scalar
+        """
+        self.u = array(u,dtype=float)
+        if self.u.ndim!=2:
+            raise DimensionError('u must be a d x k matrix')
+        self.d,self.rank = self.u.shape
+        self.diagonal = tile(diagonal,self.d) if isscalar(diagonal) else array(diagonal,dtype=float)
+        if self.diagonal.shape!=(self.d,):
+            raise DimensionError('diagonal must be a scalar or a length d vector')
+        self.sqrt_diagonal = sqrt(self.diagonal)
+        self.q,s,_ = svd(self.u/self.sqrt_diagonal[:,None],full_matrices=False)
+        s2 = s**2
+        self.c_root = sqrt(1+s2)-1 # I + Q diag(c_root) Q^T = (I + W W^T)^{1/2}
+        self.c_inv = s2/(1+s2) # I - Q diag(c_inv) Q^T = (I + W W^T)^{-1} by Woodbury
+        self.logdet = log(self.diagonal).sum() + log1p(s2).sum()
+        super(LowRankCovariance,self).__init__()
+
+    def _set_decomp(self, decomp_type):
+        self._check_decomp(decomp_type) # symmetric square root for either type
+
+    def _mult_factor(self, z):
+        return (z + ((z@self.q)*self.c_root)@self.q.T)*self.sqrt_diagonal
+
+    def _quad_form(self, delta):
+        w = delta/self.sqrt_diagonal
+        return (w**2).sum(1) - ((w@self.q)**2)@self.c_inv
+
+    def dense(self):
+        return diag(self.diagonal) + self.u@self.u.T
+
+
+class KroneckerCovariance(Covariance):
+    """
+    Kronecker product covariance S_1 kron S_2 kron ... kron S_m,
+    e.g. a separable space-time or asset-time model.
+    For d = d_1 ... d_m setup costs O(sum d_i^3) and each sample costs O(d sum d_i).
+
+    >>> c = KroneckerCovariance([[[2,1],[1,2]],[[1,0],[0,3]]])
+    >>> c.d
+    4
+    >>> c.logdet
+    4.39...
+    """
+
+    parameters = ['dims']
+
+    def __init__(self, factors):
+        """
+        Args:
+            factors (list): list of m symmetric positive definite d_i x d_i ndarrays
+        """
+        self.factors = [array(s,dtype=float) for s in factors]
+        for s in self.factors:
+            if s.ndim!=2 or s.shape[0]!=s.shape[1]:
+                raise DimensionError('each Kronecker factor must be a square matrix')
+        self.dims = array([s.shape[0] for s in self.factors])
+        self.d = int(self.dims.prod())
+        self.logdet = sum([self.d/di*slogdet(s)[1] for s,di in zip(self.factors,self.dims)])
+        super(KroneckerCovariance,self).__init__()
+
+    def _set_decomp(self, decomp_type):
+        self._check_decomp(decomp_type)
+        if decomp_type == 'pca':
+            eigs = [eigh(s) for s in self.factors]
+            self.a = [evecs*sqrt(evals) for evals,evecs in eigs]
+            self.a_inv = [(evecs/sqrt(evals)).T for evals,evecs in eigs]
+            # order all d eigenvalues, the products of factor eigenvalues, in decreasing order
+            self.order = argsort(-reduce(kron,[evals for evals,evecs in eigs]),kind='stable')
+        else: # cholesky, the Kronecker product of lower triangular factors is lower triangular
+            self.a = [cholesky(s) for s in self.factors]
+            self.a_inv = [inv(a) for a in self.a]
+            self.order = None
+
+    def _kron_mult(self, mats, z):
+        """ z (kron(mats))^T without forming the Kronecker product. """
+        n = z.shape[0]
+        t = z.reshape((n,)+tuple(self.dims))
+        for m in mats: # contract the leading axis, the new axis is appended last
+            t = tensordot(t,m,axes=([1],[1]))
+        return t.reshape((n,self.d))
+
+    def _mult_factor(self, z):
+        if self.order is not None:
+            zp = empty_like(z,dtype=float)
+            zp[:,self.order] = z
+            z = zp
+        return self._kron_mult(self.a,z)
+
+    def _quad_form(self, delta):
+        return (self._kron_mult(self.a_inv,delta)**2).sum(1)
+
+    def dense(self):
+        return reduce(kron,self.factors)
+
+
+class ToeplitzCovariance(Covariance):
+    """
+    Symmetric Toeplitz covariance with entries c[|i-j|],
+    e.g. a stationary process observed on a regular grid.
+    Setup by the Durbin-Levinson recursion costs O(d^2) time and O(d) memory.
+    Samples are generated by the innovations form of the Cholesky factor
+    at O(d^2) per sample without storing any d x d matrix.
+    The Cholesky factor is used for both decomposition types.
+
+    >>> c = ToeplitzCovariance([2,1,.5])
+    >>> c.logdet
+    1.504...
+    """
+
+    parameters = ['first_column']
+
+    def __init__(self, first_column):
+        """
+        Args:
+            first_column (ndarray): length d vector c, the first column of the covariance
+        """
+        self.first_column = array(first_column,dtype=float)
+        if self.first_column.ndim!=1:
+            raise DimensionError('first_column must be a length d vector')
+        self.d = len(self.first_column)
+        c = self.first_column
+        # Durbin-Levinson: reflection coefficients and innovation variances
+        self.reflection = zeros(self.d-1)
+        self.innovation_var = zeros(self.d)
+        self.innovation_var[0] = c[0]
+        phi = zeros(self.d)
+        for k in range(1,self.d):
+            kappa = (c[k] - phi[:k-1]@c[k-1:0:-1]) / self.innovation_var[k-1]
+            phi[:k-1] -= kappa*phi[:k-1][::-1]
+            phi[k-1] = kappa
+            self.reflection[k-1] = kappa
+            self.innovation_var[k] = self.innovation_var[k-1]*(1-kappa**2)
+        if (self.innovation_var<=0).any():
+            raise ParameterError('Toeplitz covariance must be positive definite.')
+        self.sqrt_innovation_var = sqrt(self.innovation_var)
+        self.logdet = log(self.innovation_var).sum()
+        super(ToeplitzCovariance,self).__init__()
+
+    def _set_decomp(self, decomp_type):
+        self._check_decomp(decomp_type) # innovations (Cholesky) factor for either type
+
+    def _predictors(self):
+        """ Yield k and the weights of x_0,...,x_{k-1} in the best linear predictor of x_k. """
+        phi = zeros(self.d)
+        for k in range(1,self.d):
+            kappa = self.reflection[k-1]
+            phi[:k-1] -= kappa*phi[:k-1][::-1]
+            phi[k-1] = kappa
+            yield k, phi[:k][::-1]
+
+    def _mult_factor(self, z):
+        x = empty(z.shape,order='F') # columns are written in sequence
+        x[:,0] = self.sqrt_innovation_var[0]*z[:,0]
+        for k,w in self._predictors():
+            x[:,k] = x[:,:k]@w + self.sqrt_innovation_var[k]*z[:,k]
+        return x
+
+    def _quad_form(self, delta):
+        delta = asfortranarray(delta)
+        q = delta[:,0]**2/self.innovation_var[0]
+        for k,w in self._predictors():
+            q += (delta[:,k]-delta[:,:k]@w)**2/self.innovation_var[k]
+        return q
+
+    def _scalar(self):
+        return self.first_column[0] if (self.first_column[1:]==0).all() else None
+
+    def dense(self):
+        i = arange(self.d)
+        return self.first_column[abs(subtract.outer(i,i))]
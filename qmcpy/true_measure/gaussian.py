@@ -1,10 +1,8 @@
 from ._true_measure import TrueMeasure
-from ..util import TransformError,DimensionError, ParameterError
+from ..util import TransformError,DimensionError, ParameterError, _norm
+from .covariance import Covariance, DenseCovariance, ScalarCovariance, DiagonalCovariance
 from ..discrete_distribution import Sobol
 from numpy import *
-from numpy.linalg import cholesky, det, inv, eigh
-from scipy.stats import norm
-from scipy.special import erfcinv
 
 
 class Gaussian(TrueMeasure):
@@ -34,8 +32,11 @@ class Gaussian(TrueMeasure):
                 discrete distribution from which to transform samples or a
                 true measure by which to compose a transform 
             mean (float): mu for Normal(mu,sigma^2)
-            covariance (ndarray): sigma^2 for Normal(mu,sigma^2). 
-                A float or d (dimension) vector input will be extended to covariance*eye(d)
+            covariance (ndarray/Covariance): sigma^2 for Normal(mu,sigma^2). 
+                A float is treated as covariance*I and a d (dimension) vector as diag(covariance),
+                neither of which forms a d x d matrix. 
+                Pass a Covariance object, e.g. LowRankCovariance, KroneckerCovariance, 
+                or ToeplitzCovariance, to exploit other structure.
             decomp_type (str): method of decomposition either  
                 "PCA" for principal component analysis or 
                 "Cholesky" for cholesky decomposition.
@@ -52,53 +53,45 @@ class Gaussian(TrueMeasure):
         self.covariance = covariance
         if isscalar(mean):
             mean = tile(mean,self.d)
-        if isscalar(covariance):
-            covariance = covariance*eye(self.d)
         self.mu = array(mean)
-        self.sigma = array(covariance)
-        if self.sigma.shape==(self.d,):
-            self.sigma = diag(self.sigma)
-        if not (len(self.mu)==self.d and self.sigma.shape==(self.d,self.d)):
+        if isinstance(covariance,Covariance):
+            self.cov = covariance
+        elif isscalar(covariance):
+            self.cov = ScalarCovariance(covariance,self.d)
+        elif array(covariance).ndim==1:
+            self.cov = DiagonalCovariance(covariance)
+        else:
+            self.cov = DenseCovariance(covariance)
+        if not (len(self.mu)==self.d and self.cov.d==self.d):
             raise DimensionError('''
                     mean must have length d and
                     covariance must be of shape d x d''')
-        self._set_constants()
-    
-    def _set_constants(self):
-        if self.decomp_type == 'pca':
-            evals,evecs = eigh(self.sigma) # get eigenvectors and eigenvalues for
-            order = argsort(-evals)
-            self.a = dot(evecs[:,order],diag(sqrt(evals[order])))
-        elif self.decomp_type == 'cholesky':
-            self.a = cholesky(self.sigma).T
-        else:
-            raise ParameterError("decomp_type should be 'PCA' or 'Cholesky'")
-        self.det_sigma = det(self.sigma)
-        self.det_a = sqrt(self.det_sigma)
-        self.inv_sigma = inv(self.sigma)  
+        self.cov._set_decomp(self.decomp_type)
+
+    @property
+    def sigma(self):
+        """ d x d covariance matrix, only formed on request. """
+        return self.cov.dense()
     
     def _transform(self, x):
-        return self.mu + norm.ppf(x)@self.a.T
+        return self.mu + self.cov._mult_factor(_norm().ppf(x))
     
     def _jacobian(self, x):
-        return self.det_a/norm.pdf(norm.ppf(x)).prod(1)
+        z = _norm().ppf(x)
+        return exp((self.cov.logdet + self.d*log(2*pi) + (z**2).sum(1))/2)
 
     def _weight(self, x):
-        const = (2*pi)**(-self.d/2) * self.det_sigma**(-1./2)
-        delta = x-self.mu
-        return const*exp(-((delta@self.inv_sigma)*delta).sum(1)/2)
+        return exp(-(self.d*log(2*pi) + self.cov.logdet + self.cov._quad_form(x-self.mu))/2)
 
     def _set_dimension(self, dimension):
         m = self.mu[0]
-        c = self.sigma[0,0]
-        expected_cov = c*eye(int(self.d))
-        if not ( (self.mu==m).all() and (self.sigma==expected_cov).all() ):
+        c = self.cov._scalar()
+        if not ( (self.mu==m).all() and c is not None ):
             raise DimensionError('''
                     In order to change dimension of Gaussian measure
                     mean (mu) must be all the same and 
                     covariance must be a scaler times I''')
         self.d = dimension
         self.mu = tile(m,int(self.d))
-        self.sigma = c*eye(int(self.d))
-        self._set_constants()
-    
\ No newline at end of file
+        self.cov = ScalarCovariance(c,self.d)
+        self.cov._set_decomp(self.decomp_type)
@@ -37,16 +37,62 @@ class Kumaraswamy(TrueMeasure):
         self.beta = array(b)
         if len(self.alpha)!=self.d or len(self.beta)!=self.d:
             raise DimensionError('a and b must be scalar or have length equal to dimension.')
+        self._set_constants()
         super(Kumaraswamy,self).__init__() 
 
+    def _set_constants(self):
+        """ Precompute reciprocals and log-Jacobian coefficients, collapsing to floats when all a_j and b_j agree. """
+        a,b = self.alpha.astype(float),self.beta.astype(float)
+        if (a==a[0]).all() and (b==b[0]).all(): # fast path, scalar broadcasting
+            a,b = a[0],b[0]
+        self._a,self._b = a,b
+        self._inv_a,self._inv_b = 1/a,1/b
+        self._log_ab = self.d*log(a*b) if isscalar(a) else log(a*b).sum()
+
+    @staticmethod
+    def _log_sum(logs, coef):
+        """
+        Row sums of coef*logs, dropping zero coefficients so 0*log(0) terms vanish.
+
+        Args:
+            logs (ndarray): n x d matrix of logarithms
+            coef (ndarray/float): length d vector of coefficients or a common float coefficient
+        
+        Returns:
+            ndarray/float: length n vector of sums
+        """
+        if isscalar(coef):
+            return coef*logs.sum(1) if coef!=0 else 0.
+        keep = coef!=0
+        return logs@coef if keep.all() else logs[:,keep]@coef[keep]
+
     def _transform(self, x):
-        return (1-(1-x)**(1/self.beta))**(1/self.alpha)
+        t = subtract(1,x)
+        power(t,self._inv_b,out=t)
+        subtract(1,t,out=t)
+        return power(t,self._inv_a,out=t)
+
+    def _jacobian_transform(self, x):
+        lu = log1p(-x) # log(1-x), shared by the transform and Jacobian
+        lw = multiply(lu,self._inv_b)
+        expm1(lw,out=lw)
+        negative(lw,out=lw)
+        log(lw,out=lw) # log(1-(1-x)^(1/b))
+        log_jac = self._log_sum(lw,self._inv_a-1) + self._log_sum(lu,self._inv_b-1) - self._log_ab
+        t = multiply(lw,self._inv_a,out=lu)
+        exp(t,out=t)
+        return t,exp(log_jac)
 
     def _jacobian(self, x):
-        return prod( (1-(1-x)**(1/self.beta))**(1/self.alpha-1)*(1-x)**(1/self.beta-1)/(self.alpha*self.beta), 1)
+        return self._jacobian_transform(x)[1]
     
     def _weight(self, x):
-        return prod( self.alpha*self.beta*x**(self.alpha-1)*(1-x**self.alpha)**(self.beta-1), 1)
+        lx = log(x)
+        lv = multiply(lx,self._a)
+        exp(lv,out=lv)
+        negative(lv,out=lv)
+        log1p(lv,out=lv) # log(1-x^a)
+        return exp(self._log_ab + self._log_sum(lx,self._a-1) + self._log_sum(lv,self._b-1))
     
     def _set_dimension(self, dimension):
         a = self.alpha[0]
@@ -58,4 +104,5 @@ class Kumaraswamy(TrueMeasure):
                 b must all be the same''')
         self.d = dimension
         self.alpha = tile(a,self.d)
-        self.beta = tile(b,self.d)
\ No newline at end of file
+        self.beta = tile(b,self.d)
+        self._set_constants()
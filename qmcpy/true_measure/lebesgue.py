@@ -3,7 +3,6 @@ from .uniform import Uniform
 from .gaussian import Gaussian
 from ..discrete_distribution import Sobol
 from ..util import TransformError, ParameterError
-from scipy.stats import norm
 from numpy import *
 
 
@@ -37,7 +36,7 @@ class Lebesgue(TrueMeasure):
         super(Lebesgue,self).__init__()
 
     def _weight(self, x):
-        return ones(x.shape[0],dtype=float)
+        return 1.
 
     def _set_dimension(self, dimension):
         self.d = dimension
@@ -2,7 +2,6 @@ from ._true_measure import TrueMeasure
 from ..util import TransformError, DimensionError
 from ..discrete_distribution import Sobol
 from numpy import *
-from scipy.stats import norm
 
 
 class Uniform(TrueMeasure):
@@ -55,10 +54,10 @@ class Uniform(TrueMeasure):
         return x * self.delta + self.a
 
     def _jacobian(self, x):
-        return tile(self.delta_prod,x.shape[0])
+        return self.delta_prod # constant, broadcast by the caller
     
     def _weight(self, x):
-        return tile(self.inv_delta_prod,x.shape[0])
+        return self.inv_delta_prod # constant, broadcast by the caller
     
     def _set_dimension(self, dimension):
         l = self.a[0]
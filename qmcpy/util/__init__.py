@@ -1,4 +1,5 @@
 from .exceptions_warnings import *
 from .abstraction_functions import _univ_repr
-from .math_functions import _tol_fun
-from .latnetbuilder_linker import latnetbuilder_linker
\ No newline at end of file
+from .math_functions import _tol_fun, _fudge, _fminbound_warm, _norm
+from .latnetbuilder_linker import latnetbuilder_linker
+from .moments import StreamingMoments
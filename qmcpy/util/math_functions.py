@@ -21,3 +21,61 @@ def _tol_fun(abs_tol, rel_tol, theta, mu, toltype):
     elif toltype == 'max':  # the max case
         tol = max(abs_tol, rel_tol * abs(mu))
     return tol
+
+
+def _fudge(m):
+    """
+    Default fudge factor of the cone conditions in the guaranteed QMC cubatures.
+    A module level function, unlike a lambda, can be pickled. 
+
+    Args:
+        m (int): log2 of the number of samples
+    
+    Return:
+        float: 5*2^(-m)
+    """
+    return 5.*2.**(-m)
+
+
+def _fminbound_warm(fun, bounds, x_prev=None, width=2., xtol=1e-2):
+    """
+    Bounded scalar minimization warm started at a previous minimizer. 
+    The search starts in a narrower bracket whose first golden section point is x_prev, 
+    so an objective that caches its value at x_prev is reused. 
+    When the minimizer lands on an inner edge of the bracket, the full bounds are searched instead. 
+
+    Args:
+        fun (function): scalar objective
+        bounds (list): lower and upper bound of the minimizer
+        x_prev (float): previous minimizer, or None to search the full bounds
+        width (float): width of the warm started bracket
+        xtol (float): absolute tolerance of the minimizer
+    
+    Return:
+        float: minimizer
+    """
+    from scipy.optimize import fminbound
+    lo,hi = bounds
+    if x_prev is not None:
+        golden = (3-5**.5)/2 # fminbound first evaluates this fraction of the way into the bracket
+        a,b = max(lo,x_prev-golden*width),min(hi,x_prev+(1-golden)*width)
+        x = fminbound(fun, a, b, xtol=xtol, disp=0)
+        if (a==lo or x-a>xtol) and (b==hi or b-x>xtol):
+            return x
+    return fminbound(fun, lo, hi, xtol=xtol, disp=0)
+
+# scipy.stats.norm, imported on first use so importing qmcpy does not load scipy
+_norm_dist = None
+
+def _norm():
+    """
+    Standard normal distribution of scipy.stats, imported once on first use. 
+    
+    Return:
+        scipy.stats.norm: the distribution, e.g. for its ppf in per-evaluation transforms
+    """
+    global _norm_dist
+    if _norm_dist is None:
+        from scipy.stats import norm
+        _norm_dist = norm
+    return _norm_dist
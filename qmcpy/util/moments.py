@@ -0,0 +1,130 @@
+""" Streaming moment accumulation used across the IID stopping criteria. """
+from .exceptions_warnings import ParameterError
+from numpy import *
+
+
+class StreamingMoments(object):
+    """
+    Mean and central moments of a stream of values, accumulated one chunk at a time in constant memory.
+    Each chunk is summarized in two passes and merged into the running moments by the pairwise update
+    formulas of Chan, Golub, and LeVeque and of Pebay [1,2], which avoid the cancellation of raw power sums.
+    Accumulators of separate streams, e.g. on separate workers, combine with merge.
+
+    >>> y = random.RandomState(7).exponential(size=10**4)
+    >>> sm = StreamingMoments(order=4)
+    >>> for i in range(0,10**4,999):
+    ...     sm.update(y[i:i+999])
+    >>> sm.n
+    10000
+    >>> allclose([sm.mean,sm.var,sm.moment(3),sm.moment(4)],[y.mean(),y.var(),((y-y.mean())**3).mean(),((y-y.mean())**4).mean()])
+    True
+    >>> sm_a,sm_b = StreamingMoments(4),StreamingMoments(4)
+    >>> sm_a.update(y[:3000]); sm_b.update(y[3000:])
+    >>> allclose(sm_a.merge(sm_b).moment(4),sm.moment(4))
+    True
+
+    References:
+
+        [1] T.F. Chan, G.H. Golub, and R.J. LeVeque.
+        Updating formulae and a pairwise algorithm for computing sample variances.
+        COMPSTAT 1982, Physica, Heidelberg, 1982.
+
+        [2] P. Pebay. Formulas for robust, one-pass parallel computation of covariances and arbitrary-order statistical moments.
+        Sandia Report SAND2008-6212, Sandia National Laboratories, 2008.
+    """
+
+    def __init__(self, order=2):
+        """
+        Args:
+            order (int): highest central moment to accumulate, one of 1, 2, 3, or 4
+        """
+        if order not in [1,2,3,4]:
+            raise ParameterError("StreamingMoments order must be 1, 2, 3, or 4.")
+        self.order = order
+        self.n = 0 # number of values
+        self.mean = 0.
+        self.msums = [0.]*(order-1) # sums of (y-mean)^k for k = 2,...,order
+
+    def update(self, y):
+        """
+        Accumulate a chunk of values.
+
+        Args:
+            y (ndarray): length n vector of values or n x k matrix of values of k outputs
+        """
+        y = asarray(y,dtype=float)
+        n = y.shape[0]
+        if n == 0:
+            return
+        mean = y.mean(0)
+        msums = []
+        if self.order > 1:
+            d = y-mean
+            dk = d*d
+            msums.append(dk.sum(0))
+            for k in range(3,self.order+1):
+                dk *= d
+                msums.append(dk.sum(0))
+        self._combine(n,mean,msums)
+
+    def merge(self, other):
+        """
+        Accumulate the values of another accumulator of the same order.
+
+        Args:
+            other (StreamingMoments): moments of another stream of values
+
+        Return:
+            StreamingMoments: self
+        """
+        if other.order != self.order:
+            raise ParameterError("Only StreamingMoments of the same order can be merged.")
+        if other.n > 0:
+            self._combine(other.n,other.mean,list(other.msums))
+        return self
+
+    def _combine(self, nb, meanb, msumsb):
+        """ Pairwise update of the moments with those of nb other values. """
+        na = self.n
+        if na == 0:
+            self.n,self.mean,self.msums = nb,meanb,msumsb
+            return
+        n = float(na+nb)
+        delta = meanb-self.mean
+        msums = [self.msums[k]+msumsb[k] for k in range(self.order-1)]
+        # higher moments use the previous lower ones, so update from the lowest order terms of each
+        if self.order > 1:
+            msums[0] += delta**2*na*nb/n
+        if self.order > 2:
+            msums[1] += delta**3*na*nb*(na-nb)/n**2 + 3*delta*(na*msumsb[0]-nb*self.msums[0])/n
+        if self.order > 3:
+            msums[2] += delta**4*na*nb*(na**2-na*nb+nb**2)/n**3 \
+                + 6*delta**2*(na**2*msumsb[0]+nb**2*self.msums[0])/n**2 \
+                + 4*delta*(na*msumsb[1]-nb*self.msums[1])/n
+        self.mean = self.mean+delta*(nb/n)
+        self.msums = msums
+        self.n = na+nb
+
+    def moment(self, k):
+        """
+        Central moment mean((y-mean)^k), with divisor n.
+
+        Args:
+            k (int): order, at most the accumulated order
+
+        Return:
+            ndarray/float: central moment of each output
+        """
+        if k < 2 or k > self.order:
+            raise ParameterError("Central moment of order %d is not accumulated."%k)
+        return self.msums[k-2]/self.n
+
+    @property
+    def var(self):
+        """ Variance with divisor n, as numpy's var. """
+        return self.moment(2)
+
+    @property
+    def std(self):
+        """ Standard deviation with divisor n, as numpy's std. """
+        return sqrt(self.var)
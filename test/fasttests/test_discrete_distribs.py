@@ -3,6 +3,7 @@ from qmcpy.util import *
 from qmcpy.util import ParameterError,ParameterWarning
 from numpy import *
 import os
+import pickle
 import unittest
 
 
@@ -171,5 +172,13 @@ class TestDataTypes(unittest.TestCase):
         distribution = Sobol(dimension=3, randomize=True)
         self.assertEqual(distribution.get_unsigned_long_long_size_cf(), 8)
 
+
+class TestPickle(unittest.TestCase):
+    def test_pickle(self):
+        for distribution in [Lattice(3,seed=7), Sobol(3,seed=7), Halton(3,seed=7), Korobov(3,seed=7)]:
+            state = pickle.dumps(distribution)
+            self.assertTrue(len(state) < 2**12) # generating matrices are not pickled
+            self.assertTrue((pickle.loads(state).gen_samples(8)==distribution.gen_samples(8)).all())
+
 if __name__ == "__main__":
     unittest.main()
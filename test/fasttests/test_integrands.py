@@ -1,5 +1,6 @@
 from qmcpy import *
 from qmcpy.util import *
+from numpy import *
 import unittest
 
 
@@ -15,6 +16,31 @@ class TestAsianOption(unittest.TestCase):
             yp = ao.f_periodized(x,ptransform=ptransform)
             self.assertTrue(yp.shape==(4,))
 
+    def test_parameter_grid(self):
+        strikes,volatilities = [30,35,40],[.4,.5,.5]
+        for mean_type in ['arithmetic','geometric']:
+            ao = AsianOption(Sobol(4,seed=7),strike_price=strikes,volatility=volatilities,mean_type=mean_type)
+            x = ao.discrete_distrib.gen_samples(2**4)
+            y = ao.f(x)
+            self.assertTrue(y.shape==(16,3))
+            for j in range(3):
+                ao_j = AsianOption(Sobol(4,seed=7),strike_price=strikes[j],volatility=volatilities[j],mean_type=mean_type)
+                self.assertTrue(allclose(y[:,j],ao_j.f(x)))
+
+    def test_keep_path(self):
+        ao = AsianOption(Sobol(4,seed=7))
+        ao.f(ao.discrete_distrib.gen_samples(2**4))
+        self.assertFalse(hasattr(ao,'s_fine'))
+        ao = AsianOption(Sobol(4,seed=7),volatility=[.4,.5],keep_path=True)
+        ao.f(ao.discrete_distrib.gen_samples(2**4))
+        self.assertTrue(ao.s_fine.shape==(2,16,4))
+        ao = AsianOption(Sobol(4,seed=7),keep_path=True)
+        ao.set_chunk_size(100)
+        ao.set_backend('thread',workers=2)
+        ao.f(ao.discrete_distrib.gen_samples(2**10)) # not split into chunks
+        ao.shutdown_backend()
+        self.assertTrue(ao.s_fine.shape==(2**10,4))
+
     def test__dim_at_level(self):
         ao = AsianOption(Sobol(), multi_level_dimensions=[4,8])
         self.assertTrue(ao._dim_at_level(0)==4)
@@ -32,6 +58,24 @@ class TestEuropeanOption(unittest.TestCase):
             self.assertTrue(y.shape==(4,))
             eo.get_exact_value()
 
+    def test_parameter_grid(self):
+        eo = EuropeanOption(Sobol(2,seed=7),strike_price=[30,35],interest_rate=[0,.05])
+        x = eo.discrete_distrib.gen_samples(2**4)
+        y = eo.f(x)
+        self.assertTrue(y.shape==(16,2) and eo.get_exact_value().shape==(2,))
+        eo_1 = EuropeanOption(Sobol(2,seed=7),strike_price=35,interest_rate=.05)
+        self.assertTrue(allclose(y[:,1],eo_1.f(x)))
+
+    def test_terminal_value(self):
+        for decomp_type in ['PCA','Cholesky']:
+            eo = EuropeanOption(BrownianMotion(Sobol(16,seed=7),decomp_type=decomp_type))
+            eo_path = EuropeanOption(BrownianMotion(Sobol(16,seed=7),decomp_type=decomp_type),keep_path=True)
+            x = eo.discrete_distrib.gen_samples(2**4)
+            self.assertTrue((eo.f(x)==eo_path.f(x)).all())
+            eo_path.set_chunk_size(5)
+            eo_path.f(x)
+            self.assertTrue(eo_path.s.shape==(2**4,16))
+
 
 class TestKeister(unittest.TestCase):
     """ Unit tests for Keister Integrand. """
@@ -44,6 +88,36 @@ class TestKeister(unittest.TestCase):
         y2 = k.f(x)
         self.assertTrue(y2.shape==(4,))
 
+    def test_chunk_size(self):
+        k = Keister(Gaussian(Lattice(2),mean=1,covariance=3))
+        x = k.discrete_distrib.gen_samples(2**5)
+        y,yp = k.f(x),k.f_periodized(x,'c1sin')
+        k.set_chunk_size(chunk_size=5)
+        self.assertTrue(allclose(k.f(x),y) and allclose(k.f_periodized(x,'c1sin'),yp))
+        k.set_chunk_size(max_chunk_bytes=7*2*8)
+        self.assertTrue(allclose(k.f(x),y))
+        self.assertRaises(ParameterError,k.set_chunk_size,chunk_size=0)
+
+    def test_backend(self):
+        k = Keister(Gaussian(Lattice(2,seed=7),covariance=2))
+        x = k.discrete_distrib.gen_samples(2**6)
+        y = k.f(x)
+        for backend in ['thread','process']:
+            for workers in [1,3]:
+                k.set_backend(backend,workers=workers,shards=5)
+                self.assertTrue((k.f(x)==y).all())
+        k.shutdown_backend()
+        self.assertRaises(ParameterError,k.set_backend,'gpu')
+
+    def test_f_blocks(self):
+        k = Keister(Gaussian(Lattice(2,seed=7),covariance=2))
+        xs = [k.discrete_distrib.gen_samples(n_min=2**5*i,n_max=2**5*(i+1)) for i in range(3)]
+        ys = [k.f(x) for x in xs]
+        for backend in ['serial','thread','process']:
+            k.set_backend(backend,workers=2,shards=5)
+            self.assertTrue(array_equal(hstack(k.f_blocks(xs)),hstack(ys)))
+        k.shutdown_backend()
+
 
 class TestLinear(unittest.TestCase):
     """ Unit tests for Linear Integrand. """
@@ -62,6 +136,13 @@ class TestCustomFun(unittest.TestCase):
         y = cf.f_periodized(cf.discrete_distrib.gen_samples(2**2))
         self.assertTrue(y.shape==(4,))
 
+    def test_chunk_remainder(self):
+        rows = []
+        cf = CustomFun(Uniform(Lattice(2,seed=7)), lambda x: rows.append(x.shape[0]) or x-x.mean(0))
+        cf.set_chunk_size(chunk_size=5)
+        y = cf.f(cf.discrete_distrib.gen_samples(2**4))
+        self.assertTrue(rows==[5,5,6] and y.shape==(2**4,2)) # no one row chunk
+
 
 class TestCallOptions(unittest.TestCase):
     """ Unit tests for MLCallOptions Integrand. """
@@ -77,6 +158,47 @@ class TestCallOptions(unittest.TestCase):
             y = mlco.f_periodized(mlco.discrete_distrib.gen_samples(6),'c3sin',l=l)
             self.assertTrue(y.shape==(6,))
 
+    def test_f_levels(self):
+        mlco = MLCallOptions(IIDStdUniform(seed=7))
+        blocks = []
+        for l in [0,2,1]:
+            mlco.true_measure._set_dimension_r(mlco._dim_at_level(l))
+            blocks.append((mlco.discrete_distrib.gen_samples(2**4),l))
+        ys = [mlco.f(x,l=l) for x,l in blocks if mlco.true_measure._set_dimension_r(x.shape[1]) is None]
+        mlco.set_backend('thread',workers=2)
+        self.assertTrue(array_equal(hstack(ys),hstack(list(mlco.f_levels(blocks)))))
+        copies = dict(mlco._thread_copies)
+        self.assertTrue(array_equal(hstack(ys),hstack(list(mlco.f_levels(blocks)))))
+        self.assertEqual(sorted(copies),[1,2,4])
+        for d in copies:
+            self.assertIs(mlco._thread_copies[d],copies[d]) # copied once
+        mlco.set_backend('thread',workers=2)
+        self.assertEqual(mlco._thread_copies,{})
+        mlco.shutdown_backend()
+
+    def test_milstein_recursion(self):
+        l = 3
+        mlco = MLCallOptions(IIDStdUniform(seed=7))
+        mlco.true_measure._set_dimension_r(mlco._dim_at_level(l))
+        z = mlco.true_measure.gen_samples(2**4)
+        hf = mlco.t/2**l
+        dwf = sqrt(hf)*z
+        dwc = dwf[:,0::2]+dwf[:,1::2]
+        xf = xc = tile(mlco.k,2**4)
+        for j in range(2**l): # reference recursion
+            xf = xf + mlco.r*xf*hf + mlco.sigma*xf*dwf[:,j] + .5*mlco.sigma**2*xf*(dwf[:,j]**2-hf)
+        for j in range(2**(l-1)):
+            xc = xc + mlco.r*xc*2*hf + mlco.sigma*xc*dwc[:,j] + .5*mlco.sigma**2*xc*(dwc[:,j]**2-2*hf)
+        dp = exp(-mlco.r*mlco.t)*(maximum(0,xf-mlco.k)-maximum(0,xc-mlco.k))
+        self.assertTrue(allclose(mlco.g(z,l),dp))
+        x = mlco.discrete_distrib.gen_samples(2**4)
+        sums,cost = mlco.level_sums(x,l)
+        dp = mlco.f(x,l=l)
+        self.assertTrue(allclose(sums[:4],[(dp**p).sum() for p in range(1,5)]) and cost==2**4*2**l)
+        mlco.true_measure._set_dimension_r(mlco._dim_at_level(0))
+        x = mlco.discrete_distrib.gen_samples(2**4)
+        self.assertTrue(allclose(mlco.level_sums(x,0)[0][4:],[mlco.f(x,l=0).sum(),(mlco.f(x,l=0)**2).sum()]))
+
 
 if __name__ == "__main__":
     unittest.main()
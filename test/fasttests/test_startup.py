@@ -0,0 +1,35 @@
+from os.path import dirname, abspath
+import subprocess
+import sys
+import unittest
+
+# run from a fresh interpreter so modules imported by other tests are not counted
+_script = """
+import sys
+import qmcpy
+from qmcpy import Sobol, Keister
+from qmcpy.discrete_distribution.c_lib import load_c_lib
+heavy = ['scipy','matplotlib','pandas','torch','sympy']
+loaded = [m for m in sys.modules if m.split('.')[0] in heavy] + (['c_lib'] if load_c_lib._c_lib else [])
+print(' '.join(sorted(set(m.split('.')[0] for m in loaded))))
+"""
+
+
+class TestStartup(unittest.TestCase):
+    """ Unit tests for the cost of importing qmcpy. """
+
+    def test_lazy_import(self):
+        root = dirname(dirname(dirname(abspath(__file__))))
+        out = subprocess.check_output([sys.executable,'-c',_script],cwd=root)
+        self.assertEqual(out.decode().split(),[]) # no heavy modules and not the C library
+
+    def test_exports(self):
+        import qmcpy
+        for name in qmcpy.__all__:
+            self.assertTrue(hasattr(qmcpy,name))
+        self.assertTrue('CubQMCSobolG' in dir(qmcpy))
+        self.assertRaises(AttributeError,getattr,qmcpy,'NotAnObject')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,13 +4,51 @@ from qmcpy import *
 from qmcpy.util import *
 import sys
 import numpy
+import os
+import pickle
+import tempfile
 import unittest
+import warnings
 
 keister_2d_exact = 1.808186429263620
 tol = .05
 rel_tol = 0
 
 
+def keister_gauss_2d(sampler):
+    """ Two output integrand: the 2d Keister integrand and the Gaussian it is weighted by. """
+    g = lambda t: numpy.exp(-(t**2).sum(1))[:,None]*numpy.column_stack((numpy.cos(numpy.sqrt((t**2).sum(1))),numpy.ones(len(t))))
+    return CustomFun(Lebesgue(Gaussian(sampler,covariance=1/2)),g)
+keister_gauss_2d_exact = numpy.array([keister_2d_exact,numpy.pi])
+
+
+class PreemptedCallOptions(MLCallOptions):
+    """ MLCallOptions which is interrupted after a number of evaluations, as a job on a preempted node. """
+    def __init__(self, sampler, calls):
+        self.calls = calls
+        super(PreemptedCallOptions,self).__init__(sampler)
+    def g(self, samples, l):
+        self.calls -= 1
+        if self.calls < 0:
+            raise KeyboardInterrupt
+        return super(PreemptedCallOptions,self).g(samples,l)
+
+
+def restore_preempted(sc_class, distrib_class, calls, **kwargs):
+    """ Interrupt an integration with checkpoints, then restore and resume it. """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp,'checkpoint.npz')
+        sc = sc_class(PreemptedCallOptions(distrib_class(seed=7),calls),**kwargs)
+        try:
+            sc.integrate(checkpoint_path=path,checkpoint_every=0)
+        except KeyboardInterrupt:
+            pass
+        sc = sc_class(MLCallOptions(distrib_class(seed=7)),**kwargs)
+        sc.restore(path)
+        solution,data = sc.integrate(resume=True,checkpoint_path=path)
+        return solution,data,os.listdir(tmp)
+
+
 class TestCubMCCLT(unittest.TestCase):
     """ Unit tests for CubMCCLT StoppingCriterion. """
 
@@ -28,6 +66,32 @@ class TestCubMCCLT(unittest.TestCase):
         solution,data = CubMCCLT(integrand, abs_tol=tol).integrate()
         self.assertTrue(abs(solution-keister_2d_exact) < tol)
 
+    def test_multi_output(self):
+        solution,data = CubMCCLT(keister_gauss_2d(IIDStdUniform(dimension=2)), abs_tol=tol).integrate()
+        self.assertTrue(solution.shape==(2,) and (abs(solution-keister_gauss_2d_exact) < tol).all())
+
+    def test_blocks(self):
+        from qmcpy.accumulate_data import MeanVarData
+        solutions = []
+        n_block = MeanVarData.n_block
+        try:
+            for MeanVarData.n_block in [n_block,999]: # one sample left in the last block of the pilot
+                solutions.append(CubMCCLT(keister_gauss_2d(IIDStdUniform(dimension=2,seed=7)), abs_tol=tol, n_init=1000).integrate()[0])
+        finally:
+            MeanVarData.n_block = n_block
+        self.assertTrue(numpy.allclose(solutions[0], solutions[1], rtol=1e-12))
+
+    def test_budget(self):
+        integrand = Keister(IIDStdUniform(dimension=2,seed=7))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error') # a budget does not warn
+            solution,data = CubMCCLT(integrand, abs_tol=1e-4, n_init=1024, eval_budget=10**5).integrate()
+        self.assertTrue(data.status=='eval_budget' and data.n_total<=10**5 and data.n_total>.99*10**5)
+        self.assertTrue(abs(solution-keister_2d_exact) < 5*data.error_bound)
+        solution,data = CubMCCLT(integrand, abs_tol=1e-4, n_init=1024, time_budget=0).integrate()
+        self.assertTrue(data.status=='time_budget' and data.n_total==1024)
+        self.assertEqual(CubMCCLT(integrand, abs_tol=tol).integrate()[1].status,'converged')
+
 
 class TestCubQMCCLT(unittest.TestCase):
     """ Unit tests for CubQMCCLT StoppingCriterion. """
@@ -46,6 +110,19 @@ class TestCubQMCCLT(unittest.TestCase):
         solution,data = CubQMCCLT(integrand, abs_tol=tol).integrate()
         self.assertTrue(abs(solution-keister_2d_exact) < tol)
 
+    def test_multi_output(self):
+        solution,data = CubQMCCLT(keister_gauss_2d(Halton(dimension=2)), abs_tol=tol).integrate()
+        self.assertTrue(solution.shape==(2,) and (abs(solution-keister_gauss_2d_exact) < tol).all())
+
+    def test_backend(self):
+        solutions = []
+        for backend in ['serial','thread','process']:
+            integrand = Keister(Sobol(dimension=2,seed=7))
+            integrand.set_backend(backend,workers=3)
+            solutions.append(CubQMCCLT(integrand, abs_tol=1e-3).integrate()[0])
+            integrand.shutdown_backend()
+        self.assertTrue(solutions[0]==solutions[1]==solutions[2]) # replications keep their seeds
+
 
 class TestCubMCG(unittest.TestCase):
     """ Unit tests for CubMCG StoppingCriterion. """
@@ -65,6 +142,16 @@ class TestCubMCG(unittest.TestCase):
         solution,data = CubMCG(integrand, abs_tol=tol).integrate()
         self.assertTrue(abs(solution-keister_2d_exact) < tol)
 
+    def test_resume(self):
+        sc = CubMCG(Keister(IIDStdUniform(dimension=2,seed=7)), abs_tol=.1)
+        data = sc.integrate()[1]
+        n_prev = data.n_total
+        sc.set_tolerance(abs_tol=.02)
+        solution,data_resumed = sc.integrate(resume=True)
+        solution_fresh,data_fresh = CubMCG(Keister(IIDStdUniform(dimension=2,seed=7)), abs_tol=.02).integrate()
+        self.assertTrue(data_resumed is data and data.n_total > n_prev)
+        self.assertTrue(data.n_total==data_fresh.n_total and numpy.allclose(solution,solution_fresh,rtol=1e-12))
+
 
 class TestCubQMCLatticeG(unittest.TestCase):
     """ Unit tests for CubQMCLatticeG StoppingCriterion. """
@@ -83,6 +170,10 @@ class TestCubQMCLatticeG(unittest.TestCase):
         solution,data = CubQMCLatticeG(integrand, abs_tol=tol).integrate()
         self.assertTrue(abs(solution-keister_2d_exact) < tol)
 
+    def test_multi_output(self):
+        solution,data = CubQMCLatticeG(keister_gauss_2d(Lattice(dimension=2)), abs_tol=tol).integrate()
+        self.assertTrue(solution.shape==(2,) and (abs(solution-keister_gauss_2d_exact) < tol).all())
+
 
 class TestCubQMCSobolG(unittest.TestCase):
     """ Unit tests for CubQMCSobolG StoppingCriterion. """
@@ -100,6 +191,34 @@ class TestCubQMCSobolG(unittest.TestCase):
         solution,data = CubQMCSobolG(integrand, abs_tol=tol).integrate()
         self.assertTrue(abs(solution-keister_2d_exact) < tol)
 
+    def test_multi_output(self):
+        solution,data = CubQMCSobolG(keister_gauss_2d(Sobol(dimension=2)), abs_tol=[tol,numpy.inf]).integrate()
+        self.assertTrue(solution.shape==(2,) and abs(solution[0]-keister_2d_exact) < tol)
+
+    def test_resume(self):
+        sc = CubQMCSobolG(Keister(Sobol(dimension=2,seed=7)), abs_tol=.01)
+        self.assertTrue(sc.integrate(resume=True)[1].n_total==sc.integrate()[1].n_total) # nothing to resume yet
+        data = sc.data
+        n_prev = data.n_total
+        sc.set_tolerance(abs_tol=1e-4)
+        solution,data_resumed = sc.integrate(resume=True)
+        solution_fresh,data_fresh = CubQMCSobolG(Keister(Sobol(dimension=2,seed=7)), abs_tol=1e-4).integrate()
+        self.assertTrue(data_resumed is data and data.n_total > n_prev)
+        self.assertTrue(data.n_total==data_fresh.n_total and solution==solution_fresh)
+
+    def test_budget(self):
+        integrand = Keister(Sobol(dimension=2,seed=7))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error') # a budget does not warn
+            solution,data = CubQMCSobolG(integrand, abs_tol=1e-8, eval_budget=10**5).integrate()
+        self.assertTrue(data.status=='eval_budget' and data.n_total==2**16)
+        self.assertTrue(abs(solution-keister_2d_exact) < data.error_bound)
+        solution,data = CubQMCSobolG(integrand, abs_tol=1e-8, time_budget=0).integrate()
+        self.assertTrue(data.status=='time_budget' and data.n_total==2**10)
+        sc = CubQMCSobolG(integrand, abs_tol=1e-8, n_max=2**12, eval_budget=10**5)
+        self.assertWarns(MaxSamplesWarning, sc.integrate)
+        self.assertEqual(sc.data.status,'n_max')
+
 
 class TestCubMCL(unittest.TestCase):
     """ Unit tests for CubMCML StoppingCriterion. """
@@ -113,12 +232,51 @@ class TestCubMCL(unittest.TestCase):
         algorithm = CubMCML(integrand,rmse_tol=.001,n_max=2**10)
         self.assertWarns(MaxSamplesWarning, algorithm.integrate)
     
+    def test_n_total(self):
+        solution,data = CubMCML(MLCallOptions(IIDStdUniform(seed=7)),abs_tol=.05).integrate()
+        self.assertEqual(data.n_total,data.n_level.sum()) # each sample is counted once
+
     def test_european_option(self):
         integrand = MLCallOptions(IIDStdUniform(),start_strike_price=30)
         solution,data = CubMCML(integrand,rmse_tol=tol/2.58).integrate()
         exact_value = integrand.get_exact_value()
         self.assertTrue(abs(solution-exact_value) < tol)
 
+    def test_serial_samples(self):
+        solution,data = CubMCML(MLCallOptions(IIDStdUniform(seed=7)),abs_tol=.05).integrate()
+        self.assertAlmostEqual(solution,10.438713141911158,places=10) # samples are drawn level by level, not in order of cost
+
+    def test_budget(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error') # a budget does not warn
+            solution,data = CubMCML(MLCallOptions(IIDStdUniform(seed=7)), abs_tol=.005, eval_budget=10**5).integrate()
+        self.assertTrue(data.status=='eval_budget' and data.n_total<=10**5 and data.n_total>.99*10**5)
+        self.assertTrue(data.n_total==data.n_level.sum() and (data.n_level>0).all())
+        solution,data = CubMCML(MLCallOptions(IIDStdUniform(seed=7)), abs_tol=.005, time_budget=0).integrate()
+        self.assertTrue(data.status=='time_budget' and data.n_total==3*256) # the pilot sample
+        solution,data = CubMCML(MLCallOptions(IIDStdUniform(seed=7)), abs_tol=.1).integrate()
+        solution_budget,data_budget = CubMCML(MLCallOptions(IIDStdUniform(seed=7)), abs_tol=.1, eval_budget=10**9, time_budget=10**3).integrate()
+        self.assertTrue(data.status==data_budget.status=='converged')
+        self.assertTrue(solution_budget==solution and data_budget.n_total==data.n_total) # an unused budget changes nothing
+
+    def test_checkpoint(self):
+        solution,data = CubMCML(MLCallOptions(IIDStdUniform(seed=7)),abs_tol=.02).integrate()
+        solution_restored,data_restored,files = restore_preempted(CubMCML,IIDStdUniform,10,abs_tol=.02)
+        self.assertTrue(solution_restored==solution and data_restored.n_total==data.n_total)
+        self.assertEqual(files,['checkpoint.npz'])
+        sc = CubQMCML(MLCallOptions(Lattice(seed=7)))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp,'checkpoint.npz')
+            CubMCML(MLCallOptions(IIDStdUniform(seed=7)),abs_tol=.1).integrate(checkpoint_path=path)
+            self.assertRaises(ParameterError,sc.restore,path)
+
+    def test_backend(self):
+        solution = CubMCML(MLCallOptions(IIDStdUniform(seed=7)),abs_tol=.05).integrate()[0]
+        integrand = MLCallOptions(IIDStdUniform(seed=7))
+        integrand.set_backend('thread',workers=3)
+        self.assertEqual(CubMCML(integrand,abs_tol=.05).integrate()[0],solution) # samples are drawn level by level on every backend
+        integrand.shutdown_backend()
+
 
 class TestCubQMCML(unittest.TestCase):
     """ Unit tests for CubQMCML StoppingCriterion. """
@@ -138,6 +296,18 @@ class TestCubQMCML(unittest.TestCase):
         exact_value = integrand.get_exact_value()
         self.assertTrue(abs(solution-exact_value) < tol)
 
+    def test_checkpoint(self):
+        solution,data = CubQMCML(MLCallOptions(Lattice(seed=7)),abs_tol=.02).integrate()
+        solution_restored,data_restored,files = restore_preempted(CubQMCML,Lattice,150,abs_tol=.02)
+        self.assertTrue(solution_restored==solution and numpy.array_equal(data_restored.n_level,data.n_level))
+
+    def test_backend(self):
+        solution = CubQMCML(MLCallOptions(Lattice(seed=7)),abs_tol=.05).integrate()[0]
+        integrand = MLCallOptions(Lattice(seed=7))
+        integrand.set_backend('thread',workers=3)
+        self.assertEqual(CubQMCML(integrand,abs_tol=.05).integrate()[0],solution)
+        integrand.shutdown_backend()
+
 
 class TestCubBayesLatticeG(unittest.TestCase):
     """ Unit tests for CubBayesLatticeG StoppingCriterion. """
@@ -156,6 +326,83 @@ class TestCubBayesLatticeG(unittest.TestCase):
         solution, data = CubBayesLatticeG(integrand, abs_tol=tol, n_init=2 ** 5).integrate()
         self.assertTrue(abs(solution - keister_2d_exact) < tol)
 
+    def test_multi_output(self):
+        solution,data = CubBayesLatticeG(keister_gauss_2d(Lattice(dimension=2, order='linear')), abs_tol=tol).integrate()
+        self.assertTrue(solution.shape==(2,) and (abs(solution-keister_gauss_2d_exact) < tol).all())
+
+    def test_kernel_order(self):
+        sc = CubBayesLatticeG(Keister(Lattice(dimension=2, order='linear', seed=7)))
+        sc.order = 3
+        self.assertRaises(ParameterError, sc.integrate)
+        self.assertRaises(ParameterError, CubBayesLatticeG.kernel_func, 3, 1)
+
+    def test_kernel_table(self):
+        sc = CubBayesLatticeG(Keister(Lattice(dimension=3, order='linear', seed=7)))
+        kernel_func = CubBayesLatticeG.kernel_func(sc.order, sc.kernType)[0]
+        _,xun = sc.discrete_distrib.gen_samples(n_min=0, n_max=2**5, return_unrandomized=True)
+        table = sc._kernel_vals(xun, sc.order, sc.kernType)
+        self.assertTrue(sc._kernel_vals(xun, sc.order, sc.kernType) is table)
+        _,xunnew = sc.discrete_distrib.gen_samples(n_min=2**5, n_max=2**6, return_unrandomized=True, warn=False)
+        xun2 = numpy.vstack([xun, xunnew])
+        self.assertTrue(numpy.array_equal(sc._kernel_vals(xun2, sc.order, sc.kernType), kernel_func(xun2)))
+        self.assertTrue(sc._kernel_prev is xun)
+
+    def test_debug(self):
+        self.assertFalse(CubBayesLatticeG(Keister(Lattice(dimension=2, order='linear'))).debug_enable)
+        solution,data = CubBayesLatticeG(Keister(Lattice(dimension=2, order='linear')), abs_tol=tol, debug_enable=True).integrate()
+        self.assertTrue(data.n_alerts==0 and abs(solution-keister_2d_exact) < tol)
+        self.assertWarns(CubatureWarning, data.alert_msg, numpy.array([numpy.nan]), 'Nan')
+        self.assertTrue(data.n_alerts==1)
+
+    def test_lambda_ring_merge(self):
+        sc = CubBayesLatticeG(Keister(Lattice(dimension=3, order='linear', seed=7)))
+        a = .7
+        _,xun = sc.discrete_distrib.gen_samples(n_min=0, n_max=2**5, return_unrandomized=True)
+        sc._lambda_ring(xun, sc._kernel_vals(xun, sc.order, sc.kernType), a, a)
+        sc._rings_prev, sc._rings = [(numpy.log(a), sc._ring_last)], []
+        _,xunnew = sc.discrete_distrib.gen_samples(n_min=2**5, n_max=2**6, return_unrandomized=True, warn=False)
+        xun2 = numpy.vstack([xun, xunnew]) # new points appended, their linear order given by xun_order
+        xun_order = numpy.empty(2**6, dtype=int)
+        xun_order[0::2],xun_order[1::2] = numpy.arange(2**5),numpy.arange(2**5,2**6)
+        sc._xun_order = (xun2, xun_order)
+        kernel_vals = sc._kernel_vals(xun2, sc.order, sc.kernType)
+        merged = sc._lambda_ring(xun2, kernel_vals, a, a)
+        direct = numpy.fft.fft(CubBayesLatticeG.kernel_t(a, kernel_vals)[0][xun_order])
+        self.assertTrue(numpy.allclose(merged, direct, atol=1e-12))
+
+    def test_point_buffer(self):
+        sc = CubBayesLatticeG(Keister(Lattice(dimension=2, order='linear', seed=7)), abs_tol=1e-4)
+        solution,data = sc.integrate()
+        n = data.n_total
+        self.assertTrue(n > 2**sc.m_min and data.xun_buf.shape == (2**sc.m_max, 2))
+        xpts,xun = sc.discrete_distrib.gen_samples(n_min=0, n_max=n, return_unrandomized=True)
+        self.assertTrue(numpy.array_equal(data.xun_, xun) and numpy.allclose(data.xpts_, xpts))
+        self.assertTrue(numpy.array_equal(data.xun_buf[:n][data.xun_order], xun))
+        self.assertTrue(sc._kernel_table.base.shape == data.xun_buf.shape) # extended in place
+        self.assertTrue(pickle.loads(pickle.dumps(data)).xun_buf.shape == (n, 2))
+
+    def test_shape_gradient(self):
+        integrand = Keister(Lattice(dimension=3, order='linear', seed=7))
+        sc = CubBayesLatticeG(integrand)
+        x,xun = integrand.discrete_distrib.gen_samples(n_min=0, n_max=2**6, return_unrandomized=True)
+        ftilde = sc._fft(integrand.f_periodized(x, sc.ptransform))
+        lna = numpy.array([-1., .3, -2.])
+        h = 1e-6
+        loss = lambda lna: sc.objective_function(numpy.exp(lna), xun, ftilde)[0]
+        grad = sc.objective_grad(numpy.exp(lna), xun, ftilde, sc.objective_function(numpy.exp(lna), xun, ftilde)[1])
+        grad_fd = [(loss(lna+h*e)-loss(lna-h*e))/(2*h) for e in numpy.eye(3)]
+        self.assertTrue(numpy.allclose(grad, grad_fd, rtol=1e-5, atol=1e-6))
+        solution,data = CubBayesLatticeG(Keister(Lattice(dimension=2, order='linear')), abs_tol=tol, one_theta=False).integrate()
+        self.assertTrue(abs(solution-keister_2d_exact) < tol)
+
+    def test_resume(self):
+        sc = CubBayesLatticeG(Keister(Lattice(dimension=2, order='linear', seed=7)), abs_tol=.01)
+        data = sc.integrate()[1]
+        n_prev = data.n_total
+        sc.set_tolerance(abs_tol=1e-4)
+        solution,data_resumed = sc.integrate(resume=True)
+        self.assertTrue(data_resumed is data and data.n_total > n_prev and abs(solution-keister_2d_exact) < 1e-4)
+
 
 class TestCubBayesNetG(unittest.TestCase):
     """ Unit tests for CubBayesNetG StoppingCriterion. """
@@ -174,6 +421,60 @@ class TestCubBayesNetG(unittest.TestCase):
         solution, data = CubBayesNetG(integrand , n_init=2 ** 5, abs_tol=tol).integrate()  #
         self.assertTrue(abs(solution - keister_2d_exact) < tol)
 
+    def test_multi_output(self):
+        solution,data = CubBayesNetG(keister_gauss_2d(Sobol(dimension=2)), abs_tol=tol).integrate()
+        self.assertTrue(solution.shape==(2,) and (abs(solution-keister_gauss_2d_exact) < tol).all())
+
+    def test_kernel_order(self):
+        sc = CubBayesNetG(Keister(Sobol(dimension=2, seed=7)))
+        sc.order = 4
+        self.assertRaises(ParameterError, sc.integrate)
+        self.assertRaises(ParameterError, CubBayesNetG.BuildKernelFunc, 4)
+
+    def test_kernel_table(self):
+        sc = CubBayesNetG(Keister(Sobol(dimension=3, seed=7)))
+        kernel_func = CubBayesNetG.BuildKernelFunc(sc.order)
+        _,xun = sc.discrete_distrib.gen_samples(n_min=0, n_max=2**5, return_jlms=True)
+        table = sc._kernel_vals(xun, sc.order)
+        self.assertTrue(sc._kernel_vals(xun, sc.order) is table)
+        _,xunnew = sc.discrete_distrib.gen_samples(n_min=2**5, n_max=2**6, return_jlms=True, warn=False)
+        xun = numpy.vstack([xun, xunnew])
+        self.assertTrue(numpy.array_equal(sc._kernel_vals(xun, sc.order), kernel_func(xun)))
+
+    def test_debug(self):
+        self.assertFalse(CubBayesNetG(Keister(Sobol(dimension=2))).debug_enable)
+        solution,data = CubBayesNetG(Keister(Sobol(dimension=2)), abs_tol=tol, debug_enable=True).integrate()
+        self.assertTrue(data.n_alerts==0 and abs(solution-keister_2d_exact) < tol)
+        self.assertWarns(CubatureWarning, data.alert_msg, numpy.array([numpy.nan]), 'Nan')
+        self.assertTrue(data.n_alerts==1)
+
+    def test_lambda_ring_merge(self):
+        sc = CubBayesNetG(Keister(Sobol(dimension=3, seed=7)))
+        a = .7
+        _,xun = sc.discrete_distrib.gen_samples(n_min=0, n_max=2**5, return_jlms=True)
+        sc._lambda_ring(xun, sc._kernel_vals(xun, sc.order), a, a)
+        sc._rings_prev, sc._rings = [(numpy.log(a), sc._ring_last)], []
+        _,xunnew = sc.discrete_distrib.gen_samples(n_min=2**5, n_max=2**6, return_jlms=True, warn=False)
+        xun2 = numpy.vstack([xun, xunnew])
+        kernel_vals = sc._kernel_vals(xun2, sc.order)
+        merged = sc._lambda_ring(xun2, kernel_vals, a, a)
+        direct = sc._fwht_h(CubBayesNetG.kernel_t(a, kernel_vals)[0])
+        self.assertTrue(numpy.allclose(merged, direct, atol=1e-12))
+
+    def test_shape_gradient(self):
+        integrand = Keister(Sobol(dimension=3, seed=7))
+        sc = CubBayesNetG(integrand)
+        x,xun = integrand.discrete_distrib.gen_samples(n_min=0, n_max=2**6, return_jlms=True)
+        ftilde = sc._fwht_h(integrand.f(x))
+        lna = numpy.array([-1., .3, -2.])
+        h = 1e-6
+        loss = lambda lna: sc.objective_function(numpy.exp(lna), xun, ftilde)[0]
+        grad = sc.objective_grad(numpy.exp(lna), xun, ftilde, sc.objective_function(numpy.exp(lna), xun, ftilde)[1])
+        grad_fd = [(loss(lna+h*e)-loss(lna-h*e))/(2*h) for e in numpy.eye(3)]
+        self.assertTrue(numpy.allclose(grad, grad_fd, rtol=1e-5, atol=1e-6))
+        solution,data = CubBayesNetG(Keister(Sobol(dimension=2)), abs_tol=tol, one_theta=False).integrate()
+        self.assertTrue(abs(solution-keister_2d_exact) < tol)
+
 
 if __name__ == "__main__":
     unittest.main()
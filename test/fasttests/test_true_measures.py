@@ -20,6 +20,14 @@ class TestUniform(unittest.TestCase):
         u = Uniform(Sobol(2), lower_bound=[-2,-2],upper_bound=[5,2])
         self.assertRaises(DimensionError,u._set_dimension,3) 
 
+    def test_constant_jacobian_weight(self):
+        u = Uniform(Sobol(2,seed=7), lower_bound=[0,1], upper_bound=[2,4])
+        x = u.discrete_distrib.gen_samples(2**3)
+        self.assertTrue(isscalar(u._jacobian(x)) and isscalar(u._weight(x)))
+        f = CustomFun(Lebesgue(u), lambda t: t.sum(1))
+        y = f.f(x)
+        self.assertTrue(y.shape==(8,) and allclose(y,6*u._transform(x).sum(1)))
+
 
 class TestGaussian(unittest.TestCase):
     """ Unit tests for Gaussian Measure. """
@@ -37,6 +45,27 @@ class TestGaussian(unittest.TestCase):
         g = Gaussian(Sobol(2), mean=[1,2],covariance=[2,2])
         self.assertRaises(DimensionError,g._set_dimension,3)
 
+    def test_structured_covariance(self):
+        random.seed(7)
+        u = random.randn(6,2)
+        covs = [
+            ScalarCovariance(2,d=6),
+            DiagonalCovariance(arange(1,7)),
+            LowRankCovariance(u,diagonal=arange(1,7)/2),
+            KroneckerCovariance([[[2,1],[1,2]],[[3,1,0],[1,2,.5],[0,.5,1]]]),
+            ToeplitzCovariance(.9**arange(6))]
+        x = random.rand(8,6)
+        for cov in covs:
+            for decomp_type in ['Cholesky','PCA']:
+                g = Gaussian(Sobol(6,seed=7), mean=1, covariance=cov, decomp_type=decomp_type)
+                g_dense = Gaussian(Sobol(6,seed=7), mean=1, covariance=cov.dense(), decomp_type='Cholesky')
+                t = g._transform(x)
+                at = cov._mult_factor(eye(6)) # A^T
+                self.assertTrue(allclose(at.T@at,cov.dense()))
+                self.assertTrue(allclose(g._weight(t),g_dense._weight(t)))
+                self.assertTrue(allclose(g._jacobian(x),g_dense._jacobian(x)))
+        self.assertRaises(ParameterError,ToeplitzCovariance,[1,2])
+
 
 class TestBrownianMontion(unittest.TestCase):
     """ Unit tests for Brownian Motion Measure. """
@@ -52,6 +81,22 @@ class TestBrownianMontion(unittest.TestCase):
         self.assertTrue((bm.time_vec==bm.drift_time_vec).all())
 
 
+class TestKumaraswamy(unittest.TestCase):
+    """ Unit tests for Kumaraswamy Measure. """
+
+    def test_jacobian_transform(self):
+        x = random.rand(16,3)
+        for a,b in [(2,3),([1,2,.5],[3,1,2])]:
+            k = Kumaraswamy(Sobol(3), a=a, b=b)
+            alpha,beta = k.alpha,k.beta
+            t_exact = (1-(1-x)**(1/beta))**(1/alpha)
+            j_exact = prod((1-(1-x)**(1/beta))**(1/alpha-1)*(1-x)**(1/beta-1)/(alpha*beta),1)
+            t,j = k._jacobian_transform(x)
+            self.assertTrue(allclose(t,t_exact) and allclose(j,j_exact))
+            self.assertTrue(allclose(k._transform(x),t_exact))
+            self.assertTrue(allclose(k._weight(t)*j,1))
+
+
 class TestLebesgue(unittest.TestCase):
     """ Unit tests for Lebesgue Measure. """
 
@@ -9,8 +9,8 @@ def mlmc_test(integrand_qmcpy, n, l, n0, eps, l_min, l_max):
     Multilevel Monte Carlo test routine
 
     Args:
-        integrand_qmcpy (function):
-            low-level routine for l level estimation such that 
+        integrand_qmcpy (Integrand):
+            multi-level integrand with level estimation level_sums(x,l) such that 
                 Args:
                     x (ndarray): nx(integrand._dim_at_level(l)) array of samples from discrete distribution
                     l (int): level
@@ -50,9 +50,7 @@ def mlmc_test(integrand_qmcpy, n, l, n0, eps, l_min, l_max):
             integrand_qmcpy.true_measure._set_dimension_r(new_dim)
             # evaluate integral at sampleing points samples
             samples = integrand_qmcpy.discrete_distrib.gen_samples(n=n/100)
-            integrand_qmcpy.f(samples,l=ll)
-            sums_j = integrand_qmcpy.sums
-            cst_j = integrand_qmcpy.cost
+            sums_j,cst_j = integrand_qmcpy.level_sums(samples,ll)
             sums = sums + sums_j/n
             cst = cst + cst_j/n
         if ll == 0: